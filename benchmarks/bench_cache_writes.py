@@ -0,0 +1,101 @@
+"""
+Concurrent write throughput of the LLM cache: single vs sharded layouts.
+
+Each writer process opens its own LLMCache on a shared fresh directory (like
+server workers or parallel batch runs) and stores `--writes` responses of
+about `--value-bytes` each. Writers start together; the report is total
+writes per second and per-write latency percentiles for every layout.
+
+Run with:
+    uv run python -m benchmarks.bench_cache_writes [--writers 8] [--writes 500] [--shards 4 8 16]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.load_test import percentile
+
+
+def writer(cache_dir: str, layout: dict, index: int, writes: int, value_bytes: int, start_at: float, results):
+    from src.utils.cache import LLMCache
+    from src.utils.cache_backends import open_backend
+
+    cache = LLMCache(cache_dir=cache_dir, backend=open_backend(cache_dir, layout))
+    response = {"text": "x" * value_bytes, "model": "bench", "metadata": {}}
+    while time.time() < start_at:
+        time.sleep(0.001)
+
+    latencies = []
+    for i in range(writes):
+        start = time.perf_counter()
+        cache.set("bench", f"writer {index} question {i}", response)
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def run_layout(layout: dict, writers: int, writes: int, value_bytes: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="cache_writes_") as cache_dir:
+        from src.utils.cache_backends import open_backend
+        open_backend(cache_dir, layout).close()  # Create the layout before the writers race to
+
+        results = multiprocessing.Queue()
+        start_at = time.time() + 1.0
+        processes = [
+            multiprocessing.Process(target=writer, args=(cache_dir, layout, i, writes, value_bytes, start_at, results))
+            for i in range(writers)
+        ]
+        for p in processes:
+            p.start()
+        latencies = []
+        for _ in processes:
+            latencies.extend(results.get())
+        elapsed = time.time() - start_at
+        for p in processes:
+            p.join()
+
+    latencies.sort()
+    return {
+        "layout": layout,
+        "writes": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": latencies[-1] * 1000,
+        },
+    }
+
+
+def label(layout: dict) -> str:
+    return f"sharded/{layout['shards']}" if layout["backend"] == "sharded" else "single"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cache write throughput of single and sharded layouts.")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writer processes")
+    parser.add_argument("--writes", type=int, default=500, help="Writes per writer")
+    parser.add_argument("--value-bytes", type=int, default=2000, help="Approximate size of each cached response")
+    parser.add_argument("--shards", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    layouts = [{"backend": "single"}] + [{"backend": "sharded", "shards": n} for n in args.shards]
+    print(f"{args.writers} writers x {args.writes} writes, ~{args.value_bytes} B values, {os.cpu_count()} CPUs\n")
+    print(f"{'layout':<12} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'vs single':>10}")
+
+    rows = []
+    for layout in layouts:
+        r = run_layout(layout, args.writers, args.writes, args.value_bytes)
+        rows.append(r)
+        print(f"{label(layout):<12} {r['throughput']:>10.0f} {r['latency_ms']['p50']:>8.2f} "
+              f"{r['latency_ms']['p99']:>8.2f} {r['latency_ms']['max']:>8.1f} "
+              f"{r['throughput'] / rows[0]['throughput']:>9.2f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
@@ -0,0 +1,183 @@
+"""
+Concurrent-visitor load test of the Gradio chatbot's handlers.
+
+Starts the mock provider (benchmarks/mock_provider.py) as the Gemini endpoint,
+then simulates `--visitors` browser sessions, each asking `--turns` new
+questions (cache misses) with `--think-ms` between them, through:
+
+    sync   chat_with_tony in a thread, `--sync-concurrency` at a time
+           (Gradio's default concurrency limit per event is 1)
+    async  achat_with_tony on the event loop, Config.CHAT_CONCURRENCY at a time
+
+Both modes queue turns like Gradio does, refusing new ones beyond
+Config.CHAT_QUEUE_SIZE. The async run also includes one flooding session
+(per-session rate limit) and presses Stop on `--stop-rate` of the turns after
+`--stop-after-ms`; afterwards no provider call may still hold a scheduler slot.
+
+Run with:
+    uv run python -m benchmarks.bench_chatbot [--visitors 40] [--turns 3] [--latency-ms 800]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks import mock_provider
+from benchmarks.load_test import percentile, wait_until_ready
+
+FLOOD_MESSAGES = 20
+
+
+def summarize(mode: str, latencies, outcomes, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "mode": mode,
+        "turns": sum(outcomes.values()),
+        "outcomes": outcomes,
+        "seconds": elapsed,
+        "answers_per_s": outcomes.get("answered", 0) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000 * percentile(values, 50),
+            "p95": 1000 * percentile(values, 95),
+            "max": 1000 * (values[-1] if values else 0.0),
+        },
+    }
+
+
+async def run_visitors(mode: str, args) -> dict:
+    from src.agents.me import about_me
+    from src.utils.config import Config
+
+    concurrency = args.sync_concurrency if mode == "sync" else Config.CHAT_CONCURRENCY
+    running = asyncio.Semaphore(concurrency)
+    queued = 0
+    latencies = []
+    outcomes = {"answered": 0, "rate_limited": 0, "queue_full": 0, "stopped": 0, "failed": 0}
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+
+    async def handle(message: str, session_id: str) -> str:
+        """One event through a Gradio-style queue: bounded waiting, `concurrency` running."""
+        nonlocal queued
+        if queued >= Config.CHAT_QUEUE_SIZE:
+            raise OverflowError("queue full")
+        queued += 1
+        try:
+            await running.acquire()
+        finally:
+            queued -= 1
+        try:
+            if mode == "sync":
+                return await asyncio.to_thread(about_me.chat_with_tony, message, [])
+            return await about_me.achat_with_tony(message, [], session_id=session_id)
+        finally:
+            running.release()
+
+    async def turn(message: str, session_id: str, stop: bool) -> None:
+        start = time.perf_counter()
+        task = asyncio.ensure_future(handle(message, session_id))
+        try:
+            if stop:
+                await asyncio.sleep(args.stop_after_ms / 1000)
+                task.cancel()
+            reply = await task
+        except asyncio.CancelledError:
+            outcomes["stopped"] += 1
+            return
+        except OverflowError:
+            outcomes["queue_full"] += 1
+            return
+        if reply.startswith("I'm sorry"):
+            outcomes["failed"] += 1
+        elif reply.startswith(("You're sending", "Please wait")):
+            outcomes["rate_limited"] += 1
+        else:
+            outcomes["answered"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    async def visitor(index: int) -> None:
+        session_id = f"{run_id}-visitor-{index}"
+        await asyncio.sleep(rng.uniform(0, args.think_ms / 1000))
+        for i in range(args.turns):
+            stop = mode == "async" and rng.random() < args.stop_rate
+            await turn(f"[{run_id}] visitor {index} question {i}", session_id, stop)
+            await asyncio.sleep(args.think_ms / 1000)
+
+    async def flooder() -> None:
+        session_id = f"{run_id}-flooder"
+        await asyncio.gather(*(turn(f"[{run_id}] flood {i}", session_id, False) for i in range(FLOOD_MESSAGES)))
+
+    start = time.perf_counter()
+    workers = [visitor(i) for i in range(args.visitors)]
+    if mode == "async":
+        workers.append(flooder())
+    await asyncio.gather(*workers)
+    return summarize(mode, latencies, outcomes, time.perf_counter() - start)
+
+
+def spawn_mock(args) -> subprocess.Popen:
+    mock = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_provider", "--port", str(args.mock_port),
+        "--latency", args.latency, "--latency-ms", str(args.latency_ms),
+        "--latency-jitter", str(args.latency_jitter), "--error-rate", str(args.error_rate),
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_ready("http://127.0.0.1:%d/v1/models" % args.mock_port)
+    return mock
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the chatbot's sync and async handlers.")
+    parser.add_argument("--visitors", type=int, default=40, help="Concurrent browser sessions")
+    parser.add_argument("--turns", type=int, default=3, help="Questions per visitor")
+    parser.add_argument("--think-ms", type=float, default=500, help="Pause between a visitor's questions")
+    parser.add_argument("--sync-concurrency", type=int, default=1, help="Turns at once in the sync baseline")
+    parser.add_argument("--stop-rate", type=float, default=0.1, help="Share of async turns stopped early")
+    parser.add_argument("--stop-after-ms", type=float, default=200)
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--mock-port", type=int, default=9100, help="Port of the spawned mock provider")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    mock_provider.add_arguments(parser)
+    parser.set_defaults(latency="fixed", latency_ms=800.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="chatbot_bench_") as tmp:
+        # Before src imports: Config reads the environment once
+        os.environ.update({
+            "GEMINI_BASE_URL": "http://127.0.0.1:%d/v1/" % args.mock_port,
+            "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY") or "mock",
+            "GEMINI_MODEL": "mock-gemini",
+            "CACHE_DIR": os.path.join(tmp, "cache"),
+            "FAQ_STORE_PATH": os.path.join(tmp, "faq.bin"),
+        })
+        mock = spawn_mock(args)
+        try:
+            from src.utils.scheduler import scheduler_stats
+
+            rows = []
+            print(f"{args.visitors} visitors x {args.turns} turns, provider latency ~{args.latency_ms:.0f} ms\n")
+            print(f"{'mode':<6} {'turns':>6} {'answered':>9} {'answers/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+                  f"{'limited':>8} {'stopped':>8} {'q full':>7} {'failed':>7}")
+            for mode in args.modes:
+                r = asyncio.run(run_visitors(mode, args))
+                rows.append(r)
+                o = r["outcomes"]
+                print(f"{mode:<6} {r['turns']:>6} {o['answered']:>9} {r['answers_per_s']:>10.1f} "
+                      f"{r['latency_ms']['p50']:>8.0f} {r['latency_ms']['p95']:>8.0f} "
+                      f"{o['rate_limited']:>8} {o['stopped']:>8} {o['queue_full']:>7} {o['failed']:>7}")
+
+            leaked = {model: s["in_use"] for model, s in scheduler_stats().items() if s["in_use"]}
+            print(f"\nProvider calls still holding a scheduler slot: {leaked or 'none'}")
+        finally:
+            mock.terminate()
+            mock.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
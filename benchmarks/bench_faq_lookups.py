@@ -0,0 +1,84 @@
+"""
+Cache hit latency: the cache tier (SQLite + unpickling) vs the memory-mapped FAQ store.
+
+Fills a fresh cache directory with `--entries` responses of about
+`--value-bytes` each, compiles them into an FAQ store, then looks up every
+key `--rounds` times through each path and reports per-lookup latency.
+
+Run with:
+    uv run python -m benchmarks.bench_faq_lookups [--entries 200] [--value-bytes 2000] [--rounds 50]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.load_test import percentile
+
+
+def time_lookups(lookup, keys, rounds: int) -> dict:
+    latencies = []
+    for _ in range(rounds):
+        for key in keys:
+            start = time.perf_counter()
+            value = lookup(key)
+            latencies.append(time.perf_counter() - start)
+            assert value is not None
+    latencies.sort()
+    return {
+        "lookups": len(latencies),
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "mean_us": sum(latencies) / len(latencies) * 1e6,
+    }
+
+
+def run(entries: int, value_bytes: int, rounds: int, layout: dict) -> dict:
+    from src.utils.cache_backends import open_backend
+    from src.utils.faq_store import FaqStore, compile_store
+
+    with tempfile.TemporaryDirectory(prefix="faq_bench_") as tmp:
+        backend = open_backend(os.path.join(tmp, "cache"), layout)
+        keys = [f"{i:032x}" for i in range(entries)]
+        response = {"text": "x" * value_bytes, "model": "bench", "metadata": {"usage": {"total_tokens": 100}}}
+        for key in keys:
+            backend.set(key, response)
+
+        path = os.path.join(tmp, "faq.bin")
+        compiled = compile_store(((key, backend.get(key)) for key in keys), path)
+        store = FaqStore(path)
+
+        results = {
+            "compiled": compiled,
+            "cache_tier": time_lookups(backend.get, keys, rounds),
+            "faq_store": time_lookups(store.get, keys, rounds),
+            "faq_store_raw": time_lookups(store.get_raw, keys, rounds),
+        }
+        backend.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cache hit latency of the cache tier and the FAQ store.")
+    parser.add_argument("--entries", type=int, default=200, help="Frozen answers")
+    parser.add_argument("--value-bytes", type=int, default=2000, help="Approximate size of each cached response")
+    parser.add_argument("--rounds", type=int, default=50, help="Lookups of every key per path")
+    parser.add_argument("--shards", type=int, default=0, help="Sharded cache tier with this many databases (0 = single)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    layout = {"backend": "sharded", "shards": args.shards} if args.shards else {"backend": "single"}
+    r = run(args.entries, args.value_bytes, args.rounds, layout)
+    print(f"{args.entries} entries, ~{args.value_bytes} B values, cache tier {layout['backend']}; "
+          f"FAQ store {r['compiled']['bytes'] / 1024:.0f} KiB\n")
+    print(f"{'path':<16} {'p50 us':>8} {'p99 us':>8} {'mean us':>8} {'speedup':>8}")
+    for name in ("cache_tier", "faq_store", "faq_store_raw"):
+        row = r[name]
+        print(f"{name:<16} {row['p50_us']:>8.1f} {row['p99_us']:>8.1f} {row['mean_us']:>8.1f} "
+              f"{r['cache_tier']['mean_us'] / row['mean_us']:>7.1f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(r, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
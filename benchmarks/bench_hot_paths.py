@@ -0,0 +1,255 @@
+"""
+Micro/macro benchmark suite for the cache, server and evaluation hot paths.
+
+    key/*        LLMCache._generate_key over growing message histories
+    cache/*      get (hit and miss) and set against a throwaway diskcache
+    api/*        /generate through the FastAPI app (in-process) with stubbed agents
+    eval/*       EvaluationRunner answer -> judge pipeline with stubbed providers
+
+Results are written as JSON and compared against a stored baseline; a
+benchmark whose median slows down by more than the threshold counts as a
+regression and the script exits with status 1. In CI (`--ci`, or the CI
+environment variable set) a missing baseline is a failure too, so a fresh
+checkout cannot pass without comparing anything.
+
+Run with:
+    uv run python -m benchmarks.bench_hot_paths --save-baseline       # record a baseline
+    uv run python -m benchmarks.bench_hot_paths [--threshold 0.25] [--threshold-for api/=0.5] [--ci]
+"""
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Stub credentials and an isolated cache must be in place before Config is imported
+_cache_dir = tempfile.mkdtemp(prefix="bench_hot_paths_")
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("XAI_API_KEY", "bench")
+os.environ.setdefault("GEMINI_MODEL", "bench-gemini")
+os.environ["CACHE_DIR"] = _cache_dir
+
+from src.agents.me.eval_runner import EvaluationRunner
+from src.models.evaluation import Evaluation
+from src.utils.cache import LLMCache
+from src.utils.structured_output import parse_structured
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline_hot_paths.json"
+HISTORY_LENGTHS = [1, 10, 100]
+EVAL_QUESTIONS = 200
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+def measure(fn, repeat: int, warmup: int = 10, per_call: int = 1) -> dict:
+    """Time `repeat` calls of fn; per_call is how many operations one call performs."""
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) / per_call)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "runs": len(timings),
+        "mean_us": mean * 1e6,
+        "p50_us": timings[len(timings) // 2] * 1e6,
+        "p95_us": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1e6,
+        "ops_per_sec": 1 / mean if mean else 0.0,
+    }
+
+
+def history(length: int) -> list:
+    messages = [{"role": "system", "content": "You are Tony Gregg. " * 50}]
+    for i in range(length):
+        messages.append({"role": "user", "content": f"Question number {i} about Kubernetes and Python?"})
+        messages.append({"role": "assistant", "content": f"Answer number {i}. " * 20})
+    messages.append({"role": "user", "content": "What is your experience with AKS?"})
+    return messages
+
+
+def fake_generate(query, **kwargs) -> dict:
+    return {"text": "Stub answer.", "model": "stub", "metadata": {"usage": None, **kwargs}}
+
+
+# -----------------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------------
+def bench_keys(repeat: int) -> dict:
+    cache = LLMCache(cache_dir=os.path.join(_cache_dir, "keys"))
+    results = {}
+    for length in HISTORY_LENGTHS:
+        messages = history(length)
+        results[f"key/last_message/history={length}"] = measure(
+            lambda: cache._generate_key("gemini", messages), repeat)
+        results[f"key/full_context/history={length}"] = measure(
+            lambda: cache._generate_key("gemini", messages, use_full_context=True), repeat)
+    return results
+
+
+def bench_cache(repeat: int) -> dict:
+    cache = LLMCache(cache_dir=os.path.join(_cache_dir, "cache"))
+    messages = history(10)
+    response = fake_generate(messages)
+    cache.set("gemini", messages, response, use_full_context=True)
+    counter = iter(range(10 ** 9))
+
+    return {
+        "cache/get_hit": measure(lambda: cache.get("gemini", messages, use_full_context=True), repeat),
+        "cache/get_miss": measure(lambda: cache.get("gemini", f"missing {next(counter)}"), repeat),
+        "cache/set": measure(lambda: cache.set("gemini", f"new {next(counter)}", response), repeat),
+    }
+
+
+def bench_api(repeat: int) -> dict:
+    from fastapi.testclient import TestClient
+    from src.apis import api_server
+
+    api_server.gemini.generate = fake_generate
+    api_server.xai.generate = fake_generate
+    client = TestClient(api_server.app)
+    counter = iter(range(10 ** 9))
+
+    def post(body):
+        response = client.post("/generate", json=body)
+        assert response.status_code == 200, response.text
+
+    hit_body = {"query": "What is your experience with AKS?", "model": "gemini"}
+    post(hit_body)
+    return {
+        "api/health": measure(lambda: client.get("/"), repeat),
+        "api/generate_hit": measure(lambda: post(hit_body), repeat),
+        "api/generate_miss": measure(lambda: post({"query": f"Miss {next(counter)}", "model": "gemini"}), repeat),
+    }
+
+
+def bench_eval(repeat: int) -> dict:
+    questions = [f"Evaluation question {i}?" for i in range(EVAL_QUESTIONS)]
+    verdict = '```json\n{"is_accepted": true, "feedback": "Consistent with the resume.",}\n```'
+
+    def judge(question, answer_text):
+        return parse_structured(verdict, Evaluation)
+
+    def run(concurrency):
+        runner = EvaluationRunner(default_limit=concurrency)
+        runner.run(questions, answer=("gemini", fake_generate), judge=("xai", judge), result_model=Evaluation)
+
+    # Per-question cost: one run evaluates EVAL_QUESTIONS questions
+    runs = max(3, repeat // 100)
+    return {
+        "eval/runner_sequential": measure(lambda: run(1), runs, warmup=1, per_call=EVAL_QUESTIONS),
+        "eval/runner_concurrency_4": measure(lambda: run(4), runs, warmup=1, per_call=EVAL_QUESTIONS),
+        "eval/parse_verdict": measure(lambda: parse_structured(verdict, Evaluation), repeat),
+    }
+
+
+BENCHMARKS = [bench_keys, bench_cache, bench_api, bench_eval]
+
+
+# -----------------------------------------------------------------------------
+# Baseline comparison
+# -----------------------------------------------------------------------------
+def threshold_for(name: str, default: float, overrides: list) -> float:
+    """Longest matching prefix override wins, e.g. "api/=0.5"."""
+    best = None
+    for prefix, value in overrides:
+        if name.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+            best = (prefix, value)
+    return best[1] if best else default
+
+
+def compare(results: dict, baseline: dict, default_threshold: float, overrides: list) -> list:
+    """Print a comparison table; returns the names of regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<36} {'baseline p50':>14} {'current p50':>14} {'change':>8}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<36} {'-':>14} {current['p50_us']:>12.1f}us {'new':>8}")
+            continue
+        change = current["p50_us"] / base["p50_us"] - 1 if base["p50_us"] else 0.0
+        limit = threshold_for(name, default_threshold, overrides)
+        flag = ""
+        if change > limit:
+            regressions.append(name)
+            flag = f"  REGRESSION (> {limit:.0%})"
+        print(f"{name:<36} {base['p50_us']:>12.1f}us {current['p50_us']:>12.1f}us {change:>+8.1%}{flag}")
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    print(f"\n{'benchmark':<36} {'runs':>6} {'mean':>12} {'p50':>12} {'p95':>12} {'ops/s':>12}")
+    for name, r in results.items():
+        print(f"{name:<36} {r['runs']:>6} {r['mean_us']:>10.1f}us {r['p50_us']:>10.1f}us "
+              f"{r['p95_us']:>10.1f}us {r['ops_per_sec']:>12.0f}")
+
+
+def parse_override(value: str):
+    prefix, _, threshold = value.partition("=")
+    return prefix, float(threshold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cache, server and evaluation hot paths.")
+    parser.add_argument("--repeat", type=int, default=1000, help="Timed calls per micro-benchmark")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument("--threshold-for", type=parse_override, action="append", default=[],
+                        metavar="PREFIX=THRESHOLD", help="Per-benchmark threshold, e.g. api/=0.5")
+    parser.add_argument("--ci", action="store_true", default=bool(os.environ.get("CI")),
+                        help="Fail when there is no baseline to compare against (default when CI is set)")
+    args = parser.parse_args()
+
+    results = {}
+    for bench in BENCHMARKS:
+        for name, result in bench(args.repeat).items():
+            if args.filter in name:
+                results[name] = result
+    print_results(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to: {baseline_path}")
+    elif baseline_path.exists():
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.threshold_for)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+    else:
+        print(f"\nNo baseline at {baseline_path} (run with --save-baseline to record one).")
+        if args.ci:
+            sys.exit(1)
@@ -0,0 +1,89 @@
+"""
+Time-to-convergence benchmark: pizza.train (step search) vs the vectorized
+trainers in src/machinelearning/basics/trainer.py.
+
+Runs on pizza.txt and on synthetic pizza-like data of growing size, and reports
+wall time, passes over the data and final loss for each trainer.
+
+Run with:
+    uv run python -m benchmarks.bench_pizza_trainer [--sizes 30 10000 100000]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.machinelearning.basics import pizza, trainer
+
+PIZZA_DATA = Path(__file__).parent.parent / "src" / "machinelearning" / "basics" / "pizza.txt"
+
+
+def synthetic(m: int, features: int = 1, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 30, (m, features))
+    Y = X @ np.linspace(1.8, 0.2, features) + 12 + rng.normal(0, 3, m)
+    return (X[:, 0] if features == 1 else X), Y
+
+
+def time_step_search(X, Y):
+    calls = {"loss": 0}
+    original_loss = pizza.loss
+
+    def counting_loss(*args):
+        calls["loss"] += 1
+        return original_loss(*args)
+
+    pizza.loss = counting_loss
+    try:
+        start = time.perf_counter()
+        w, b = pizza.train(X, Y, iterations=100000, lr=0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        pizza.loss = original_loss
+    return elapsed, calls["loss"], original_loss(X, Y, w, b)
+
+
+def time_gradient(X, Y):
+    history = []
+    start = time.perf_counter()
+    w, b = trainer.train_gradient_descent(X, Y, history=history)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(history), trainer.loss(X, Y, w, b)
+
+
+def time_least_squares(X, Y):
+    start = time.perf_counter()
+    w, b = trainer.train_least_squares(X, Y)
+    elapsed = time.perf_counter() - start
+    return elapsed, 1, trainer.loss(X, Y, w, b)
+
+
+def run(name, X, Y):
+    print(f"\n{name} ({len(X)} rows)")
+    print(f"{'trainer':<18} {'time (ms)':>10} {'passes':>8} {'loss':>12}")
+    baseline = None
+    trainers = [
+        ("step search", time_step_search),
+        ("gradient descent", time_gradient),
+        ("least squares", time_least_squares),
+    ]
+    if np.ndim(X) > 1:
+        trainers = trainers[1:]  # pizza.train handles a single feature only
+    for label, fn in trainers:
+        elapsed, passes, final_loss = fn(X, Y)
+        baseline = baseline or elapsed
+        speedup = f"{baseline / elapsed:.0f}x" if elapsed > 0 else "-"
+        print(f"{label:<18} {elapsed * 1000:>10.2f} {passes:>8} {final_loss:>12.4f}  {speedup}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    X, Y = np.loadtxt(PIZZA_DATA, skiprows=1, unpack=True)
+    run("pizza.txt", X, Y)
+    for size in args.sizes:
+        run("synthetic", *synthetic(size))
+    run("synthetic, 3 features", *synthetic(args.sizes[-1], features=3))
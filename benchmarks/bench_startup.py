@@ -0,0 +1,105 @@
+"""
+Import-time (cold start) report for the application entry modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+with API keys removed from the environment (a local .env can still supply
+them), so the report also shows that importing needs no credentials. Prints
+total import time, the packages that dominate it, and flags heavy optional
+dependencies (openai, gradio, pypdf, numpy) that should only load on first use.
+
+Run with:
+    uv run python -m benchmarks.bench_startup [--repeat 5] [--max-ms 1500] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+MODULES = [
+    "src.apis.api_server",
+    "src.agents.me.about_me",
+    "src.agents.me.gap_analyzer",
+    "src.agents.me.response-evaluator",
+]
+DEFERRED = ["openai", "gradio", "pypdf", "numpy"]  # Must not load at import time
+TOP_PACKAGES = 8
+
+
+def import_profile(module: str) -> dict:
+    """Import `module` in a fresh interpreter; returns per-module self/cumulative microseconds."""
+    env = {k: v for k, v in os.environ.items() if k not in ("GEMINI_API_KEY", "XAI_API_KEY")}
+    code = f"__import__({module!r})"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def summarize(module: str, runs: list) -> dict:
+    totals = [run[module][1] / 1000 for run in runs if module in run]
+    last = runs[-1]
+
+    by_package = defaultdict(int)
+    for name, (self_us, _) in last.items():
+        by_package[name.split(".")[0]] += self_us
+
+    return {
+        "module": module,
+        "total_ms": statistics.median(totals),
+        "min_ms": min(totals),
+        "modules_imported": len(last),
+        "top_packages_ms": {
+            name: us / 1000 for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:TOP_PACKAGES]
+        },
+        "eager_heavy_imports": [name for name in DEFERRED if name in last],
+    }
+
+
+def print_report(results: list) -> None:
+    for r in results:
+        print(f"\n{r['module']}: {r['total_ms']:.0f} ms median (min {r['min_ms']:.0f} ms), "
+              f"{r['modules_imported']} modules")
+        for name, ms in r["top_packages_ms"].items():
+            print(f"    {name:<24} {ms:>8.1f} ms")
+        if r["eager_heavy_imports"]:
+            print(f"    ⚠ imported eagerly: {', '.join(r['eager_heavy_imports'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import-time cost of the entry modules.")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module (median reported)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if any module's median exceeds this")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        results.append(summarize(module, runs))
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nReport saved to: {args.output}")
+
+    failures = [r["module"] for r in results if r["eager_heavy_imports"]]
+    if args.max_ms is not None:
+        failures += [r["module"] for r in results if r["total_ms"] > args.max_ms]
+    if failures:
+        print(f"\nStartup regression in: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
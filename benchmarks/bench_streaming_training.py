@@ -0,0 +1,72 @@
+"""
+Out-of-core training benchmark: np.loadtxt vs the memmap pipeline in
+src/machinelearning/basics/dataset.py.
+
+Writes a synthetic text dataset, then reports: the cost of np.loadtxt, the
+one-time text -> binary conversion, read throughput of mini-batches from the
+memmap, streaming least squares and mini-batch SGD, plus peak RSS growth.
+
+Run with:
+    uv run python -m benchmarks.bench_streaming_training [--rows 2000000] [--features 2]
+"""
+import argparse
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.machinelearning.basics import dataset, trainer
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def write_text(path: Path, rows: int, features: int, chunk: int = 500_000):
+    rng = np.random.default_rng(0)
+    weights = np.linspace(1.8, 0.2, features)
+    with open(path, "w") as f:
+        f.write(" ".join([f"x{i}" for i in range(features)] + ["y"]) + "\n")
+        for start in range(0, rows, chunk):
+            X = rng.uniform(0, 30, (min(chunk, rows - start), features))
+            Y = X @ weights + 12 + rng.normal(0, 3, len(X))
+            np.savetxt(f, np.column_stack([X, Y]), fmt="%.4f")
+
+
+def timed(label, fn, size_bytes=None):
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    throughput = f"{size_bytes / elapsed / 1e6:>9.1f} MB/s" if size_bytes else " " * 14
+    print(f"{label:<32} {elapsed:>8.2f} s {throughput}   peak RSS +{peak_rss_mb() - rss_before:.0f} MB")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--features", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=65_536)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = Path(tmp) / "data.txt"
+        write_text(text_path, args.rows, args.features)
+        print(f"{args.rows} rows x {args.features + 1} columns, text file {text_path.stat().st_size / 1e6:.0f} MB\n")
+
+        # The memmap steps run first so loadtxt's allocation doesn't hide their RSS
+        binary_path = timed("convert text -> binary (once)", lambda: dataset.convert_text_to_binary(text_path))
+        data, _ = dataset.open_dataset(binary_path)
+        binary_size = data.nbytes
+
+        batches = lambda: dataset.iter_batches(data, batch_size=args.batch_size)
+        timed("read all mini-batches", lambda: sum(len(Y) for _, Y in batches()), binary_size)
+        w, b = timed("streaming least squares", lambda: trainer.train_least_squares_streaming(batches), binary_size)
+        print(f"{'':<32} w={np.round(w, 3)}, b={b:.3f}")
+        w, b = timed("mini-batch SGD (up to 5 epochs)", lambda: trainer.train_minibatch(batches, epochs=5))
+        print(f"{'':<32} w={np.round(w, 3)}, b={b:.3f}")
+
+        timed("np.loadtxt (whole file)", lambda: np.loadtxt(text_path, skiprows=1, unpack=True))
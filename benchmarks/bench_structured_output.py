@@ -0,0 +1,136 @@
+"""
+Throughput benchmark for src/utils/structured_output.py.
+
+Random JSON documents are corrupted the way LLMs corrupt them (chatty text,
+code fences, trailing commas, single quotes, Python literals, truncation).
+The same generators drive the fuzz tests in tests/test_structured_output.py.
+
+Run with:
+    uv run python -m benchmarks.bench_structured_output [--seed 0]
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from src.utils.structured_output import StreamingJSONParser, StructuredOutputError, extract_json
+
+SAFE_CHARS = string.ascii_letters + string.digits + " .-_:/()?!"
+TRICKY_CHARS = SAFE_CHARS + "\"'\\\n\t{}[],é"
+
+
+# -----------------------------------------------------------------------------
+# Random documents
+# -----------------------------------------------------------------------------
+def random_string(rng: random.Random, alphabet: str) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+
+
+def random_value(rng: random.Random, depth: int, alphabet: str):
+    kind = rng.random()
+    if depth >= 3 or kind < 0.35:
+        return random_string(rng, alphabet)
+    if kind < 0.45:
+        return rng.randint(-1000, 1000)
+    if kind < 0.5:
+        return round(rng.uniform(-100, 100), 3)
+    if kind < 0.6:
+        return rng.choice([True, False, None])
+    if kind < 0.8:
+        return [random_value(rng, depth + 1, alphabet) for _ in range(rng.randint(0, 4))]
+    return random_object(rng, depth + 1, alphabet)
+
+
+def random_object(rng: random.Random, depth: int = 0, alphabet: str = TRICKY_CHARS) -> dict:
+    return {
+        random_string(rng, string.ascii_lowercase) or "k": random_value(rng, depth, alphabet)
+        for _ in range(rng.randint(1, 5))
+    }
+
+
+# -----------------------------------------------------------------------------
+# Corruptions (all of these must round-trip exactly, see the fuzz tests)
+# -----------------------------------------------------------------------------
+def dump(obj, trailing_commas: bool = False, python_literals: bool = False) -> str:
+    """Serialize structurally, optionally with trailing commas and Python literals."""
+    if isinstance(obj, dict):
+        items = [f"{json.dumps(k)}: {dump(v, trailing_commas, python_literals)}" for k, v in obj.items()]
+        return "{" + ", ".join(items) + ("," if trailing_commas and items else "") + "}"
+    if isinstance(obj, list):
+        items = [dump(v, trailing_commas, python_literals) for v in obj]
+        return "[" + ", ".join(items) + ("," if trailing_commas and items else "") + "]"
+    if python_literals and (obj is None or isinstance(obj, bool)):
+        return repr(obj)
+    return json.dumps(obj)
+
+
+def chatty(rng, text):
+    return f"Sure! Here is the JSON you asked for:\n{text}\nLet me know if you need anything else."
+
+
+def fenced(rng, text):
+    return f"```json\n{text}\n```"
+
+
+# Serializations applied before the text-level wrappers above
+SERIALIZATIONS = [
+    lambda obj: json.dumps(obj),
+    lambda obj: json.dumps(obj, indent=2, ensure_ascii=False),
+    lambda obj: dump(obj, trailing_commas=True),
+    lambda obj: dump(obj, python_literals=True),
+    lambda obj: dump(obj, trailing_commas=True, python_literals=True),
+]
+WRAPPERS = [chatty, fenced]
+
+
+def single_quoted(obj) -> str:
+    """Python repr of a document whose strings contain no quotes: valid for the repairer."""
+    return repr(obj)
+
+
+# -----------------------------------------------------------------------------
+# Throughput
+# -----------------------------------------------------------------------------
+def throughput(seed: int, repeat: int = 200):
+    rng = random.Random(seed)
+    docs = [json.dumps(random_object(rng)) for _ in range(50)]
+    inputs = {
+        "valid JSON (fast path)": docs,
+        "chatty + fenced": [fenced(rng, chatty(rng, d)) for d in docs],
+        "trailing commas + literals": [dump(json.loads(d), True, True) for d in docs],
+        "truncated (50%)": [d[:len(d) // 2] for d in docs],
+    }
+
+    print(f"\n{'input':<30} {'MB/s':>8} {'docs/s':>10}")
+    for name, texts in inputs.items():
+        size = sum(len(t) for t in texts) * repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for t in texts:
+                try:
+                    extract_json(t)
+                except StructuredOutputError:
+                    pass
+        elapsed = time.perf_counter() - start
+        print(f"{name:<30} {size / elapsed / 1e6:>8.2f} {len(texts) * repeat / elapsed:>10.0f}")
+
+    texts = inputs["chatty + fenced"]
+    size = sum(len(t) for t in texts) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            parser = StreamingJSONParser()
+            for i in range(0, len(t), 16):
+                if parser.feed(t[i:i + 16]) is not None:
+                    break
+    elapsed = time.perf_counter() - start
+    print(f"{'streaming, 16-char chunks':<30} {size / elapsed / 1e6:>8.2f} {len(texts) * repeat / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    throughput(args.seed)
@@ -0,0 +1,116 @@
+"""
+Throughput scaling of `run_server.py --prod` from 1 to N workers.
+
+Starts one mock provider (benchmarks/mock_provider.py) with a fixed latency,
+then for each worker count starts the production server against it with a
+fresh cache and drives it with the load generator (benchmarks/load_test.py).
+Provider calls are synchronous inside the endpoints, so a single worker
+handles one cache miss at a time and miss throughput should grow with workers.
+
+Run with:
+    uv run python -m benchmarks.bench_worker_scaling [--max-workers 4] [--requests 300] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+import httpx
+
+from benchmarks.load_test import run_scenario, wait_until_ready
+
+
+def start_mock(port: int, latency_ms: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_provider", "--port", str(port),
+         "--latency", "fixed", "--latency-ms", str(latency_ms)],
+        stdout=subprocess.DEVNULL
+    )
+    wait_until_ready(f"http://127.0.0.1:{port}/v1/models")
+    return process
+
+
+def start_server(workers: int, port: int, mock_port: int, cache_dir: str, metrics_dir: str) -> subprocess.Popen:
+    mock_url = f"http://127.0.0.1:{mock_port}/v1/"
+    env = {
+        **os.environ,
+        "GEMINI_BASE_URL": mock_url,
+        "XAI_BASE_URL": mock_url,
+        "GEMINI_API_KEY": "mock",
+        "XAI_API_KEY": "mock",
+        "GEMINI_MODEL": "mock-gemini",
+        "XAI_MODEL": "mock-grok",
+        "CACHE_DIR": cache_dir,
+        "METRICS_DIR": metrics_dir,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "run_server.py", "--prod", "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    wait_until_ready(f"http://127.0.0.1:{port}/")
+    return process
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def measure(port: int, scenarios, requests: int, concurrency: int) -> list:
+    # No keep-alive: workers share one listening socket, and a pooled connection
+    # stays pinned to whichever worker accepted it first
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        return [await run_scenario(client, scenario, requests, concurrency) for scenario in scenarios]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark throughput from 1 to N server workers.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario and worker count")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fixed mock provider latency")
+    parser.add_argument("--scenarios", nargs="+", choices=["generate", "cache"], default=["generate", "cache"])
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--mock-port", type=int, default=9200)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    mock = start_mock(args.mock_port, args.latency_ms)
+    rows = []
+    try:
+        for workers in range(1, args.max_workers + 1):
+            with tempfile.TemporaryDirectory(prefix="scaling_") as tmp:
+                server = start_server(workers, args.port, args.mock_port,
+                                      os.path.join(tmp, "cache"), os.path.join(tmp, "metrics"))
+                try:
+                    results = asyncio.run(measure(args.port, args.scenarios, args.requests, args.concurrency))
+                finally:
+                    stop(server)
+            for r in results:
+                rows.append({"workers": workers, **r})
+                print(f"workers={workers} {r['scenario']:<9} {r['throughput']:8.1f} req/s  "
+                      f"p50 {r['latency_ms']['p50']:7.1f} ms  p99 {r['latency_ms']['p99']:7.1f} ms  "
+                      f"errors {r['errors']}")
+    finally:
+        stop(mock)
+
+    print(f"\n{'scenario':<9} {'workers':>7} {'req/s':>9} {'speedup':>8}")
+    for scenario in args.scenarios:
+        base = next(r["throughput"] for r in rows if r["scenario"] == scenario)
+        for r in (r for r in rows if r["scenario"] == scenario):
+            print(f"{scenario:<9} {r['workers']:>7} {r['throughput']:>9.1f} {r['throughput'] / base:>7.2f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
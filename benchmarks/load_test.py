@@ -0,0 +1,224 @@
+"""
+Load generator for the API server.
+
+Drives /generate (cache misses), /generate over a small repeated query pool
+(cache hits) and /compare with a fixed number of concurrent clients, then
+reports throughput, latency percentiles and errors per scenario.
+
+With --spawn, a mock provider (benchmarks/mock_provider.py) and the API server
+are started as subprocesses, wired together through GEMINI_BASE_URL /
+XAI_BASE_URL and a throwaway cache directory, so no API keys or network are
+needed:
+
+    uv run python -m benchmarks.load_test --spawn --requests 500 --concurrency 32
+
+Against an already running server:
+
+    uv run python -m benchmarks.load_test --url http://127.0.0.1:8000 --scenarios generate cache
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from benchmarks import mock_provider
+
+SCENARIOS = ["generate", "cache", "compare"]
+CACHE_POOL_SIZE = 20  # Distinct queries in the cache-hit scenario
+
+
+# -----------------------------------------------------------------------------
+# Requests
+# -----------------------------------------------------------------------------
+def request_for(scenario: str, i: int, run_id: str):
+    """(path, json body) of the i-th request of a scenario."""
+    if scenario == "generate":
+        return "/generate", {"query": "Load test %s question %d" % (run_id, i), "model": "gemini"}
+    if scenario == "cache":
+        return "/generate", {"query": "Cached question %d" % (i % CACHE_POOL_SIZE), "model": "gemini"}
+    if scenario == "compare":
+        return "/compare", {"query": "Load test %s comparison %d" % (run_id, i), "models": ["gemini", "xai"]}
+    raise ValueError("Unknown scenario: %s" % scenario)
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, requests: int, concurrency: int) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    if scenario == "cache":
+        # Warm the pool first so the measured requests are all hits
+        for i in range(CACHE_POOL_SIZE):
+            path, body = request_for(scenario, i, run_id)
+            await client.post(path, json=body)
+
+    latencies = []
+    statuses = Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            path, body = request_for(scenario, i, run_id)
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return summarize(scenario, latencies, statuses, elapsed, concurrency)
+
+
+# -----------------------------------------------------------------------------
+# Reporting
+# -----------------------------------------------------------------------------
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(scenario, latencies, statuses, elapsed, concurrency) -> dict:
+    values = sorted(latencies)
+    ok = statuses.get(200, 0)
+    return {
+        "scenario": scenario,
+        "requests": len(values),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "throughput": len(values) / elapsed if elapsed else 0.0,
+        "ok": ok,
+        "errors": len(values) - ok,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "latency_ms": {
+            "mean": 1000 * sum(values) / len(values) if values else 0.0,
+            "p50": 1000 * percentile(values, 50),
+            "p90": 1000 * percentile(values, 90),
+            "p95": 1000 * percentile(values, 95),
+            "p99": 1000 * percentile(values, 99),
+            "max": 1000 * (values[-1] if values else 0.0),
+        },
+    }
+
+
+def print_report(results) -> None:
+    print("\n%-9s %8s %6s %9s %8s %8s %8s %8s %8s %7s" % (
+        "scenario", "requests", "conc", "req/s", "p50 ms", "p90 ms", "p95 ms", "p99 ms", "max ms", "errors"))
+    for r in results:
+        lat = r["latency_ms"]
+        print("%-9s %8d %6d %9.1f %8.1f %8.1f %8.1f %8.1f %8.1f %7d" % (
+            r["scenario"], r["requests"], r["concurrency"], r["throughput"],
+            lat["p50"], lat["p90"], lat["p95"], lat["p99"], lat["max"], r["errors"]))
+        if r["errors"]:
+            print("          statuses: %s" % r["statuses"])
+
+
+# -----------------------------------------------------------------------------
+# Spawned mock provider + API server
+# -----------------------------------------------------------------------------
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("Timed out waiting for %s" % url)
+
+
+def spawn_stack(args, cache_dir: str):
+    """Start the mock provider and the API server; returns the processes."""
+    mock_args = [
+        "--port", str(args.mock_port),
+        "--latency", args.latency,
+        "--latency-ms", str(args.latency_ms),
+        "--latency-jitter", str(args.latency_jitter),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit", str(args.rate_limit),
+        "--throttle-rate", str(args.throttle_rate),
+        "--retry-after", str(args.retry_after),
+    ]
+    if args.seed is not None:
+        mock_args += ["--seed", str(args.seed)]
+    mock = subprocess.Popen([sys.executable, "-m", "benchmarks.mock_provider", *mock_args])
+
+    mock_url = "http://127.0.0.1:%d/v1/" % args.mock_port
+    env = {
+        **os.environ,
+        "GEMINI_BASE_URL": mock_url,
+        "XAI_BASE_URL": mock_url,
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY") or "mock",
+        "XAI_API_KEY": os.environ.get("XAI_API_KEY") or "mock",
+        "GEMINI_MODEL": "mock-gemini",
+        "XAI_MODEL": "mock-grok",
+        "CACHE_DIR": cache_dir,
+        # Every virtual user connects from 127.0.0.1: a per-client limit would turn the test into 429s
+        "ADMISSION_PER_CLIENT": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.apis.api_server:app",
+         "--port", str(args.port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+
+    wait_until_ready("http://127.0.0.1:%d/v1/models" % args.mock_port)
+    wait_until_ready("http://127.0.0.1:%d/" % args.port)
+    return [mock, server]
+
+
+async def main(args) -> list:
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+        for scenario in args.scenarios:
+            print("Running %s: %d requests, concurrency %d..." % (scenario, args.requests, args.concurrency))
+            results.append(await run_scenario(client, scenario, args.requests, args.concurrency))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the API server.")
+    parser.add_argument("--url", default=None, help="API server URL (default: the spawned one, or http://127.0.0.1:8000)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--spawn", action="store_true", help="Start a mock provider and an API server first")
+    parser.add_argument("--port", type=int, default=8100, help="Port of the spawned API server")
+    parser.add_argument("--mock-port", type=int, default=9100, help="Port of the spawned mock provider")
+    mock_provider.add_arguments(parser)
+    args = parser.parse_args()
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="load_test_cache_") as cache_dir:
+        try:
+            if args.spawn:
+                processes = spawn_stack(args, cache_dir)
+                args.url = args.url or "http://127.0.0.1:%d" % args.port
+            args.url = args.url or "http://127.0.0.1:8000"
+
+            results = asyncio.run(main(args))
+            print_report(results)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    json.dump(results, f, indent=2)
+                print("\nResults saved to: %s" % args.output)
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
@@ -0,0 +1,256 @@
+"""
+Offline OpenAI-compatible mock provider.
+
+Serves POST /v1/chat/completions (plain and streaming) with configurable
+latency, error rate and 429 rate limiting, so the API server, Gradio app and
+evaluators can be load-tested without live Gemini or xAI endpoints.
+
+Point the agents at it through the environment:
+    GEMINI_BASE_URL=http://127.0.0.1:9100/v1/ XAI_BASE_URL=http://127.0.0.1:9100/v1/
+
+Run with:
+    uv run python -m benchmarks.mock_provider [--port 9100] [--latency lognormal] [--latency-ms 300]
+        [--error-rate 0.01] [--rate-limit 50] [--throttle-rate 0.0]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal"]
+
+
+@dataclass
+class MockSettings:
+    latency: str = "lognormal"       # One of LATENCY_DISTRIBUTIONS
+    latency_ms: float = 300.0        # Mean time to first token
+    latency_jitter: float = 0.5      # Spread relative to the mean (uniform/normal/lognormal)
+    tokens_per_second: float = 200.0 # Streaming speed after the first token
+    error_rate: float = 0.0          # Fraction of requests answered with HTTP 500
+    rate_limit: float = 0.0          # Requests per second before 429s (0 = unlimited)
+    throttle_rate: float = 0.0       # Fraction of requests answered with 429 regardless of load
+    retry_after: int = 1             # Retry-After header on 429s (seconds)
+    seed: int = None
+
+
+class TokenBucket:
+    """Requests-per-second limiter; burst equals one second of traffic."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+# -----------------------------------------------------------------------------
+# Fake content
+# -----------------------------------------------------------------------------
+def sample_latency(settings: MockSettings, rng: random.Random) -> float:
+    """Seconds to wait before the first token."""
+    mean = settings.latency_ms / 1000
+    spread = settings.latency_jitter
+    if settings.latency == "fixed":
+        return mean
+    if settings.latency == "uniform":
+        return rng.uniform(mean * (1 - spread), mean * (1 + spread))
+    if settings.latency == "normal":
+        return max(0.0, rng.gauss(mean, mean * spread))
+    # lognormal with the requested mean: long tail like real providers
+    return rng.lognormvariate(0, spread) * mean / math.exp(spread ** 2 / 2)
+
+
+def example_for_schema(schema: dict, definitions: dict = None):
+    """Smallest value that validates against a (pydantic-generated) JSON schema."""
+    definitions = definitions if definitions is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return example_for_schema(definitions[schema["$ref"].split("/")[-1]], definitions)
+    if "anyOf" in schema:
+        return example_for_schema(schema["anyOf"][0], definitions)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type", "object")
+    if kind == "object":
+        return {
+            name: example_for_schema(prop, definitions)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return []
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 1)
+    if kind == "null":
+        return None
+    return "mock"
+
+
+def completion_text(body: dict) -> str:
+    """Deterministic answer for the request (JSON when a schema is requested)."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps(example_for_schema(response_format["json_schema"]["schema"]))
+
+    question = ""
+    for message in reversed(body.get("messages", [])):
+        if message.get("role") == "user":
+            question = message.get("content") or ""
+            break
+    words = min(int(body.get("max_tokens") or 1000), 60)
+    filler = " ".join("lorem" for _ in range(words))
+    return "Mock answer to: %s\n%s" % (question[:200], filler)
+
+
+def usage(body: dict, text: str) -> dict:
+    prompt = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    completion = len(text) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def error(status: int, message: str, kind: str, headers: dict = None) -> JSONResponse:
+    return JSONResponse({"error": {"message": message, "type": kind, "code": status}}, status_code=status, headers=headers)
+
+
+# -----------------------------------------------------------------------------
+# App
+# -----------------------------------------------------------------------------
+def create_app(settings: MockSettings = None) -> FastAPI:
+    settings = settings or MockSettings()
+    rng = random.Random(settings.seed)
+    bucket = TokenBucket(settings.rate_limit) if settings.rate_limit > 0 else None
+    stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "streamed": 0}
+
+    app = FastAPI(title="Mock OpenAI-compatible provider")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        if (bucket and not bucket.take()) or rng.random() < settings.throttle_rate:
+            stats["throttled"] += 1
+            return error(429, "Rate limit exceeded", "rate_limit_exceeded", {"Retry-After": str(settings.retry_after)})
+
+        await asyncio.sleep(sample_latency(settings, rng))
+        if rng.random() < settings.error_rate:
+            stats["errors"] += 1
+            return error(500, "Injected provider error", "server_error")
+
+        text = completion_text(body)
+        model = body.get("model", "mock")
+        completion_id = "chatcmpl-%s" % uuid.uuid4().hex
+        created = int(time.time())
+        stats["ok"] += 1
+
+        if body.get("stream"):
+            stats["streamed"] += 1
+            return StreamingResponse(
+                stream_chunks(text, model, completion_id, created, settings.tokens_per_second),
+                media_type="text/event-stream"
+            )
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": usage(body, text),
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+async def stream_chunks(text: str, model: str, completion_id: str, created: int, tokens_per_second: float):
+    """Server-sent events in the OpenAI chunk format, one word per chunk."""
+    def chunk(delta: dict, finish_reason=None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return "data: %s\n\n" % json.dumps(payload)
+
+    yield chunk({"role": "assistant", "content": ""})
+    delay = 1 / tokens_per_second if tokens_per_second > 0 else 0
+    for word in text.split(" "):
+        await asyncio.sleep(delay)
+        yield chunk({"content": word + " "})
+    yield chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MockSettings()
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default=defaults.latency)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-jitter", type=float, default=defaults.latency_jitter)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit", type=float, default=defaults.rate_limit)
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate)
+    parser.add_argument("--retry-after", type=int, default=defaults.retry_after)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_jitter=args.latency_jitter,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run an offline OpenAI-compatible mock provider.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    print("Mock provider on http://%s:%d/v1/" % (args.host, args.port))
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port, log_level="warning")
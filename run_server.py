@@ -1,13 +1,121 @@
 """
 Startup script for the API server.
+
+    python run_server.py                                  # development: one worker, auto-reload
+    python run_server.py --prod [--workers 4] [--port 8000] [--graceful-timeout 30]
+
+Production mode binds the socket and imports the app once in the parent,
+preloads shared read-only state (api_server.preload), then forks the workers so
+they start warm and share that memory copy-on-write. SIGTERM/SIGINT drain the
+server: workers stop accepting connections and finish in-flight requests (up
+to --graceful-timeout) before exiting. Workers that crash are restarted.
+Platforms without fork fall back to uvicorn's own (spawned) workers.
 """
+import argparse
+import os
+import signal
+import time
+
 import uvicorn
 
+from src.utils.config import Config
+
+APP = "src.apis.api_server:app"
+RESTART_DELAY = 1.0  # Seconds before replacing a crashed worker
+PROD_SCHEDULER_SHARED_DIR = "./data/scheduler"  # Workers share provider quota unless SCHEDULER_SHARED_DIR is set
+
+
+def run_dev(args):
+    uvicorn.run(APP, host=args.host, port=args.port, reload=True, log_level="info")
+
+
+def run_prod(args):
+    # Several workers on one host: share provider slots between them (and with any
+    # process started from this environment). An explicit empty value keeps it off.
+    if "SCHEDULER_SHARED_DIR" not in os.environ:
+        os.environ["SCHEDULER_SHARED_DIR"] = Config.SCHEDULER_SHARED_DIR = PROD_SCHEDULER_SHARED_DIR
+
+    config = uvicorn.Config(
+        APP,
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+    if not hasattr(os, "fork"):
+        uvicorn.run(APP, host=args.host, port=args.port, workers=args.workers,
+                    log_level=args.log_level, timeout_graceful_shutdown=args.graceful_timeout)
+        return
+
+    sock = config.bind_socket()
+
+    from src.apis import api_server
+    api_server.preload()
+
+    workers = {}
+    stopping = {"since": None}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Worker: uvicorn installs its own SIGTERM/SIGINT handlers (graceful shutdown)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        if stopping["since"] is None:
+            stopping["since"] = time.monotonic()
+            print(f"Draining {len(workers)} worker(s) (up to {args.graceful_timeout:.0f}s)...")
+            for pid in workers:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        spawn()
+    print(f"Serving {APP} on http://{args.host}:{args.port} with {args.workers} worker(s)")
+
+    while workers:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            since = stopping["since"]
+            if since is not None and time.monotonic() - since > args.graceful_timeout + 5:
+                for straggler in list(workers):
+                    os.kill(straggler, signal.SIGKILL)
+            time.sleep(0.1)
+            continue
+
+        workers.pop(pid, None)
+        if stopping["since"] is None:
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            time.sleep(RESTART_DELAY)
+            spawn()
+
+    sock.close()
+    print("All workers stopped.")
+
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "src.apis.api_server:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the API server.")
+    parser.add_argument("--prod", action="store_true", help="Multi-worker production mode (no reload)")
+    parser.add_argument("--host", default=Config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=Config.SERVER_WORKERS)
+    parser.add_argument("--graceful-timeout", type=float, default=Config.GRACEFUL_TIMEOUT)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    if args.prod:
+        run_prod(args)
+    else:
+        run_dev(args)
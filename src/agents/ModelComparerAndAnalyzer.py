@@ -1,97 +1,40 @@
-# In your terminal, first run:
+"""
+Compare Gemini and Grok on one question, judged by both models.
 
-# pip3 install openai
+Thin script over the tournament engine (src/agents/tournament.py): answers and
+verdicts are cached, competitors run concurrently and judges in parallel.
+"""
+from src.agents.gemini_agent import GeminiAgent
+from src.agents.xai_agent import XAIAgent
+from src.agents.tournament import Tournament
 
-import os
-import json
-import httpx
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# 1. Google
-BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
-API_KEY = os.getenv("GOOGLE_API_KEY")
-model_name = os.getenv("GEMINI_MODEL")
-gemini = OpenAI(base_url=BASE_URL, api_key=API_KEY)
-competitors = []
-answers = []
 question = "Why is India struggling with it's economy improvements despite having a very high talent pool?"
-customMessages = [{"role": "user", "content": question}]
-
-response = gemini.chat.completions.create(model=model_name, messages = customMessages)
-answer = response.choices[0].message.content
 
-# print(answer)
-competitors.append(model_name)
-answers.append(answer)
+gemini = GeminiAgent()
+grok = XAIAgent()
 
-# 2. Grok
-BASE_URL = "https://api.x.ai/v1"
-API_KEY = os.getenv("XAI_API_KEY")
-model_name = "grok-4-1-fast-reasoning"
-grok = OpenAI(base_url=BASE_URL, api_key=API_KEY)
-response = grok.chat.completions.create(model=model_name, messages = customMessages)
-answer = response.choices[0].message.content
+tournament = Tournament(
+    competitors={gemini.model_name: gemini, grok.model_name: grok},
+    judges={grok.model_name: grok, gemini.model_name: gemini}
+)
+result = tournament.run(question, method="borda")
 
-# print(answer)
-competitors.append(model_name)
-answers.append(answer)
+print(result.competitors)
 
-print(competitors)
-# print(answers)
-
-for competitor, answer in zip(competitors, answers):
+for competitor, answer in result.answers.items():
     print(f"Competitor: {competitor}\n\n{answer}")
-together = ""
-for index, answer in enumerate(answers):
-    together += f"# Response from competitor {index+1}\n\n"
-    together += answer + "\n\n"
-
-judge = f"""You are judging a competition between {len(competitors)} competitors.
-Each model has been given this question:
-
-{question}
-
-Your job is to evaluate each response for clarity and strength of argument, and rank them in order of best to worst.
-Respond with JSON, and only JSON, with the following format:
-{{"results": ["best competitor number", "second best competitor number", "third best competitor number", ...]}}
-
-Here are the responses from each competitor:
-
-{together}
-
-Now respond with the JSON with the ranked order of the competitors, nothing else. Do not include markdown formatting or code blocks."""
-
-judge_messages = [{"role": "user", "content": judge}]
-
-response = grok.chat.completions.create(model=model_name, messages = judge_messages)
-
-results = response.choices[0].message.content
-print(results)
-
-
-results_dict = json.loads(results)
-ranks = results_dict["results"]
-for index, result in enumerate(ranks):
-    competitor = competitors[int(result)-1]
-    print(f"Rank {index+1}: {competitor}")
-
-#Print a lengthy line about 40 dashes.
-print("-" * 40)
-#Check Gemini the ranking and print.
-model_name = os.getenv("GEMINI_MODEL")
-response = gemini.chat.completions.create(model=model_name, messages = judge_messages)
-
-results = response.choices[0].message.content
-print(results)
 
-results_dict = json.loads(results)
-ranks = results_dict["results"]
-for index, result in enumerate(ranks):
-    competitor = competitors[int(result) - 1]
-    print(f"Rank {index + 1}: {competitor}")
+for judge, ranking in result.judge_rankings.items():
+    #Print a lengthy line about 40 dashes.
+    print("-" * 40)
+    print(f"Judge: {judge}")
+    for index, competitor in enumerate(ranking):
+        print(f"Rank {index + 1}: {competitor}")
+
+print("=" * 40)
+print(f"Consensus ({result.method}):")
+for index, competitor in enumerate(result.consensus):
+    print(f"Rank {index + 1}: {competitor} ({result.scores[competitor]:.0f} points)")
 
 
 
@@ -1,9 +1,13 @@
 """
 Gemini AI agent implementation.
 """
-from openai import OpenAI
+import threading
 from typing import Dict, Any, List, Union, Type, Optional
 from src.utils.config import Config
+from src.utils.metrics import provider_async_http_client, provider_call, provider_http_client, record_usage
+from src.utils.scheduler import provider_aslot, provider_slot
+from src.utils.tracing import span
+from src.utils.structured_output import parse_structured
 from pydantic import BaseModel
 
 
@@ -19,11 +23,38 @@ class GeminiAgent:
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY is not set. Please check your .env file.")
 
-        # Initialize OpenAI client with Gemini endpoint
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=Config.GEMINI_BASE_URL
-        )
+        # OpenAI client with Gemini endpoint, created on first use (see `client`)
+        self._client = None
+        self._async_client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """OpenAI-compatible client, created (and openai imported) on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=self.api_key,
+                        base_url=Config.GEMINI_BASE_URL,
+                        http_client=provider_http_client(self.model_name)  # Counts every HTTP status, retries included
+                    )
+        return self._client
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI client for agenerate(), created on first use (bound to that event loop)."""
+        if self._async_client is None:
+            with self._client_lock:
+                if self._async_client is None:
+                    from openai import AsyncOpenAI
+                    self._async_client = AsyncOpenAI(
+                        api_key=self.api_key,
+                        base_url=Config.GEMINI_BASE_URL,
+                        http_client=provider_async_http_client(self.model_name)
+                    )
+        return self._async_client
 
     def generate(
         self,
@@ -53,18 +84,63 @@ class GeminiAgent:
 
         try:
             # Use OpenAI SDK's chat completion method
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
-                max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
-            )
+            with span("gemini.request", model=self.model_name) as current, \
+                    provider_slot(self.model_name), provider_call(self.model_name):
+                response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
+                    max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
+                )
+                usage = response.usage.model_dump() if response.usage else None
+                record_usage(self.model_name, usage)
+                if usage:
+                    current.set(total_tokens=usage["total_tokens"])
+
+            return {
+                "text": response.choices[0].message.content,
+                "model": self.model_name,
+                "metadata": {
+                    "usage": usage,
+                    "finish_reason": response.choices[0].finish_reason,
+                    **kwargs
+                }
+            }
+        except Exception as e:
+            print(f"Error calling Gemini API: {e}")
+            raise
+
+    async def agenerate(
+        self,
+        query: Union[str, List[Dict[str, str]]],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        generate() without blocking the event loop. Cancelling the awaiting task
+        aborts the HTTP request (and frees its scheduler slot) straight away.
+        """
+        messages = [{"role": "user", "content": query}] if isinstance(query, str) else query
+
+        try:
+            with span("gemini.request", model=self.model_name) as current:
+                async with provider_aslot(self.model_name):
+                    with provider_call(self.model_name):
+                        response = await self.async_client.chat.completions.create(
+                            model=self.model_name,
+                            messages=messages,
+                            temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
+                            max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
+                        )
+                usage = response.usage.model_dump() if response.usage else None
+                record_usage(self.model_name, usage)
+                if usage:
+                    current.set(total_tokens=usage["total_tokens"])
 
             return {
                 "text": response.choices[0].message.content,
                 "model": self.model_name,
                 "metadata": {
-                    "usage": response.usage.model_dump() if response.usage else None,
+                    "usage": usage,
                     "finish_reason": response.choices[0].finish_reason,
                     **kwargs
                 }
@@ -86,24 +162,27 @@ class GeminiAgent:
         messages = [{"role": "user", "content": query}] if isinstance(query, str) else query
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": response_format.__name__,
-                        "schema": response_format.model_json_schema()
-                    }
-                },
-                temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
-                max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
-            )
+            with span("gemini.request", model=self.model_name, structured=response_format.__name__), \
+                    provider_slot(self.model_name), provider_call(self.model_name):
+                response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {
+                            "name": response_format.__name__,
+                            "schema": response_format.model_json_schema()
+                        }
+                    },
+                    temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
+                    max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
+                )
 
+            record_usage(self.model_name, response.usage.model_dump() if response.usage else None)
             raw_text = response.choices[0].message.content
             print(f"Response: {raw_text}")
-            return response_format.parse_raw(raw_text)
-            return response_format.model_validate_json(raw_text)
+            with span("gemini.parse_structured"):
+                return parse_structured(raw_text, response_format)
 
         except Exception as e:
             print(f"Error calling Gemini structured API: {e}")
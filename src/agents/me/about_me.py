@@ -1,27 +1,40 @@
 """
 Gradio chatbot for Tony Gregg's personal website.
 """
+import asyncio
+
 from dotenv import load_dotenv
-import gradio as gr
 
 from src.agents.gemini_agent import GeminiAgent
 from src.utils.cache import LLMCache
 from src.utils.config import Config
-from src.agents.me.profile_loader import profile   # ← Import shared profile
+from src.utils.lazy import Lazy
+from src.utils.session_limits import SessionLimited, SessionLimiter
+from src.agents.me.profile_store import profile_store   # ← Resolve personas by profile ID
 
 load_dotenv()
 
 # -----------------------------------------------------------------------------
-# Initialize agent & cache (once)
+# Agent & cache (built once, on the first chat message)
+# -----------------------------------------------------------------------------
+cache = Lazy(lambda: LLMCache(cache_dir=str(Config.CACHE_DIR)))
+agent = Lazy(GeminiAgent)
+session_limits = SessionLimiter()
+
+# -----------------------------------------------------------------------------
+# Example questions (shown in the UI)
 # -----------------------------------------------------------------------------
-cache = LLMCache(cache_dir=str(Config.CACHE_DIR))
-agent = GeminiAgent()
+EXAMPLES = [
+    "Can you tell me about your experience with cloud architecture?",
+    "What kind of projects have you worked on recently?",
+    "Are you open to new opportunities in 2025?",
+]
 
 
 # -----------------------------------------------------------------------------
 # Chat function
 # -----------------------------------------------------------------------------
-def chat_with_tony(message: str, history: list):
+def build_messages(message: str, history: list, profile) -> list:
     messages = [{"role": "system", "content": profile.system_prompt}]  # ← Use profile
 
     for entry in history:
@@ -29,14 +42,75 @@ def chat_with_tony(message: str, history: list):
             messages.append({"role": entry["role"], "content": entry["content"]})
 
     messages.append({"role": "user", "content": message})
+    return messages
+
+
+def cache_key(message: str, history: list, profile) -> str:
+    """Cache key of this turn's answer (as stored by answer())."""
+    messages = build_messages(message, history, profile)
+    return cache._generate_key(agent.model_name, messages, profile_id=profile.profile_id)
+
+
+def is_cached(message: str, history: list, profile) -> bool:
+    """Whether this turn would be answered from the cache."""
+    messages = build_messages(message, history, profile)
+    return cache.get(agent.model_name, messages, profile_id=profile.profile_id) is not None
+
+
+def answer(message: str, history: list, profile) -> dict:
+    """The chatbot's response dict for one turn (cached); provider errors are raised."""
+    return cache.cached_api_call(
+        model_name=agent.model_name,
+        query=build_messages(message, history, profile),
+        api_function=agent.generate,
+        tag=f"profile:{profile.profile_id}",
+        key_kwargs={"profile_id": profile.profile_id}  # Keep personas apart in the cache
+    )
+
+
+async def aanswer(message: str, history: list, profile) -> dict:
+    """answer() on the event loop; cancelling it cancels the provider call."""
+    return await cache.acached_api_call(
+        model_name=agent.model_name,
+        query=build_messages(message, history, profile),
+        api_function=agent.agenerate,
+        tag=f"profile:{profile.profile_id}",
+        key_kwargs={"profile_id": profile.profile_id}
+    )
+
+
+def chat_with_tony(message: str, history: list, profile_id: str = None):
+    try:
+        profile = profile_store.get(profile_id)
+    except (ValueError, FileNotFoundError) as e:
+        return f"I'm sorry, I couldn't find that profile: {str(e)}"
+
+    try:
+        return answer(message, history, profile)["text"]
+    except Exception as e:
+        return f"I'm sorry, something went wrong: {str(e)}"
+
+
+async def achat_with_tony(message: str, history: list, profile_id: str = None, session_id: str = None):
+    """
+    Async chat handler: waits for the provider without holding a thread, so
+    slow answers don't serialize concurrent visitors. Turns are limited per
+    session; Gradio's Stop button cancels this coroutine and with it the
+    in-flight provider call. Blocking work (parsing a résumé on first use,
+    cache lookups) runs in threads, off the event loop.
+    """
+    try:
+        profile = await asyncio.to_thread(profile_store.get, profile_id)
+    except (ValueError, FileNotFoundError) as e:
+        return f"I'm sorry, I couldn't find that profile: {str(e)}"
+    if not cache.is_loaded:
+        await asyncio.to_thread(cache.resolve)  # First use opens the cache database
 
     try:
-        response = cache.cached_api_call(
-            model_name=agent.model_name,
-            query=messages,
-            api_function=agent.generate
-        )
-        return response["text"]
+        with session_limits.turn(session_id or "anonymous"):
+            return (await aanswer(message, history, profile))["text"]
+    except SessionLimited as e:
+        return e.detail
     except Exception as e:
         return f"I'm sorry, something went wrong: {str(e)}"
 
@@ -45,21 +119,32 @@ def chat_with_tony(message: str, history: list):
 # Launch Gradio
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
+    import gradio as gr
+
+    profile = profile_store.get()
     print(f"Starting {profile.name}'s chatbot...")
 
+    async def chat(message: str, history: list, profile_id: str, request: gr.Request):
+        return await achat_with_tony(message, history, profile_id, session_id=request.session_hash)
+
     demo = gr.ChatInterface(
-        fn=chat_with_tony,
+        fn=chat,
+        additional_inputs=[
+            gr.Dropdown(
+                choices=profile_store.list_profiles(),
+                value=profile_store.default_profile_id,
+                label="Profile",
+            )
+        ],
         title=f"Chat with {profile.name}",
         description="Ask me anything about my career, experience, or skills!",
-        examples=[
-            "Can you tell me about your experience with cloud architecture?",
-            "What kind of projects have you worked on recently?",
-            "Are you open to new opportunities in 2025?",
-        ],
+        examples=[[example, profile_store.default_profile_id] for example in EXAMPLES],
         cache_examples=False,
         submit_btn="Send",
         stop_btn="Stop",
+        concurrency_limit=Config.CHAT_CONCURRENCY,  # Async turns: no thread each, so this can exceed max_threads
     )
+    demo.queue(max_size=Config.CHAT_QUEUE_SIZE)  # Beyond this, new turns are refused instead of waiting forever
 
     demo.launch(
         server_name="localhost",
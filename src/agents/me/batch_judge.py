@@ -0,0 +1,178 @@
+"""
+Batch judge - packs several question/answer pairs into one judge request.
+Shared between gap_analyzer.py and response-evaluator.py.
+
+The per-item judge prompt repeats the full resume and summary for every
+question. In batch mode the profile context is sent once per batch of k items,
+the judge returns a JSON list, and each entry is validated on its own. Items
+that are missing or fail validation are re-judged individually.
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from src.utils.structured_output import extract_json
+
+# (question, answer_text)
+Pair = Tuple[str, str]
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough token estimate (~4 characters per token) for prompt size reporting."""
+    return sum(len(m.get("content", "")) for m in messages) // 4
+
+
+def format_items(pairs: List[Pair]) -> str:
+    """Render pairs as numbered items for a batch prompt."""
+    blocks = []
+    for index, (question, answer) in enumerate(pairs, 1):
+        blocks.append(
+            f"### Item {index}\n"
+            f"Question: {question}\n"
+            f"Response:\n{answer}\n"
+        )
+    return "\n".join(blocks)
+
+
+def output_instructions(item_model: Type[BaseModel], exclude: Tuple[str, ...] = ()) -> str:
+    """Describe the expected JSON list format for the judge."""
+    fields = {
+        name: field.annotation.__name__ if hasattr(field.annotation, "__name__") else str(field.annotation)
+        for name, field in item_model.model_fields.items()
+        if name not in exclude
+    }
+    example = ", ".join(f'"{name}": <{kind}>' for name, kind in fields.items())
+    return f"""You MUST respond with ONLY a valid JSON object in this exact format:
+{{"items": [{{"index": <item number>, {example}}}, ...]}}
+
+Include exactly one entry per item, using the item numbers given.
+Do NOT include any text outside the JSON object and do NOT use markdown code blocks."""
+
+
+class BatchStats:
+    """Counts judge calls and prompt tokens, against what the per-item path would have sent."""
+
+    def __init__(self):
+        self.batch_calls = 0
+        self.batch_tokens = 0
+        self.fallback_calls = 0
+        self.fallback_tokens = 0
+        self.per_item_calls = 0
+        self.per_item_tokens = 0
+        self._lock = threading.Lock()  # Batches may be judged from several runner threads
+
+    def add(self, kind: str, messages: List[Dict[str, str]]):
+        """Record one call of `kind` ("batch", "fallback" or "per_item") and its prompt size."""
+        with self._lock:
+            setattr(self, f"{kind}_calls", getattr(self, f"{kind}_calls") + 1)
+            setattr(self, f"{kind}_tokens", getattr(self, f"{kind}_tokens") + estimate_tokens(messages))
+
+    def report(self) -> Dict[str, Any]:
+        calls = self.batch_calls + self.fallback_calls
+        tokens = self.batch_tokens + self.fallback_tokens
+        return {
+            "judge_calls": calls,
+            "prompt_tokens": tokens,
+            "retried_items": self.fallback_calls,
+            "per_item_calls": self.per_item_calls,
+            "per_item_prompt_tokens": self.per_item_tokens,
+            "calls_saved_pct": round(100 * (1 - calls / self.per_item_calls), 1) if self.per_item_calls else 0.0,
+            "tokens_saved_pct": round(100 * (1 - tokens / self.per_item_tokens), 1) if self.per_item_tokens else 0.0,
+        }
+
+    def print_report(self):
+        r = self.report()
+        print(f"Batched judging: {r['judge_calls']} calls (~{r['prompt_tokens']} prompt tokens, "
+              f"{r['retried_items']} re-judged individually)")
+        print(f"Per-item judging would use: {r['per_item_calls']} calls (~{r['per_item_prompt_tokens']} prompt tokens)")
+        print(f"Saved: {r['calls_saved_pct']}% calls, {r['tokens_saved_pct']}% prompt tokens")
+
+
+class BatchJudge:
+    """Judges question/answer pairs k at a time, re-judging failed items one by one."""
+
+    def __init__(
+            self,
+            item_model: Type[BaseModel],
+            build_batch_messages: Callable[[List[Pair]], List[Dict[str, str]]],
+            build_single_messages: Callable[[str, str], List[Dict[str, str]]],
+            call: Callable[[List[Dict[str, str]]], Dict[str, Any]],
+            fallback: Callable[[str, str], BaseModel],
+            item_fields: Optional[Callable[[str, str], Dict[str, Any]]] = None,
+            batch_size: int = 5
+    ):
+        """
+        Args:
+            item_model: Pydantic model each item is validated against.
+            build_batch_messages: Builds the batch prompt (profile context once + items).
+            build_single_messages: Builds the per-item prompt (only used for reporting).
+            call: Sends messages to the judge, returns the agent response dict.
+            fallback: Per-item judge used for items that fail in the batch.
+            item_fields: Known fields to merge into each item (e.g. the original question).
+            batch_size: Items per judge request.
+        """
+        self.item_model = item_model
+        self.build_batch_messages = build_batch_messages
+        self.build_single_messages = build_single_messages
+        self.call = call
+        self.fallback = fallback
+        self.item_fields = item_fields or (lambda question, answer: {})
+        self.batch_size = max(1, batch_size)
+        self.stats = BatchStats()
+
+    def judge(self, pairs: List[Pair]) -> List[BaseModel]:
+        """Judge all pairs, preserving order."""
+        results = []
+        for start in range(0, len(pairs), self.batch_size):
+            results.extend(self.judge_batch(pairs[start:start + self.batch_size]))
+        return results
+
+    def judge_batch(self, pairs: List[Pair]) -> List[BaseModel]:
+        """Judge up to `batch_size` pairs in a single request."""
+        for question, answer in pairs:
+            self.stats.add("per_item", self.build_single_messages(question, answer))
+
+        messages = self.build_batch_messages(pairs)
+        self.stats.add("batch", messages)
+
+        entries = {}
+        try:
+            raw = self.call(messages)["text"]
+            entries = self._parse_entries(raw)
+        except Exception as e:
+            print(f"Batch judge failed, re-judging {len(pairs)} items individually: {e}")
+
+        results = []
+        for index, (question, answer) in enumerate(pairs, 1):
+            result = None
+            entry = entries.get(index)
+            if entry is not None:
+                try:
+                    result = self.item_model.model_validate({**entry, **self.item_fields(question, answer)})
+                except ValidationError as e:
+                    print(f"  Item {index} failed validation, re-judging: {e.error_count()} error(s)")
+
+            if result is None:
+                self.stats.add("fallback", self.build_single_messages(question, answer))
+                result = self.fallback(question, answer)
+            results.append(result)
+
+        return results
+
+    @staticmethod
+    def _parse_entries(raw_text: str) -> Dict[int, Dict[str, Any]]:
+        """Parse the judge output into {item number: entry}."""
+        data = extract_json(raw_text, accept=lambda value: isinstance(value, dict) and "items" in value)
+        items = data.get("items", []) if isinstance(data, dict) else data
+
+        entries = {}
+        for entry in items:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.pop("index"))
+            except (KeyError, TypeError, ValueError):
+                continue
+            entries[index] = entry
+        return entries
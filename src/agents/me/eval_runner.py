@@ -0,0 +1,218 @@
+"""
+Evaluation runner - pipelines answer generation and judging across questions.
+Shared between gap_analyzer.py and response-evaluator.py.
+
+Each question goes through two provider calls: answer, then judge. Instead of
+running them strictly one question at a time, the runner keeps a bounded number
+of calls in flight per provider and starts judging a question as soon as its
+answer arrives. Results come back in input order, so the output is the same as
+a sequential run. Completed items are checkpointed to a JSONL file, so an
+interrupted run resumes where it stopped.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from src.utils.config import Config
+from src.utils.scheduler import BATCH, prioritized
+from src.utils.tracing import bind
+
+# A stage is (provider name, function). Calls to the same provider share a limit.
+Stage = Tuple[str, Callable]
+
+
+class EvalItem(BaseModel):
+    """One evaluated question: the answer dict from the agent and the judge's verdict."""
+    index: int
+    question: str
+    answer: Dict[str, Any]
+    result: Any
+
+
+class EvaluationRunner:
+    """Runs answer -> judge pipelines with bounded concurrency per provider."""
+
+    def __init__(
+            self,
+            provider_limits: Dict[str, int] = None,
+            default_limit: int = None,
+            runs_dir: Path = None,
+            priority: str = BATCH
+    ):
+        self.provider_limits = provider_limits or {}
+        self.priority = priority  # Scheduler class of the provider calls (see src/utils/scheduler.py)
+        self.default_limit = default_limit or Config.EVAL_CONCURRENCY
+        self.runs_dir = Path(runs_dir) if runs_dir else Config.EVAL_RUNS_DIR
+
+    def limit(self, provider: str) -> int:
+        return max(1, self.provider_limits.get(provider, self.default_limit))
+
+    # -------------------------------------------------------------------------
+    # Checkpointing
+    # -------------------------------------------------------------------------
+    def checkpoint_path(self, run_name: str, item_keys: List[str]) -> Path:
+        # Tie the checkpoint to every item's inputs (question, profile, model,
+        # prompt version), so a run with any of them changed starts fresh
+        digest = hashlib.md5(json.dumps(item_keys).encode()).hexdigest()[:12]
+        return self.runs_dir / f"{run_name}_{digest}.jsonl"
+
+    def _load_checkpoint(
+            self,
+            path: Path,
+            questions: List[str],
+            result_model: Type[BaseModel]
+    ) -> Dict[int, EvalItem]:
+        done = {}
+        if not path.exists():
+            return done
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial last line from an interrupted write
+                index = data.get("index")
+                if isinstance(index, int) and index < len(questions) and questions[index] == data.get("question"):
+                    data["result"] = result_model.model_validate(data["result"])
+                    done[index] = EvalItem(**data)
+        return done
+
+    # -------------------------------------------------------------------------
+    # Run
+    # -------------------------------------------------------------------------
+    def run(
+            self,
+            questions: List[str],
+            answer: Stage,
+            judge: Stage,
+            result_model: Type[BaseModel],
+            run_name: Optional[str] = None,
+            judge_batch_size: int = 1,
+            item_keys: Optional[List[str]] = None
+    ) -> List[EvalItem]:
+        """
+        Answer and judge every question.
+
+        Args:
+            questions: Questions to evaluate.
+            answer: (provider, fn) where fn(question) returns the agent's response dict.
+            judge: (provider, fn) where fn(question, answer_text) returns a `result_model`.
+            result_model: Pydantic model returned by the judge (used to reload checkpoints).
+            run_name: Enables checkpointing under Config.EVAL_RUNS_DIR when given.
+                Runs that may overlap (e.g. background jobs) need distinct names.
+            judge_batch_size: When > 1, the judge fn takes a list of (question, answer_text)
+                pairs and returns a list of results; answers are buffered into
+                batches of this size (see batch_judge.py).
+            item_keys: Per-question input keys (see results_store.input_key) that
+                name the checkpoint; defaults to the questions themselves.
+
+        Returns:
+            List of EvalItem in the same order as `questions`.
+        """
+        answer_provider, answer_fn = answer
+        judge_provider, judge_fn = judge
+        answer_fn = prioritized(self.priority, answer_fn)
+        judge_fn = prioritized(self.priority, judge_fn)
+
+        results: Dict[int, EvalItem] = {}
+        checkpoint = None
+        if run_name:
+            checkpoint = self.checkpoint_path(run_name, item_keys or questions)
+            results = self._load_checkpoint(checkpoint, questions, result_model)
+            if results:
+                print(f"↻ Resuming {run_name}: {len(results)}/{len(questions)} already done")
+            checkpoint.parent.mkdir(parents=True, exist_ok=True)
+
+        todo = iter([i for i in range(len(questions)) if i not in results])
+        total = len(questions)
+        completed_before = len(results)
+        start = time.perf_counter()
+
+        # One pool per provider: its size is that provider's concurrency limit
+        pools = {
+            provider: ThreadPoolExecutor(max_workers=self.limit(provider), thread_name_prefix=f"eval-{provider}")
+            for provider in {answer_provider, judge_provider}
+        }
+        pending = {}
+        batch = []  # Answered (index, answer) pairs waiting for a batch judge call
+        state = {"answers_in_flight": 0, "todo_exhausted": False}
+
+        def submit_next_answer():
+            index = next(todo, None)
+            if index is None:
+                state["todo_exhausted"] = True
+                return
+            future = pools[answer_provider].submit(bind(answer_fn), questions[index])
+            pending[future] = ("answer", index, None)
+            state["answers_in_flight"] += 1
+
+        def flush_batch():
+            pairs = [(questions[index], answer_data["text"]) for index, answer_data in batch]
+            future = pools[judge_provider].submit(bind(judge_fn), pairs)
+            pending[future] = ("batch", None, list(batch))
+            batch.clear()
+
+        try:
+            # Keep only a window of answers in flight, so judging of early
+            # questions is not queued behind every remaining answer
+            for _ in range(self.limit(answer_provider)):
+                submit_next_answer()
+
+            out = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+
+            def record(index, answer_data, result):
+                item = EvalItem(index=index, question=questions[index], answer=answer_data, result=result)
+                results[index] = item
+                if out:
+                    out.write(item.model_dump_json() + "\n")
+                    out.flush()
+                self._print_progress(len(results), total, completed_before, start, item.question)
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, index, payload = pending.pop(future)
+                        if stage == "answer":
+                            state["answers_in_flight"] -= 1
+                            answer_data = future.result()
+                            submit_next_answer()
+                            if judge_batch_size > 1:
+                                batch.append((index, answer_data))
+                                no_more_answers = state["todo_exhausted"] and state["answers_in_flight"] == 0
+                                if len(batch) >= judge_batch_size or no_more_answers:
+                                    flush_batch()
+                            else:
+                                judge_future = pools[judge_provider].submit(
+                                    bind(judge_fn), questions[index], answer_data["text"]
+                                )
+                                pending[judge_future] = ("judge", index, answer_data)
+                        elif stage == "batch":
+                            for (batch_index, answer_data), result in zip(payload, future.result()):
+                                record(batch_index, answer_data, result)
+                        else:
+                            record(index, payload, future.result())
+            finally:
+                if out:
+                    out.close()
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        if checkpoint and checkpoint.exists():
+            checkpoint.unlink()  # Finished: nothing left to resume
+
+        return [results[i] for i in range(total)]
+
+    @staticmethod
+    def _print_progress(done: int, total: int, completed_before: int, start: float, question: str):
+        elapsed = time.perf_counter() - start
+        rate = (done - completed_before) / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        print(f"  [{done}/{total}] ✓ {question[:60]}  ({rate:.2f} q/s, ETA {eta:.0f}s)")
@@ -2,18 +2,23 @@
 Gap Analyzer - Identifies questions that cannot be answered from resume content.
 Helps identify what information is missing from your profile.
 """
-from typing import List
+from typing import Any, List, Optional, Tuple
 from src.agents.gemini_agent import GeminiAgent
 from src.utils.cache import LLMCache
 from src.utils.config import Config
+from src.utils.lazy import Lazy
 from src.agents.me.profile_loader import profile
 from src.models.response_log import ResponseLog
+from src.agents.me.eval_runner import EvaluationRunner
+from src.agents.me.prescreen import ResumeIndex, prescreen
+from src.agents.me.results_store import ResultsStore, diff_results, input_key
+from src.agents.me.batch_judge import BatchJudge, format_items, output_instructions
 
 # -----------------------------------------------------------------------------
 # Initialize
 # -----------------------------------------------------------------------------
-cache = LLMCache(cache_dir=str(Config.CACHE_DIR))
-gemini = GeminiAgent()
+cache = Lazy(lambda: LLMCache(cache_dir=str(Config.CACHE_DIR)))
+gemini = Lazy(GeminiAgent)
 
 # -----------------------------------------------------------------------------
 # Test Questions (mix of answerable and unanswerable)
@@ -47,30 +52,38 @@ TEST_QUESTIONS = [
 # -----------------------------------------------------------------------------
 # Analyzer Functions
 # -----------------------------------------------------------------------------
-def analyze_question(question: str) -> ResponseLog:
-    """
-    Ask the chatbot a question and have the LLM self-evaluate if it could answer.
-    """
-    # Get the chatbot's response
+def get_chat_response(question: str) -> dict:
+    """Ask the chatbot a question (cached)."""
     chat_messages = [
         {"role": "system", "content": profile.system_prompt},
         {"role": "user", "content": question}
     ]
 
-    chat_response = cache.cached_api_call(
+    # Key on the full context: the system prompt embeds the resume, so edits invalidate answers
+    return cache.cached_api_call(
         model_name=gemini.model_name,
         query=chat_messages,
-        api_function=gemini.generate
+        api_function=gemini.generate,
+        use_full_context=True,
+        tag="gap_analysis"
     )
 
-    # Have the LLM evaluate if it could answer based on the resume
-    eval_messages = [
-        {
-            "role": "system",
-            "content": """You are evaluating whether an AI assistant could 
+
+# Bump when the judge prompts change, so stored results are recomputed
+JUDGE_PROMPT_VERSION = "1"
+
+JUDGE_SYSTEM_PROMPT = """You are evaluating whether an AI assistant could 
 answer a question based solely on the provided resume/profile information.
 Determine if the response was based on actual resume content or if the 
 assistant had to make assumptions, deflect, or say it didn't know."""
+
+
+def build_judge_messages(question: str, response_text: str) -> list:
+    """Build the per-question judge prompt."""
+    return [
+        {
+            "role": "system",
+            "content": JUDGE_SYSTEM_PROMPT
         },
         {
             "role": "user",
@@ -85,7 +98,7 @@ assistant had to make assumptions, deflect, or say it didn't know."""
 {question}
 
 ## Response Given:
-{chat_response["text"]}
+{response_text}
 
 ## Your Task:
 Evaluate if the response could be confidently answered from the resume/summary content.
@@ -99,6 +112,45 @@ If could_answer is false, briefly explain what information is missing.
         }
     ]
 
+
+def build_batch_judge_messages(pairs: list) -> list:
+    """Build one judge prompt for several (question, response) pairs, with the resume once."""
+    return [
+        {
+            "role": "system",
+            "content": f"""{JUDGE_SYSTEM_PROMPT}
+
+{output_instructions(ResponseLog, exclude=("query", "response"))}"""
+        },
+        {
+            "role": "user",
+            "content": f"""
+## Resume Content Available:
+{profile.resume_content}
+
+## Summary Available:
+{profile.summary}
+
+## Questions and Responses:
+{format_items(pairs)}
+
+## Your Task:
+For each item, evaluate if the response could be confidently answered from the resume/summary content.
+
+could_answer should be:
+- true: if the resume contains the information needed to answer
+- false: if the assistant had to say "I don't know", make assumptions, or the resume lacks this info
+
+If could_answer is false, give the reason: briefly explain what information is missing.
+"""
+        }
+    ]
+
+
+def judge_response(question: str, response_text: str) -> ResponseLog:
+    """Have the LLM evaluate if the chatbot could answer based on the resume."""
+    eval_messages = build_judge_messages(question, response_text)
+
     # Get structured evaluation
     log = gemini.generate_structured(
         query=eval_messages,
@@ -108,22 +160,133 @@ If could_answer is false, briefly explain what information is missing.
     return log
 
 
-def run_gap_analysis():
+def make_batch_judge(batch_size: int) -> BatchJudge:
+    """Batched mode: k questions per judge call, failed items re-judged one by one.
+    Built per run, so concurrent runs don't share a batch size or stats."""
+    return BatchJudge(
+        item_model=ResponseLog,
+        build_batch_messages=build_batch_judge_messages,
+        build_single_messages=build_judge_messages,
+        call=lambda messages: cache.cached_api_call(
+            model_name=gemini.model_name,
+            query=messages,
+            api_function=gemini.generate,
+            use_full_context=True,
+            tag="gap_analysis"
+        ),
+        fallback=judge_response,
+        item_fields=lambda question, response_text: {"query": question, "response": response_text},
+        batch_size=batch_size
+    )
+
+
+def judge_responses_batch(pairs: list, batch_judge: BatchJudge = None) -> List[ResponseLog]:
+    """Judge a list of (question, response) pairs in batched judge calls."""
+    return (batch_judge or make_batch_judge(len(pairs))).judge(pairs)
+
+
+def analyze_question(question: str) -> ResponseLog:
+    """
+    Ask the chatbot a question and have the LLM self-evaluate if it could answer.
+    """
+    chat_response = get_chat_response(question)
+    return judge_response(question, chat_response["text"])
+
+
+def run_gap_analysis(
+        concurrency: int = None,
+        run_name: str = "gap_analysis",
+        batch_size: int = 1,
+        incremental: bool = True,
+        prescreen_threshold: Optional[float] = Config.PRESCREEN_THRESHOLD
+):
     """
     Run through all test questions and identify gaps.
+
+    Answers and judgements are pipelined across questions with at most
+    `concurrency` in-flight calls per provider (1 = sequential). An interrupted
+    run resumes from its checkpoint; pass run_name=None to disable that.
+    With batch_size > 1, responses are judged `batch_size` at a time.
+
+    Results are persisted per profile. With incremental=True only questions whose
+    inputs (question, profile digest, model, prompt version) changed since the
+    last run are re-evaluated; the report lists verdicts that changed.
+
+    Questions the local pre-screen can decide with at least `prescreen_threshold`
+    confidence skip both LLM calls; pass None to send everything to the LLM.
     """
     print(f"\n{'=' * 80}")
     print(f"Gap Analysis for: {profile.name}")
     print(f"Analyzing {len(TEST_QUESTIONS)} questions...")
     print(f"{'=' * 80}\n")
 
+    store = ResultsStore(profile.profile_id)
+    keys = {
+        question: input_key(question, profile.digest, gemini.model_name, JUDGE_PROMPT_VERSION)
+        for question in TEST_QUESTIONS
+    }
+    reused = {}
+    if incremental:
+        for question in TEST_QUESTIONS:
+            entry = store.lookup(question, keys[question])
+            if entry and entry.get("source", "llm") == "llm":
+                reused[question] = entry
+
+    # Local decisions are cheap, so they are recomputed every run rather than reused
+    prescreened = {}
+    if prescreen_threshold is not None:
+        index = ResumeIndex([profile.resume_content, profile.summary])
+        for question in TEST_QUESTIONS:
+            if question in reused:
+                continue
+            log = prescreen(question, index, prescreen_threshold)
+            if log:
+                prescreened[question] = {
+                    "key": keys[question],
+                    "answer": log.response,
+                    "result": log.model_dump(),
+                    "source": "prescreen"
+                }
+
+    todo = [
+        question for question in dict.fromkeys(TEST_QUESTIONS)
+        if question not in reused and question not in prescreened
+    ]
+    print(f"Reusing {len(reused)} unchanged results, pre-screened {len(prescreened)} locally, "
+          f"evaluating {len(todo)} with the LLM...\n")
+
+    batch_judge = make_batch_judge(batch_size) if batch_size > 1 else None
+
+    runner = EvaluationRunner(default_limit=concurrency)
+    items = runner.run(
+        todo,
+        answer=(gemini.model_name, get_chat_response),
+        judge=(gemini.model_name, batch_judge.judge if batch_judge else judge_response),
+        result_model=ResponseLog,
+        run_name=run_name,
+        judge_batch_size=batch_size,
+        item_keys=[keys[question] for question in todo]
+    )
+    print()
+
+    current = {**reused, **prescreened}
+    for item in items:
+        current[item.question] = {
+            "key": keys[item.question],
+            "answer": item.answer["text"],
+            "result": item.result.model_dump(),
+            "source": "llm"
+        }
+    changes = diff_results(store.entries, current, "could_answer")
+    store.save(current)
+
     answerable = []
     unanswerable = []
 
     for i, question in enumerate(TEST_QUESTIONS, 1):
         print(f"[{i}/{len(TEST_QUESTIONS)}] Analyzing: {question}")
 
-        log = analyze_question(question)
+        log = ResponseLog.model_validate(current[question]["result"])
 
         if log.could_answer:
             answerable.append(log)
@@ -139,6 +302,17 @@ def run_gap_analysis():
     print(f"{'=' * 80}\n")
     print(f"✅ Could answer: {len(answerable)}/{len(TEST_QUESTIONS)}")
     print(f"❌ Could NOT answer: {len(unanswerable)}/{len(TEST_QUESTIONS)}")
+    if batch_judge:
+        batch_judge.stats.print_report()
+
+    # Print changes since the previous run
+    if changes:
+        print(f"\n{'=' * 80}")
+        print(f"CHANGES SINCE LAST RUN")
+        print(f"{'=' * 80}\n")
+
+        for question, before, after in changes:
+            print(f"{format_change(before, after)}  {question}")
 
     # Print detailed gaps
     if unanswerable:
@@ -153,12 +327,22 @@ def run_gap_analysis():
             print(f"{'-' * 80}\n")
 
     # Save to file
-    save_gap_report(answerable, unanswerable)
+    save_gap_report(answerable, unanswerable, changes)
 
     return answerable, unanswerable
 
 
-def save_gap_report(answerable: List[ResponseLog], unanswerable: List[ResponseLog]):
+def format_change(before, after) -> str:
+    """Describe a could_answer change between runs."""
+    label = {True: "answerable", False: "NOT answerable", None: "absent"}
+    return f"[{label[before]} → {label[after]}]"
+
+
+def save_gap_report(
+        answerable: List[ResponseLog],
+        unanswerable: List[ResponseLog],
+        changes: List[Tuple[str, Any, Any]] = None
+):
     """Save gap analysis report to a text file."""
     from pathlib import Path
     from datetime import datetime
@@ -180,6 +364,14 @@ def save_gap_report(answerable: List[ResponseLog], unanswerable: List[ResponseLo
         f.write(f"Could answer: {len(answerable)}\n")
         f.write(f"Could NOT answer: {len(unanswerable)}\n\n")
 
+        if changes:
+            f.write(f"CHANGES SINCE LAST RUN\n")
+            f.write(f"{'=' * 80}\n\n")
+
+            for question, before, after in changes:
+                f.write(f"{format_change(before, after)}  {question}\n")
+            f.write("\n")
+
         if unanswerable:
             f.write(f"QUESTIONS THAT COULD NOT BE ANSWERED\n")
             f.write(f"{'=' * 80}\n\n")
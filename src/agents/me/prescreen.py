@@ -0,0 +1,162 @@
+"""
+Pre-screen - decides obvious gap analysis questions locally, without LLM calls.
+
+Questions are scored against an index of the terms and two-word phrases in the
+resume and summary. A question whose content terms are (almost) all present is
+treated as answerable; one with (almost) none is treated as not answerable.
+Everything in between is ambiguous and still goes to the LLM.
+
+The confidence threshold trades LLM calls for accuracy. Run this module to see
+precision against the LLM verdicts stored by the last gap analysis run.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models.response_log import ResponseLog
+
+PRESCREEN_RESPONSE = "[pre-screen] Decided locally from resume terms; no LLM call made."
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "in", "on", "at", "for", "to", "with", "from", "by", "about",
+    "as", "into", "than", "then", "so", "if", "it", "its", "be", "been", "being", "this", "that", "these", "those",
+    "there", "here", "what", "which", "who", "whom", "whose", "how", "when", "where", "why",
+    "do", "does", "did", "doing", "done", "is", "are", "was", "were", "am", "have", "has", "had", "having",
+    "you", "your", "yours", "yourself", "i", "me", "my", "we", "our", "us", "they", "them", "their",
+    "can", "could", "would", "should", "will", "shall", "may", "might", "must",
+    "any", "some", "all", "most", "more", "much", "many", "very", "really", "just", "also", "ever",
+    "tell", "describe", "explain", "share", "know", "like", "get", "go", "make", "take", "give", "usually",
+    "experience", "work", "worked", "working", "background",
+}
+
+
+def stem(token: str) -> str:
+    """Very small suffix stripper so "pets"/"pet" and "languages"/"language" match."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 4 and token.endswith("ed"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("es") and token[-3] in "sxz":
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def content_terms(text: str) -> List[str]:
+    return [token for token in tokenize(text) if token not in STOPWORDS and len(token) > 1]
+
+
+class ResumeIndex:
+    """Set of stemmed terms and adjacent-term phrases found in the profile text."""
+
+    def __init__(self, texts: Iterable[str]):
+        self.terms = set()
+        self.phrases = set()
+        for text in texts:
+            tokens = content_terms(text)
+            self.terms.update(tokens)
+            self.phrases.update(zip(tokens, tokens[1:]))
+
+    def score(self, question: str) -> Tuple[float, List[str], List[str]]:
+        """
+        Coverage of the question's content terms and phrases by the index (0..1).
+        Returns (score, matched terms, missing terms).
+        """
+        terms = content_terms(question)
+        if not terms:
+            return 0.5, [], []  # Nothing to go on: leave it to the LLM
+
+        matched = [term for term in terms if term in self.terms]
+        missing = [term for term in terms if term not in self.terms]
+        phrases = list(zip(terms, terms[1:]))
+        matched_phrases = [phrase for phrase in phrases if phrase in self.phrases]
+
+        score = (len(matched) + len(matched_phrases)) / (len(terms) + len(phrases))
+        return score, matched, missing
+
+
+def confidence(score: float) -> float:
+    """How far a score is from the undecided midpoint (0 = no idea, 1 = certain)."""
+    return abs(score - 0.5) * 2
+
+
+def prescreen(question: str, index: ResumeIndex, threshold: float) -> Optional[ResponseLog]:
+    """
+    Decide a question locally if the score is confident enough, else return None.
+    """
+    score, matched, missing = index.score(question)
+    if confidence(score) < threshold:
+        return None
+
+    could_answer = score > 0.5
+    if could_answer:
+        reason = None
+    else:
+        reason = f"Resume and summary do not mention: {', '.join(missing)}"
+
+    return ResponseLog(
+        query=question,
+        response=PRESCREEN_RESPONSE,
+        could_answer=could_answer,
+        reason=reason
+    )
+
+
+def calibrate(
+        verdicts: Dict[str, bool],
+        index: ResumeIndex,
+        thresholds: Iterable[float] = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+) -> List[Dict]:
+    """
+    Precision of local decisions against LLM verdicts ({question: could_answer})
+    for a range of thresholds.
+    """
+    rows = []
+    for threshold in thresholds:
+        decided = correct = 0
+        for question, llm_could_answer in verdicts.items():
+            log = prescreen(question, index, threshold)
+            if log is None:
+                continue
+            decided += 1
+            correct += log.could_answer == llm_could_answer
+
+        rows.append({
+            "threshold": threshold,
+            "decided_locally": decided,
+            "sent_to_llm": len(verdicts) - decided,
+            "precision": correct / decided if decided else None,
+        })
+    return rows
+
+
+# -----------------------------------------------------------------------------
+# Main: precision report against stored LLM verdicts
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    from src.agents.me.profile_loader import profile
+    from src.agents.me.results_store import ResultsStore
+
+    store = ResultsStore(profile.profile_id)
+    verdicts = {
+        question: entry["result"]["could_answer"]
+        for question, entry in store.entries.items()
+        if entry.get("source", "llm") == "llm"
+    }
+    if not verdicts:
+        print("No LLM verdicts stored yet. Run gap_analyzer with prescreen_threshold=None first.")
+    else:
+        index = ResumeIndex([profile.resume_content, profile.summary])
+        print(f"Pre-screen precision against {len(verdicts)} LLM verdicts:\n")
+        print(f"{'threshold':>10} {'local':>6} {'llm':>5} {'precision':>10}")
+        for row in calibrate(verdicts, index):
+            precision = f"{row['precision']:.2f}" if row["precision"] is not None else "-"
+            print(f"{row['threshold']:>10.2f} {row['decided_locally']:>6} {row['sent_to_llm']:>5} {precision:>10}")
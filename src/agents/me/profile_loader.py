@@ -2,10 +2,15 @@
 Profile loader - loads resume and summary content.
 Shared between about_me.py and evaluator.py.
 """
+import hashlib
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
-from pypdf import PdfReader
+
+from src.utils.config import Config
+from src.utils.lazy import Lazy
+from src.utils.tracing import traced
 
 load_dotenv()
 
@@ -20,14 +25,32 @@ LINKEDIN = os.getenv("LINKEDIN_PROFILE", "https://linkedin.com/in/tony-gregg-exa
 # -----------------------------------------------------------------------------
 # Loaders
 # -----------------------------------------------------------------------------
+@traced("profile.load_resume")
 def load_resume_text(pdf_path: Path = None) -> str:
-    """Load and extract text from resume PDF."""
+    """
+    Load and extract text from resume PDF.
+
+    If a pre-extracted `resume.txt` sits next to the PDF and is at least as new
+    (see `extract_resume_text`), it is read instead of re-parsing the PDF.
+    """
     if pdf_path is None:
         pdf_path = PROFILE_DIR / "resume.pdf"
 
     if not pdf_path.exists():
         raise FileNotFoundError(f"Resume not found at {pdf_path}")
 
+    text_path = pdf_path.with_suffix(".txt")
+    if text_path.exists() and text_path.stat().st_mtime >= pdf_path.stat().st_mtime:
+        with open(text_path, encoding="utf-8") as f:
+            return f.read().strip()
+
+    return parse_resume_pdf(pdf_path)
+
+
+def parse_resume_pdf(pdf_path: Path) -> str:
+    """Extract text from a resume PDF, ignoring any resume.txt beside it."""
+    from pypdf import PdfReader  # Only needed when there is no up-to-date resume.txt
+
     try:
         reader = PdfReader(pdf_path)
         resume_text = ""
@@ -40,6 +63,29 @@ def load_resume_text(pdf_path: Path = None) -> str:
         raise RuntimeError(f"Failed to read PDF: {e}")
 
 
+def extract_resume_text(profile_dir: Path) -> Path:
+    """
+    Parse `resume.pdf` in a profile directory once and write `resume.txt` beside it.
+    Used by bulk ingest so later loads skip PDF parsing.
+    """
+    pdf_path = Path(profile_dir) / "resume.pdf"
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"Resume not found at {pdf_path}")
+    text_path = pdf_path.with_suffix(".txt")
+
+    # Write beside the target and swap in, so a failed parse keeps the old text
+    resume_text = parse_resume_pdf(pdf_path)
+    tmp_path = text_path.with_name(f"{text_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(resume_text)
+        os.replace(tmp_path, text_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return text_path
+
+
+@traced("profile.load_summary")
 def load_summary(summary_path: Path = None, fallback_text: str = "") -> str:
     """Load summary from file, or fall back to provided text."""
     if summary_path is None:
@@ -53,6 +99,7 @@ def load_summary(summary_path: Path = None, fallback_text: str = "") -> str:
         return fallback_text[:2000]
 
 
+@traced("profile.build_system_prompt")
 def build_system_prompt(
     name: str,
     summary: str,
@@ -90,11 +137,25 @@ Never break character. Answer in first person as if you are {name}.
 class ProfileData:
     """Holds all profile data. Load once and share across files."""
 
-    def __init__(self):
-        self.name = NAME
-        self.linkedin = LINKEDIN
-        self.resume_content = load_resume_text()
-        self.summary = load_summary(fallback_text=self.resume_content)
+    def __init__(
+        self,
+        profile_dir: Path = None,
+        name: str = None,
+        linkedin: str = None,
+        profile_id: str = None
+    ):
+        self.profile_id = profile_id or Config.DEFAULT_PROFILE_ID
+        self.profile_dir = Path(profile_dir) if profile_dir else PROFILE_DIR
+        # The built-in persona only covers the original profile directory;
+        # any other profile without profile.json is named after its ID
+        is_builtin = self.profile_dir.resolve() == PROFILE_DIR.resolve()
+        self.name = name or (NAME if is_builtin else self.profile_id)
+        self.linkedin = linkedin or (LINKEDIN if is_builtin else "")
+        self.resume_content = load_resume_text(self.profile_dir / "resume.pdf")
+        self.summary = load_summary(
+            summary_path=self.profile_dir / "summary.txt",
+            fallback_text=self.resume_content
+        )
         self.system_prompt = build_system_prompt(
             name=self.name,
             summary=self.summary,
@@ -103,7 +164,20 @@ class ProfileData:
         )
         print(f"✓ Profile loaded for: {self.name}")
 
+    @property
+    def digest(self) -> str:
+        """Content hash of everything the chatbot and judges see; changes on any resume edit."""
+        content = "\0".join((self.system_prompt, self.resume_content, self.summary))
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def memory_size(self) -> int:
+        """Approximate bytes held by this profile (dominated by the text fields)."""
+        return sum(
+            sys.getsizeof(value)
+            for value in (self.name, self.linkedin, self.resume_content, self.summary, self.system_prompt)
+        )
+
 
-# Singleton: load once, reuse everywhere
+# Singleton: loaded on first attribute access, reused everywhere
 # Import this in any file that needs profile data
-profile = ProfileData()
\ No newline at end of file
+profile = Lazy(ProfileData)
\ No newline at end of file
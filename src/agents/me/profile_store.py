@@ -0,0 +1,197 @@
+"""
+Profile store - resolves a profile ID to a lazily loaded ProfileData.
+Lets one process serve many personas (about_me.py, api_server.py).
+
+Layout on disk (Config.PROFILES_DIR):
+    <profile_id>/resume.pdf
+    <profile_id>/summary.txt      (optional)
+    <profile_id>/profile.json     (optional: {"name": ..., "linkedin": ...})
+
+The default profile ID (Config.DEFAULT_PROFILE_ID) falls back to the original
+single-profile directory (src/agents/me/) when it has no folder of its own.
+"""
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.config import Config
+from src.utils.tracing import traced
+from src.agents.me.profile_loader import PROFILE_DIR, ProfileData, extract_resume_text
+
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ProfileStore:
+    """Resolves profile IDs to ProfileData, holding loaded profiles in a memory-bounded LRU."""
+
+    def __init__(
+            self,
+            profiles_dir: Path = None,
+            max_bytes: int = None,
+            default_profile_id: str = None
+    ):
+        self.profiles_dir = Path(profiles_dir) if profiles_dir else Config.PROFILES_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else Config.PROFILE_CACHE_MAX_BYTES
+        self.default_profile_id = default_profile_id or Config.DEFAULT_PROFILE_ID
+
+        self._profiles: "OrderedDict[str, ProfileData]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        # One lock per profile ID so a slow PDF parse doesn't block other lookups
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    # -------------------------------------------------------------------------
+    # Resolution
+    # -------------------------------------------------------------------------
+    def profile_dir(self, profile_id: str) -> Path:
+        """Map a profile ID to its directory. Raises ValueError / FileNotFoundError."""
+        if not PROFILE_ID_PATTERN.match(profile_id or ""):
+            raise ValueError(f"Invalid profile ID: {profile_id!r}")
+
+        candidate = self.profiles_dir / profile_id
+        if candidate.is_dir():
+            return candidate
+        if profile_id == self.default_profile_id:
+            return PROFILE_DIR
+        raise FileNotFoundError(f"Profile not found: {profile_id}")
+
+    def list_profiles(self) -> List[str]:
+        """All profile IDs available on disk (plus the default profile)."""
+        ids = {self.default_profile_id}
+        if self.profiles_dir.is_dir():
+            ids.update(
+                p.name for p in self.profiles_dir.iterdir()
+                if p.is_dir() and PROFILE_ID_PATTERN.match(p.name)
+            )
+        return sorted(ids)
+
+    def get(self, profile_id: Optional[str] = None) -> ProfileData:
+        """Return the profile for an ID, loading it on first use."""
+        profile_id = profile_id or self.default_profile_id
+
+        with self._lock:
+            if profile_id in self._profiles:
+                self._profiles.move_to_end(profile_id)
+                return self._profiles[profile_id]
+            load_lock = self._load_locks.setdefault(profile_id, threading.Lock())
+
+        try:
+            with load_lock:
+                # Another thread may have finished loading while we waited
+                with self._lock:
+                    if profile_id in self._profiles:
+                        self._profiles.move_to_end(profile_id)
+                        return self._profiles[profile_id]
+
+                loaded = self._load(profile_id)
+
+                with self._lock:
+                    self._insert(profile_id, loaded)
+                return loaded
+        finally:
+            # Drop the lock even when the load failed (bad ID, missing PDF)
+            with self._lock:
+                if self._load_locks.get(profile_id) is load_lock:
+                    del self._load_locks[profile_id]
+
+    @traced("profile_store.load")
+    def _load(self, profile_id: str) -> ProfileData:
+        profile_dir = self.profile_dir(profile_id)
+        meta = {}
+        meta_path = profile_dir / "profile.json"
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+
+        return ProfileData(
+            profile_id=profile_id,
+            profile_dir=profile_dir,
+            name=meta.get("name"),
+            linkedin=meta.get("linkedin")
+        )
+
+    # -------------------------------------------------------------------------
+    # LRU bookkeeping
+    # -------------------------------------------------------------------------
+    def _insert(self, profile_id: str, profile: ProfileData) -> None:
+        size = profile.memory_size()
+        self._profiles[profile_id] = profile
+        self._sizes[profile_id] = size
+        self._total_bytes += size
+
+        # Evict least recently used, but always keep the profile just loaded
+        while self._total_bytes > self.max_bytes and len(self._profiles) > 1:
+            evicted_id, _ = self._profiles.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(evicted_id)
+            print(f"↺ Evicted profile from memory: {evicted_id}")
+
+    def evict(self, profile_id: str) -> None:
+        """Drop a profile from memory (e.g. after its files changed)."""
+        with self._lock:
+            if self._profiles.pop(profile_id, None) is not None:
+                self._total_bytes -= self._sizes.pop(profile_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "loaded_profiles": list(self._profiles.keys()),
+                "memory_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # -------------------------------------------------------------------------
+    # Bulk ingest
+    # -------------------------------------------------------------------------
+    def ingest(self, profile_ids: Iterable[str] = None, workers: int = None) -> Dict[str, str]:
+        """
+        Pre-extract resume text for many profiles in a process pool.
+
+        PDF parsing is CPU-bound, so it runs in separate processes. Each profile
+        gets a `resume.txt` sidecar that ProfileData reads instead of the PDF.
+        Returns {profile_id: "ok" | error message}.
+        """
+        profile_ids = list(profile_ids) if profile_ids is not None else self.list_profiles()
+        workers = workers or Config.PROFILE_INGEST_WORKERS
+
+        results = {}
+        dirs = {}
+        for profile_id in profile_ids:
+            try:
+                dirs[profile_id] = self.profile_dir(profile_id)
+            except (ValueError, FileNotFoundError) as e:
+                results[profile_id] = str(e)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(extract_resume_text, profile_dir): profile_id
+                for profile_id, profile_dir in dirs.items()
+            }
+            for future in as_completed(futures):
+                profile_id = futures[future]
+                try:
+                    future.result()
+                    results[profile_id] = "ok"
+                    self.evict(profile_id)  # Reload from the fresh text next time
+                except Exception as e:
+                    results[profile_id] = str(e)
+
+        return results
+
+
+# Shared store: import this where requests are routed by profile ID
+profile_store = ProfileStore()
+
+
+# -----------------------------------------------------------------------------
+# Main: bulk ingest every profile under Config.PROFILES_DIR
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    results = profile_store.ingest()
+    for profile_id, status in sorted(results.items()):
+        mark = "✓" if status == "ok" else "✗"
+        print(f"{mark} {profile_id}: {status}")
@@ -1,32 +1,37 @@
 """
 Evaluator - evaluates AI responses against Tony's profile.
 """
-import json
 from src.agents.gemini_agent import GeminiAgent
 from src.agents.xai_agent import XAIAgent
 from src.utils.cache import LLMCache
 from src.utils.config import Config
+from src.utils.lazy import Lazy
+from src.utils.structured_output import StructuredOutputError, parse_structured
 from src.agents.me.profile_loader import profile
 from src.models.evaluation import Evaluation  # ← Import Pydantic model
+from src.agents.me.eval_runner import EvaluationRunner
+from src.agents.me.batch_judge import BatchJudge, format_items, output_instructions
+from src.agents.me.results_store import input_key
 
 
 # -----------------------------------------------------------------------------
 # Initialize
 # -----------------------------------------------------------------------------
-cache = LLMCache(cache_dir=str(Config.CACHE_DIR))
-gemini = GeminiAgent()
-xai = XAIAgent()
+cache = Lazy(lambda: LLMCache(cache_dir=str(Config.CACHE_DIR)))
+gemini = Lazy(GeminiAgent)
+xai = Lazy(XAIAgent)
 
 
 # -----------------------------------------------------------------------------
 # Evaluator
 # -----------------------------------------------------------------------------
-def evaluate_response(question: str, response: str) -> Evaluation:
-    """
-    Evaluate if an AI response accurately represents Tony's profile.
-    Returns a structured Evaluation object.
-    """
-    eval_prompt = [
+# Bump when the evaluator prompts change, so interrupted runs don't resume stale verdicts
+EVAL_PROMPT_VERSION = "1"
+
+
+def build_eval_prompt(question: str, response: str) -> list:
+    """Build the per-item evaluator prompt."""
+    return [
         {
             "role": "system",
             "content": """You are an evaluator checking if an AI response 
@@ -66,31 +71,67 @@ with the actual resume. Return ONLY the JSON object.
         }
     ]
 
-    try:
-        result = cache.cached_api_call(
-            model_name=xai.model_name,
-            query=eval_prompt,
-            api_function=xai.generate,
-            use_full_context=True
-        )
 
-        # Parse the JSON response into Evaluation model
-        raw_text = result["text"].strip()
+def build_batch_eval_prompt(pairs: list) -> list:
+    """Build one evaluator prompt for several (question, response) pairs, with the profile once."""
+    return [
+        {
+            "role": "system",
+            "content": f"""You are an evaluator checking if AI responses 
+accurately represent a person's background.
+
+For each numbered item, decide:
+- is_accepted: true if the response is accurate and professional, false otherwise
+- feedback: brief explanation of your evaluation
+
+{output_instructions(Evaluation)}"""
+        },
+        {
+            "role": "user",
+            "content": f"""
+## Actual Resume:
+{profile.resume_content}
+
+## Summary:
+{profile.summary}
+
+## Items to Evaluate:
+{format_items(pairs)}
+
+Evaluate if each response is accurate, professional, and consistent 
+with the actual resume. Return ONLY the JSON object.
+"""
+        }
+    ]
+
 
-        # Clean up if model returns markdown code blocks despite instructions
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("```")[1]         # Remove opening ```
-            if raw_text.startswith("json"):
-                raw_text = raw_text[4:]                  # Remove 'json' label
-        raw_text = raw_text.strip()
+def _call_evaluator(messages: list) -> dict:
+    return cache.cached_api_call(
+        model_name=xai.model_name,
+        query=messages,
+        api_function=xai.generate,
+        use_full_context=True,
+        tag="evaluation"
+    )
 
-        # Parse JSON and validate with Pydantic
-        json_data = json.loads(raw_text)
-        evaluation = Evaluation(**json_data)             # ← Pydantic validates!
+
+def evaluate_response(question: str, response: str) -> Evaluation:
+    """
+    Evaluate if an AI response accurately represents Tony's profile.
+    Returns a structured Evaluation object.
+    """
+    eval_prompt = build_eval_prompt(question, response)
+
+    try:
+        result = _call_evaluator(eval_prompt)
+
+        # Find and repair the JSON (fences, chatty text, trailing commas, truncation),
+        # then validate with Pydantic
+        evaluation = parse_structured(result["text"], Evaluation)  # ← Pydantic validates!
 
         return evaluation
 
-    except json.JSONDecodeError as e:
+    except StructuredOutputError as e:
         print(f"Failed to parse JSON: {e}")
         print(f"Raw response was: {result['text']}")
         # Return a default failed evaluation
@@ -106,40 +147,93 @@ with the actual resume. Return ONLY the JSON object.
         )
 
 
+def make_batch_judge(batch_size: int) -> BatchJudge:
+    """Batched mode: k items per evaluator call, failed items re-judged one by one.
+    Built per run, so concurrent runs don't share a batch size or stats."""
+    return BatchJudge(
+        item_model=Evaluation,
+        build_batch_messages=build_batch_eval_prompt,
+        build_single_messages=build_eval_prompt,
+        call=_call_evaluator,
+        fallback=evaluate_response,
+        batch_size=batch_size
+    )
+
+
+def evaluate_responses_batch(pairs: list, batch_judge: BatchJudge = None) -> list:
+    """Evaluate a list of (question, response) pairs in batched evaluator calls."""
+    return (batch_judge or make_batch_judge(len(pairs))).judge(pairs)
+
+
 # -----------------------------------------------------------------------------
 # Evaluation Suite
 # -----------------------------------------------------------------------------
-def run_evaluation_suite():
-    """Run a set of test questions and evaluate responses."""
-    test_questions = [
-        "What is your experience with Python?",
-        "Have you worked in fintech?",
-        "What is your leadership experience?",
-        "Are you open to remote work?",
+TEST_QUESTIONS = [
+    "What is your experience with Python?",
+    "Have you worked in fintech?",
+    "What is your leadership experience?",
+    "Are you open to remote work?",
+]
+
+
+def get_response(question: str) -> dict:
+    """Get the chatbot's response using Gemini (cached)."""
+    messages = [
+        {"role": "system", "content": profile.system_prompt},
+        {"role": "user",   "content": question}
     ]
 
+    return cache.cached_api_call(
+        model_name=gemini.model_name,
+        query=messages,
+        api_function=gemini.generate,
+        tag="evaluation"
+    )
+
+
+def run_evaluation_suite(
+        test_questions: list = None,
+        concurrency: int = None,
+        run_name: str = "evaluation_suite",
+        batch_size: int = 1
+):
+    """
+    Run a set of test questions and evaluate responses.
+
+    Gemini answers and xAI judgements are pipelined across questions with at
+    most `concurrency` in-flight calls per provider (1 = sequential). An
+    interrupted run resumes from its checkpoint; pass run_name=None to disable that.
+    With batch_size > 1, responses are judged `batch_size` at a time.
+    Returns the evaluated items (EvalItem, with the Evaluation as `result`).
+    """
+    test_questions = test_questions or TEST_QUESTIONS
+
     print(f"\n{'='*60}")
     print(f"Evaluating AI responses for: {profile.name}")
     print(f"{'='*60}\n")
 
-    passed = 0
-    failed = 0
+    batch_judge = make_batch_judge(batch_size) if batch_size > 1 else None
 
-    for question in test_questions:
-        # Get chatbot response using Gemini
-        messages = [
-            {"role": "system", "content": profile.system_prompt},
-            {"role": "user",   "content": question}
+    runner = EvaluationRunner(default_limit=concurrency)
+    items = runner.run(
+        test_questions,
+        answer=(gemini.model_name, get_response),
+        judge=(xai.model_name, batch_judge.judge if batch_judge else evaluate_response),
+        result_model=Evaluation,
+        run_name=run_name,
+        judge_batch_size=batch_size,
+        item_keys=[
+            input_key(question, profile.digest, f"{gemini.model_name}/{xai.model_name}", EVAL_PROMPT_VERSION)
+            for question in test_questions
         ]
+    )
+    print()
 
-        response = cache.cached_api_call(
-            model_name=gemini.model_name,
-            query=messages,
-            api_function=gemini.generate
-        )
+    passed = 0
+    failed = 0
 
-        # Evaluate using xAI
-        evaluation = evaluate_response(question, response["text"])
+    for item in items:
+        question, response, evaluation = item.question, item.answer, item.result
 
         # evaluation is now a proper Pydantic object!
         status = "✅ ACCEPTED" if evaluation.is_accepted else "❌ REJECTED"
@@ -157,8 +251,12 @@ def run_evaluation_suite():
 
     print(f"\n{'='*60}")
     print(f"Results: {passed} passed, {failed} failed out of {len(test_questions)}")
+    if batch_judge:
+        batch_judge.stats.print_report()
     print(f"{'='*60}\n")
 
+    return items
+
 
 if __name__ == "__main__":
     run_evaluation_suite()
\ No newline at end of file
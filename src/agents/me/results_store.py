@@ -0,0 +1,81 @@
+"""
+Results store - persists gap analysis results between runs.
+
+Each entry is keyed by question and remembers the input key it was computed
+from (question, profile digest, model, prompt-template version). A run only
+recomputes questions whose input key changed, and the previous entries are
+kept around so the report can show what changed since the last run.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.config import Config
+
+
+def input_key(question: str, profile_digest: str, model: str, prompt_version: str) -> str:
+    """Hash of every input that affects a question's result."""
+    key_data = {
+        "question": question,
+        "profile": profile_digest,
+        "model": model,
+        "prompt_version": prompt_version,
+    }
+    return hashlib.md5(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+
+class ResultsStore:
+    """JSON file of {question: {"key", "answer", "result"}} for one profile."""
+
+    def __init__(self, name: str, results_dir: Path = None):
+        results_dir = Path(results_dir) if results_dir else Config.GAP_RESULTS_DIR
+        self.path = results_dir / f"{name}.json"
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Results store unreadable, starting fresh: {e}")
+            return {}
+
+    def lookup(self, question: str, key: str) -> Optional[Dict[str, Any]]:
+        """Stored entry for a question, only if it was computed from the same inputs."""
+        entry = self.entries.get(question)
+        if entry and entry.get("key") == key:
+            return entry
+        return None
+
+    def save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the store with this run's entries (write to temp file, then rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.entries = entries
+
+
+def diff_results(
+        previous: Dict[str, Dict[str, Any]],
+        current: Dict[str, Dict[str, Any]],
+        field: str
+) -> List[Tuple[str, Any, Any]]:
+    """
+    Compare a result field between two runs.
+
+    Returns (question, before, after) for questions that were added, removed, or
+    whose `field` changed. Missing sides are None.
+    """
+    changes = []
+    for question in list(current) + [q for q in previous if q not in current]:
+        before = previous.get(question, {}).get("result", {}).get(field) if question in previous else None
+        after = current.get(question, {}).get("result", {}).get(field) if question in current else None
+        if question not in previous or question not in current or before != after:
+            changes.append((question, before, after))
+    return changes
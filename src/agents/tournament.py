@@ -0,0 +1,459 @@
+"""
+Tournament engine - ranks competitor models' answers with several judge models.
+
+Competitor answers are generated concurrently through LLMCache, keyed by model
+and question, so re-running a tournament with one new competitor only calls
+the new model. Judges then rank all answers in parallel, and their rankings are
+combined into one consensus ranking (Borda count or Kemeny).
+
+Putting every answer into one judge prompt stops working past a handful of
+models, so there is also a pairwise mode (`run_pairwise`): a merge sort decides
+the order with ~n log n two-answer comparisons, each verdict is cached by a
+content hash of both answers, and all recorded verdicts are merged into global
+Bradley-Terry or Elo scores.
+"""
+import hashlib
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import permutations
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.cache import LLMCache
+from src.utils.config import Config
+from src.utils.structured_output import StructuredOutputError, extract_json
+from src.utils.tracing import bind, traced
+from src.models.tournament import TournamentResult
+
+AGGREGATION_METHODS = ("borda", "kemeny")
+PAIRWISE_METHODS = ("bradley_terry", "elo")
+KEMENY_EXACT_LIMIT = 8  # Above this many competitors, use local search instead of all permutations
+
+
+# -----------------------------------------------------------------------------
+# Rank aggregation
+# -----------------------------------------------------------------------------
+def borda(rankings: List[List[str]], candidates: List[str]) -> Dict[str, float]:
+    """Borda count: n-1 points for first place, 0 for last, summed over judges."""
+    n = len(candidates)
+    scores = {candidate: 0.0 for candidate in candidates}
+    for ranking in rankings:
+        for position, candidate in enumerate(ranking):
+            scores[candidate] += n - 1 - position
+    return scores
+
+
+def pairwise_preferences(rankings: List[List[str]], candidates: List[str]) -> Dict[str, Dict[str, int]]:
+    """prefs[a][b] = number of judges ranking a above b."""
+    prefs = {a: {b: 0 for b in candidates} for a in candidates}
+    for ranking in rankings:
+        for i, a in enumerate(ranking):
+            for b in ranking[i + 1:]:
+                prefs[a][b] += 1
+    return prefs
+
+
+def kemeny(rankings: List[List[str]], candidates: List[str]) -> List[str]:
+    """
+    Kemeny consensus: the ranking that agrees with the most pairwise judge preferences.
+    Exact for small fields, Borda-seeded adjacent-swap search for larger ones.
+    """
+    prefs = pairwise_preferences(rankings, candidates)
+
+    def agreement(order) -> int:
+        return sum(prefs[a][b] for i, a in enumerate(order) for b in order[i + 1:])
+
+    if len(candidates) <= KEMENY_EXACT_LIMIT:
+        return list(max(permutations(candidates), key=agreement))
+
+    scores = borda(rankings, candidates)
+    order = sorted(candidates, key=lambda c: -scores[c])
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            a, b = order[i], order[i + 1]
+            if prefs[b][a] > prefs[a][b]:
+                order[i], order[i + 1] = b, a
+                improved = True
+    return order
+
+
+def kemeny_agreement(rankings: List[List[str]], candidates: List[str], order: List[str]) -> Dict[str, float]:
+    """
+    Per candidate: judge pairwise preferences that agree with its place in `order`
+    (judges ranking it above the candidates below it, and below those above it).
+    """
+    prefs = pairwise_preferences(rankings, candidates)
+    position = {c: i for i, c in enumerate(order)}
+    return {
+        a: float(sum(prefs[a][b] if position[a] < position[b] else prefs[b][a] for b in candidates if b != a))
+        for a in candidates
+    }
+
+
+def aggregate(rankings: List[List[str]], candidates: List[str], method: str = "borda"):
+    """
+    Combine judge rankings. Returns (consensus order, scores): Borda points for
+    "borda", Kemeny agreement scores (see kemeny_agreement) for "kemeny".
+    """
+    if method not in AGGREGATION_METHODS:
+        raise ValueError(f"Unknown aggregation method: {method}. Use one of {AGGREGATION_METHODS}")
+
+    if method == "kemeny":
+        consensus = kemeny(rankings, candidates)
+        scores = kemeny_agreement(rankings, candidates, consensus)
+    else:
+        scores = borda(rankings, candidates)
+        # Ties broken by competitor order for a stable result
+        consensus = sorted(candidates, key=lambda c: (-scores[c], candidates.index(c)))
+    return consensus, scores
+
+
+def bradley_terry(
+        matches: List[Tuple[str, str]],
+        candidates: List[str],
+        iterations: int = 200,
+        prior: float = 0.5
+) -> Dict[str, float]:
+    """
+    Bradley-Terry strengths from (winner, loser) matches, fitted with the MM algorithm.
+
+    Each compared pair gets `prior` pseudo-wins in both directions so undefeated
+    or winless competitors keep finite scores. Returned on a log scale (mean 0).
+    """
+    wins = {(a, b): 0.0 for a in candidates for b in candidates if a != b}
+    for winner, loser in matches:
+        wins[(winner, loser)] += 1
+    for a, b in {tuple(sorted(match)) for match in matches}:
+        wins[(a, b)] += prior
+        wins[(b, a)] += prior
+
+    strength = {c: 1.0 for c in candidates}
+    for _ in range(iterations):
+        updated = {}
+        for a in candidates:
+            total_wins = sum(wins[(a, b)] for b in candidates if b != a)
+            denominator = sum(
+                (wins[(a, b)] + wins[(b, a)]) / (strength[a] + strength[b])
+                for b in candidates if b != a
+            )
+            updated[a] = total_wins / denominator if denominator else strength[a]
+        norm = math.exp(sum(math.log(v) for v in updated.values() if v > 0) / len(candidates))
+        strength = {c: (v / norm if v > 0 else strength[c]) for c, v in updated.items()}
+
+    return {c: math.log(v) for c, v in strength.items()}
+
+
+def elo(matches: List[Tuple[str, str]], candidates: List[str], k: float = 32.0, base: float = 1000.0) -> Dict[str, float]:
+    """Elo ratings from (winner, loser) matches, applied in order."""
+    ratings = {c: base for c in candidates}
+    for winner, loser in matches:
+        expected = 1 / (1 + 10 ** ((ratings[loser] - ratings[winner]) / 400))
+        ratings[winner] += k * (1 - expected)
+        ratings[loser] -= k * (1 - expected)
+    return ratings
+
+
+# -----------------------------------------------------------------------------
+# Judging
+# -----------------------------------------------------------------------------
+def build_judge_prompt(question: str, answers: List[str]) -> str:
+    together = ""
+    for index, answer in enumerate(answers):
+        together += f"# Response from competitor {index + 1}\n\n"
+        together += answer + "\n\n"
+
+    return f"""You are judging a competition between {len(answers)} competitors.
+Each model has been given this question:
+
+{question}
+
+Your job is to evaluate each response for clarity and strength of argument, and rank them in order of best to worst.
+Respond with JSON, and only JSON, with the following format:
+{{"results": ["best competitor number", "second best competitor number", "third best competitor number", ...]}}
+
+Here are the responses from each competitor:
+
+{together}
+
+Now respond with the JSON with the ranked order of the competitors, nothing else. Do not include markdown formatting or code blocks."""
+
+
+def build_pairwise_prompt(question: str, answer_1: str, answer_2: str) -> str:
+    return f"""You are judging a head-to-head comparison between 2 competitors.
+Each model has been given this question:
+
+{question}
+
+Your job is to evaluate both responses for clarity and strength of argument, and pick the better one.
+Respond with JSON, and only JSON, with the following format:
+{{"winner": "1"}} or {{"winner": "2"}}
+
+# Response from competitor 1
+
+{answer_1}
+
+# Response from competitor 2
+
+{answer_2}
+
+Now respond with the JSON naming the better competitor, nothing else. Do not include markdown formatting or code blocks."""
+
+
+def parse_winner(raw_text: str) -> Optional[int]:
+    """Return 1 or 2 from a pairwise verdict, or None if unusable."""
+    try:
+        data = extract_json(raw_text, accept=lambda value: isinstance(value, dict) and "winner" in value)
+    except StructuredOutputError:
+        return None
+    winner = str(data.get("winner", "")).strip().upper() if isinstance(data, dict) else ""
+    return {"1": 1, "A": 1, "2": 2, "B": 2}.get(winner)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def parse_ranking(raw_text: str, competitors: List[str]) -> List[str]:
+    """
+    Turn a judge's {"results": [...]} into competitor names.
+    Invalid or repeated numbers are ignored; competitors the judge left out go last.
+    """
+    data = extract_json(raw_text, accept=lambda value: isinstance(value, dict) and "results" in value)
+    numbers = data.get("results", []) if isinstance(data, dict) else data
+    if not isinstance(numbers, list):
+        numbers = []
+
+    ranking = []
+    for number in numbers:
+        try:
+            index = int(number) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(competitors) and competitors[index] not in ranking:
+            ranking.append(competitors[index])
+    ranking += [c for c in competitors if c not in ranking]
+    return ranking
+
+
+class Tournament:
+    """Runs competitor models on a question and ranks them with several judges."""
+
+    def __init__(
+            self,
+            competitors: Dict[str, Any],
+            judges: Dict[str, Any],
+            cache: LLMCache = None,
+            max_workers: int = None
+    ):
+        """
+        Args:
+            competitors: {name: agent} - agents with `model_name` and `generate(query, **kwargs)`.
+            judges: {name: agent} used to rank the answers.
+            cache: LLMCache for answers and verdicts (defaults to Config.CACHE_DIR).
+            max_workers: Concurrent provider calls (defaults to one per competitor/judge).
+        """
+        if not competitors:
+            raise ValueError("A tournament needs at least one competitor")
+        if not judges:
+            raise ValueError("A tournament needs at least one judge")
+
+        self.competitors = dict(competitors)
+        self.judges = dict(judges)
+        self.cache = cache or LLMCache(cache_dir=str(Config.CACHE_DIR))
+        self.max_workers = max_workers or max(len(self.competitors), len(self.judges))
+
+    def add_competitor(self, name: str, agent: Any) -> None:
+        self.competitors[name] = agent
+
+    @traced("tournament.answer")
+    def answer(self, name: str, question: str) -> str:
+        agent = self.competitors[name]
+        result = self.cache.cached_api_call(
+            model_name=agent.model_name,
+            query=question,
+            api_function=agent.generate
+        )
+        return result["text"]
+
+    @traced("tournament.judge")
+    def judge(self, name: str, question: str, names: List[str], answers: List[str]) -> List[str]:
+        agent = self.judges[name]
+        prompt = build_judge_prompt(question, answers)
+        # The prompt contains every answer, so a new competitor means a new verdict
+        result = self.cache.cached_api_call(
+            model_name=agent.model_name,
+            query=[{"role": "user", "content": prompt}],
+            api_function=agent.generate,
+            use_full_context=True
+        )
+        return parse_ranking(result["text"], names)
+
+    def run(self, question: str, method: str = "borda") -> TournamentResult:
+        """Generate all answers concurrently, judge them in parallel, and aggregate."""
+        if method not in AGGREGATION_METHODS:
+            raise ValueError(f"Unknown aggregation method: {method}. Use one of {AGGREGATION_METHODS}")
+
+        names = list(self.competitors)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            answer_list = list(pool.map(bind(lambda name: self.answer(name, question)), names))
+
+            failed_judges = []
+
+            def run_judge(judge_name):
+                try:
+                    return judge_name, self.judge(judge_name, question, names, answer_list)
+                except StructuredOutputError as e:
+                    print(f"Judge {judge_name} returned no usable ranking: {e}")
+                except Exception as e:
+                    # One judge's provider or HTTP error drops that judge, not the tournament
+                    print(f"Judge {judge_name} failed: {e}")
+                    failed_judges.append(judge_name)
+                return judge_name, None
+
+            verdicts = list(pool.map(bind(run_judge), list(self.judges)))
+
+        judge_rankings = {judge_name: ranking for judge_name, ranking in verdicts if ranking is not None}
+        if not judge_rankings:
+            raise RuntimeError("No judge returned a usable ranking")
+
+        consensus, scores = aggregate(list(judge_rankings.values()), names, method)
+        return TournamentResult(
+            question=question,
+            competitors=names,
+            answers=dict(zip(names, answer_list)),
+            judge_rankings=judge_rankings,
+            consensus=consensus,
+            scores=scores,
+            method=method,
+            failed_judges=failed_judges
+        )
+
+    # -------------------------------------------------------------------------
+    # Pairwise mode
+    # -------------------------------------------------------------------------
+    @traced("tournament.compare")
+    def compare(self, judge_name: str, question: str, answer_a: str, answer_b: str) -> Optional[bool]:
+        """
+        Ask one judge whether answer_a beats answer_b. Returns None if the verdict is unusable.
+
+        Answers are always shown in content-hash order, so (a, b) and (b, a)
+        share one cached verdict, keyed by the hashes of the question and both answers.
+        """
+        agent = self.judges[judge_name]
+        hash_a, hash_b = content_hash(answer_a), content_hash(answer_b)
+        swapped = hash_b < hash_a
+        first, second = (answer_b, answer_a) if swapped else (answer_a, answer_b)
+        key = f"pairwise:{content_hash(question)}:{min(hash_a, hash_b)}:{max(hash_a, hash_b)}"
+
+        messages = [{"role": "user", "content": build_pairwise_prompt(question, first, second)}]
+        result = self.cache.cached_api_call(
+            model_name=agent.model_name,
+            query=key,
+            api_function=lambda _key, **kwargs: agent.generate(messages, **kwargs)
+        )
+
+        winner = parse_winner(result["text"])
+        if winner is None:
+            return None
+        first_wins = winner == 1
+        return first_wins != swapped
+
+    def run_pairwise(self, question: str, method: str = "bradley_terry") -> TournamentResult:
+        """
+        Rank competitors with pairwise judging.
+
+        A bottom-up merge sort orders the competitors (merges at the same level
+        run concurrently); each comparison asks every judge in parallel and
+        takes the majority. All individual verdicts are then fitted into
+        Bradley-Terry or Elo scores, which give the final ranking.
+        """
+        if method not in PAIRWISE_METHODS:
+            raise ValueError(f"Unknown pairwise method: {method}. Use one of {PAIRWISE_METHODS}")
+
+        names = list(self.competitors)
+        verdicts_by_pair: Dict[Tuple[str, str], List[Optional[bool]]] = {}  # Judge order; True = first wins
+        lock = threading.Lock()
+        counter = {"comparisons": 0}
+
+        failed_judges = set()
+
+        def safe_compare(judge_name: str, answer_a: str, answer_b: str) -> Optional[bool]:
+            try:
+                return self.compare(judge_name, question, answer_a, answer_b)
+            except Exception as e:
+                # A failing judge loses this vote only; the others still decide
+                print(f"Judge {judge_name} failed: {e}")
+                with lock:
+                    failed_judges.add(judge_name)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as calls:
+            answers = dict(zip(names, calls.map(bind(lambda name: self.answer(name, question)), names)))
+
+            def beats(a: str, b: str) -> bool:
+                verdicts = list(calls.map(
+                    bind(lambda judge_name: safe_compare(judge_name, answers[a], answers[b])),
+                    list(self.judges)
+                ))
+                a_votes = sum(1 for v in verdicts if v is True)
+                b_votes = sum(1 for v in verdicts if v is False)
+                with lock:
+                    counter["comparisons"] += 1
+                    if names.index(a) < names.index(b):
+                        verdicts_by_pair[(a, b)] = verdicts
+                    else:
+                        verdicts_by_pair[(b, a)] = [None if v is None else not v for v in verdicts]
+                return a_votes >= b_votes  # Ties keep the earlier competitor first
+
+            def merge(left: List[str], right: List[str]) -> List[str]:
+                merged = []
+                i = j = 0
+                while i < len(left) and j < len(right):
+                    if beats(left[i], right[j]):
+                        merged.append(left[i])
+                        i += 1
+                    else:
+                        merged.append(right[j])
+                        j += 1
+                return merged + left[i:] + right[j:]
+
+            # Merges get their own pool: they block on judge calls in `calls`
+            runs = [[name] for name in names]
+            with ThreadPoolExecutor(max_workers=max(1, len(names) // 2)) as merges:
+                while len(runs) > 1:
+                    pairs = [(runs[i], runs[i + 1]) for i in range(0, len(runs) - 1, 2)]
+                    merged = list(merges.map(bind(lambda pair: merge(*pair)), pairs))
+                    if len(runs) % 2:
+                        merged.append(runs[-1])
+                    runs = merged
+
+        # Merges finish in thread order; Elo depends on match order, so apply them in a fixed one
+        matches: List[Tuple[str, str]] = []
+        for (a, b) in sorted(verdicts_by_pair, key=lambda pair: (names.index(pair[0]), names.index(pair[1]))):
+            for verdict in verdicts_by_pair[(a, b)]:
+                if verdict is not None:
+                    matches.append((a, b) if verdict else (b, a))
+
+        if counter["comparisons"] and not matches and failed_judges:
+            raise RuntimeError(f"Every judge failed: {', '.join(sorted(failed_judges))}")
+
+        sort_order = runs[0]
+        if method == "elo":
+            scores = elo(matches, names)
+        else:
+            scores = bradley_terry(matches, names)
+        consensus = sorted(names, key=lambda c: (-scores[c], sort_order.index(c)))
+
+        return TournamentResult(
+            question=question,
+            competitors=names,
+            answers=answers,
+            judge_rankings={},
+            consensus=consensus,
+            scores=scores,
+            method=f"pairwise-{method}",
+            comparisons=counter["comparisons"],
+            failed_judges=sorted(failed_judges)
+        )
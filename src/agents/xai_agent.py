@@ -1,9 +1,12 @@
 """
 xAI (Grok) agent implementation.
 """
-from openai import OpenAI
+import threading
 from typing import Dict, Any, List, Union
 from src.utils.config import Config
+from src.utils.metrics import provider_call, provider_http_client, record_usage
+from src.utils.scheduler import provider_slot
+from src.utils.tracing import span
 
 
 class XAIAgent:
@@ -17,10 +20,22 @@ class XAIAgent:
         if not self.api_key:
             raise ValueError("XAI_API_KEY is not set. Please check your .env file.")
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=Config.XAI_BASE_URL
-        )
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """OpenAI-compatible client, created (and openai imported) on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=self.api_key,
+                        base_url=Config.XAI_BASE_URL,
+                        http_client=provider_http_client(self.model_name)  # Counts every HTTP status, retries included
+                    )
+        return self._client
 
     def generate(
         self,
@@ -49,18 +64,24 @@ class XAIAgent:
             messages = query
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
-                max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
-            )
+            with span("xai.request", model=self.model_name) as current, \
+                    provider_slot(self.model_name), provider_call(self.model_name):
+                response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    temperature=kwargs.get("temperature", Config.DEFAULT_TEMPERATURE),
+                    max_tokens=kwargs.get("max_tokens", Config.DEFAULT_MAX_TOKENS)
+                )
+                usage = response.usage.model_dump() if response.usage else None
+                record_usage(self.model_name, usage)
+                if usage:
+                    current.set(total_tokens=usage["total_tokens"])
 
             return {
                 "text": response.choices[0].message.content,
                 "model": self.model_name,
                 "metadata": {
-                    "usage": response.usage.model_dump() if response.usage else None,
+                    "usage": usage,
                     "finish_reason": response.choices[0].finish_reason,
                     **kwargs
                 }
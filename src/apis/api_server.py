@@ -1,17 +1,33 @@
 """
 FastAPI server for your agentic AI system.
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Union, Optional
-import uuid
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, List, Dict, Union, Optional
+import asyncio
+import functools
+import importlib
+import json
+import time
 from datetime import datetime
 
 from src.utils.cache import LLMCache
 from src.utils.config import Config
+from src.utils.faq_store import faq_store
 from src.agents.gemini_agent import GeminiAgent
 from src.agents.xai_agent import XAIAgent
+from src.agents.me.profile_store import profile_store
+from src.agents.tournament import Tournament, AGGREGATION_METHODS, PAIRWISE_METHODS
+from src.models.tournament import TournamentResult
+from src.models.job import Job, JobKind
+from src.utils.job_queue import JobQueue, current_job_id
+from src.utils.admission import AdmissionController, AdmissionRejected
+from src.utils.scheduler import scheduler_stats
+from src.utils import metrics, tracing
+from src.utils.lazy import Lazy
 
 # Initialize FastAPI
 app = FastAPI(
@@ -29,10 +45,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize cache and agents
-cache = LLMCache(cache_dir=str(Config.CACHE_DIR))
-gemini = GeminiAgent()
-xai = XAIAgent()
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Root span per request, sampled at Config.TRACE_SAMPLE_RATE ("X-Trace: 1" forces it).
+    Time in this span outside the endpoint span is request parsing/validation
+    and response serialization.
+    """
+    sampled = True if request.headers.get("x-trace") == "1" else None
+    with tracing.trace(f"{request.method} {request.url.path}", sampled=sampled) as root:
+        response = await call_next(request)
+        root.set(status=response.status_code)
+    if isinstance(root, tracing.Span):
+        response.headers["X-Trace-Id"] = root.trace_id
+    return response
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    """Request count and latency per route template, method and model (set by endpoints)."""
+    start = time.perf_counter()
+    status = 500
+    with metrics.request_labels() as labels:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            route = request.scope.get("route")
+            route_path = route.path if route else "unmatched"
+            model = labels.get("model", "")
+            metrics.HTTP_LATENCY.observe(
+                time.perf_counter() - start, route=route_path, method=request.method, model=model
+            )
+            metrics.HTTP_REQUESTS.inc(route=route_path, method=request.method, model=model, status=status)
+    return response
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.on_event("startup")
+async def start_metrics():
+    # Runs in every worker process, after the fork
+    metrics.registry.start()
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    # Every worker process runs its own job worker threads on the shared queue
+    jobs.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    # Let running jobs finish; whatever is left is requeued for the next worker
+    await run_in_threadpool(jobs.stop, Config.GRACEFUL_TIMEOUT)
+
+
+@app.on_event("shutdown")
+async def stop_metrics():
+    # Final snapshot with in-flight gauges at zero, after in-flight requests drained
+    metrics.registry.close()
+
+
+# Cache and agents are built on first use, so startup needs no API keys
+cache = Lazy(lambda: LLMCache(cache_dir=str(Config.CACHE_DIR)))
+gemini = Lazy(GeminiAgent)
+xai = Lazy(XAIAgent)
+
+# Sheds provider-calling requests under overload (cache hits bypass it)
+admission = AdmissionController()
+
+# Durable job queue (see src/utils/job_queue.py); worker threads start with each server process
+jobs = Lazy(lambda: JobQueue(handlers=JOB_HANDLERS))
 
 
 # Request/Response models
@@ -65,30 +157,80 @@ class CompareResponse(BaseModel):
     results: List[Dict[str, str]]
 
 
-# Endpoints
-@app.get("/")
-async def root():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "service": "Agentic AI API",
-        "version": "1.0.0"
-    }
+class TournamentRequest(BaseModel):
+    query: str
+    competitors: List[str] = ["gemini", "xai"]
+    judges: List[str] = ["gemini", "xai"]
+    method: str = "borda"
 
 
-@app.post("/generate", response_model=GenerateResponse)
-async def generate(request: GenerateRequest):
+class ChatRequest(BaseModel):
+    message: str
+    history: List[Message] = []
+    model: str = "gemini"
+
+
+class ChatResponse(BaseModel):
+    profile_id: str
+    text: str
+    model: str
+    cached: bool
+
+
+class GapAnalysisParams(BaseModel):
+    batch_size: int = 1
+    incremental: bool = True
+    concurrency: Optional[int] = None
+
+
+class EvaluationParams(BaseModel):
+    questions: Optional[List[str]] = None
+    batch_size: int = 1
+    concurrency: Optional[int] = None
+
+
+class JobRequest(BaseModel):
+    kind: JobKind
+    params: Dict[str, Any] = {}
+
+
+def preload():
     """
-    Generate response from a single AI model.
+    Build shared read-only state before worker processes are forked
+    (run_server.py --prod), so every worker starts warm and shares it
+    copy-on-write. Must not open the cache or API clients: sockets and SQLite
+    connections are per process, and stay lazy until a worker uses them.
+    """
+    import openai  # noqa: F401  Heavy module: import once, share the pages
 
-    Example:
-        POST /generate
-        {
-            "query": "What is quantum computing?",
-            "model": "gemini",
-            "temperature": 0.7
-        }
+    try:
+        profile = profile_store.get()
+        print(f"✓ Preloaded profile: {profile.profile_id}")
+    except FileNotFoundError as e:
+        print(f"Profile not preloaded: {e}")
+
+    faq_store.load()  # Read-only mapping: the workers share its pages
+    if len(faq_store.resolve()):
+        print(f"✓ Mapped FAQ store: {faq_store.describe()}")
+
+    for model in (GenerateRequest, CompareRequest, TournamentRequest, ChatRequest, TournamentResult, Job):
+        model.model_json_schema()
+    app.openapi()  # Cached on the app: /docs and /openapi.json are free afterwards
+
+
+# Shared by the endpoints and the background job handlers
+def client_id(http_request: Request) -> str:
+    """
+    Client identity for per-client admission limits: the peer address. Not a
+    request header, which any client could vary per request; behind a proxy,
+    run uvicorn with --proxy-headers --forwarded-allow-ips <proxy> so the
+    address is the one the trusted proxy forwarded.
     """
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def generate_args(request: GenerateRequest):
+    """Agent and generation kwargs for a GenerateRequest."""
     # Select agent
     if request.model == "gemini":
         agent = gemini
@@ -103,49 +245,61 @@ async def generate(request: GenerateRequest):
         kwargs["temperature"] = request.temperature
     if request.max_tokens is not None:
         kwargs["max_tokens"] = request.max_tokens
+    return agent, kwargs
+
+
+def generate_response(result: Dict[str, Any], cached: bool) -> GenerateResponse:
+    return GenerateResponse(
+        text=result["text"],
+        model=result["model"],
+        cached=cached,
+        metadata=result.get("metadata", {})
+    )
+
+
+def run_generate(request: GenerateRequest) -> GenerateResponse:
+    agent, kwargs = generate_args(request)
 
     # Check if cached
     cached_result = cache.get(agent.model_name, request.query, **kwargs)
-    is_cached = cached_result is not None
+    if cached_result is not None:
+        metrics.CACHE_REQUESTS.inc(model=agent.model_name, result="hit")
+        return generate_response(cached_result, cached=True)
 
-    # Generate or retrieve from cache
+    # Generate (concurrent misses for the same query share one call)
     result = cache.cached_api_call(
         model_name=agent.model_name,
         query=request.query,
         api_function=agent.generate,
         **kwargs
     )
+    return generate_response(result, cached=False)
 
-    return GenerateResponse(
-        text=result["text"],
-        model=result["model"],
-        cached=is_cached,
-        metadata=result.get("metadata", {})
-    )
 
+def compare_agents(request: CompareRequest) -> Dict[str, Any]:
+    """Known models in the request, by name (unknown ones are skipped)."""
+    agents = {"gemini": gemini, "xai": xai}
+    return {name: agents[name] for name in request.models if name in agents}
 
-@app.post("/compare", response_model=CompareResponse)
-async def compare(request: CompareRequest):
-    """
-    Compare responses from multiple models.
 
-    Example:
-        POST /compare
-        {
-            "query": "Explain AI",
-            "models": ["gemini", "xai"]
-        }
-    """
+def cached_compare(request: CompareRequest) -> Optional[CompareResponse]:
+    """The comparison from the cache alone, or None if any model's answer is missing."""
+    results = []
+    agents = compare_agents(request)
+    for model_name, agent in agents.items():
+        cached = cache.get(agent.model_name, request.query)
+        if cached is None:
+            return None  # run_compare counts each model's hit or miss
+        results.append({"model": model_name, "response": cached["text"]})
+    for agent in agents.values():
+        metrics.CACHE_REQUESTS.inc(model=agent.model_name, result="hit")
+    return CompareResponse(query=request.query, results=results)
+
+
+def run_compare(request: CompareRequest) -> CompareResponse:
     results = []
 
-    for model_name in request.models:
-        if model_name == "gemini":
-            agent = gemini
-        elif model_name == "xai":
-            agent = xai
-        else:
-            continue
-
+    for model_name, agent in compare_agents(request).items():
         result = cache.cached_api_call(
             model_name=agent.model_name,
             query=request.query,
@@ -163,16 +317,355 @@ async def compare(request: CompareRequest):
     )
 
 
+# Background job handlers: validated params in, JSON-serializable result out
+def run_generate_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    return run_generate(GenerateRequest(**params)).model_dump()
+
+
+def run_compare_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    return run_compare(CompareRequest(**params)).model_dump()
+
+
+def run_gap_analysis_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    from src.agents.me import gap_analyzer
+
+    # A checkpoint per job: a retried job resumes its own, concurrent jobs don't share one
+    answerable, unanswerable = gap_analyzer.run_gap_analysis(
+        **GapAnalysisParams(**params).model_dump(),
+        run_name=f"gap_analysis_{current_job_id.get()}"
+    )
+    return {
+        "answerable": [log.model_dump() for log in answerable],
+        "unanswerable": [log.model_dump() for log in unanswerable],
+    }
+
+
+def run_evaluation_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    evaluator = importlib.import_module("src.agents.me.response-evaluator")
+
+    options = EvaluationParams(**params)
+    items = evaluator.run_evaluation_suite(
+        test_questions=options.questions,
+        concurrency=options.concurrency,
+        run_name=f"evaluation_suite_{current_job_id.get()}",
+        batch_size=options.batch_size
+    )
+    results = [
+        {"question": item.question, "response": item.answer["text"], **item.result.model_dump()}
+        for item in items
+    ]
+    return {
+        "passed": sum(r["is_accepted"] for r in results),
+        "failed": sum(not r["is_accepted"] for r in results),
+        "results": results,
+    }
+
+
+JOB_HANDLERS = {
+    "generate": run_generate_job,
+    "compare": run_compare_job,
+    "gap_analysis": run_gap_analysis_job,
+    "evaluation": run_evaluation_job,
+}
+JOB_PARAMS = {
+    "generate": GenerateRequest,
+    "compare": CompareRequest,
+    "gap_analysis": GapAnalysisParams,
+    "evaluation": EvaluationParams,
+}
+
+
+# Endpoints
+@app.get("/")
+async def root():
+    """Health check endpoint."""
+    return {
+        "status": "healthy",
+        "service": "Agentic AI API",
+        "version": "1.0.0"
+    }
+
+
+@app.post("/generate", response_model=GenerateResponse)
+@tracing.traced("endpoint.generate")
+async def generate(request: GenerateRequest, http_request: Request):
+    """
+    Generate response from a single AI model.
+
+    Example:
+        POST /generate
+        {
+            "query": "What is quantum computing?",
+            "model": "gemini",
+            "temperature": 0.7
+        }
+    """
+    metrics.label_request(model=request.model)
+    agent, kwargs = generate_args(request)
+    # Cache lookups may go to disk or the shared tier: never on the event loop
+    cached = await run_in_threadpool(cache.get, agent.model_name, request.query, **kwargs)
+    if cached is not None:
+        metrics.CACHE_REQUESTS.inc(model=agent.model_name, result="hit")
+        return generate_response(cached, cached=True)
+
+    async with admission.slot(client_id(http_request)):
+        return await run_in_threadpool(run_generate, request)
+
+
+@app.post("/compare", response_model=CompareResponse)
+@tracing.traced("endpoint.compare")
+async def compare(request: CompareRequest, http_request: Request):
+    """
+    Compare responses from multiple models.
+
+    Example:
+        POST /compare
+        {
+            "query": "Explain AI",
+            "models": ["gemini", "xai"]
+        }
+    """
+    metrics.label_request(model="+".join(request.models))
+    cached = await run_in_threadpool(cached_compare, request)
+    if cached is not None:
+        return cached
+
+    async with admission.slot(client_id(http_request)):
+        return await run_in_threadpool(run_compare, request)
+
+
+@app.post("/tournament", response_model=TournamentResult)
+@tracing.traced("endpoint.tournament")
+async def tournament(request: TournamentRequest, http_request: Request):
+    """
+    Rank several models' answers with several judges and combine the rankings.
+    method: "borda" / "kemeny" (one prompt with all answers) or
+    "bradley_terry" / "elo" (pairwise comparisons).
+
+    Example:
+        POST /tournament
+        {
+            "query": "Explain AI",
+            "competitors": ["gemini", "xai"],
+            "judges": ["gemini", "xai"],
+            "method": "kemeny"
+        }
+    """
+    metrics.label_request(model="+".join(request.competitors))
+    agents = {"gemini": gemini, "xai": xai}
+    unknown = [name for name in request.competitors + request.judges if name not in agents]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown model(s): {', '.join(unknown)}")
+    if request.method not in AGGREGATION_METHODS + PAIRWISE_METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown method: {request.method}")
+
+    engine = Tournament(
+        competitors={name: agents[name] for name in request.competitors},
+        judges={name: agents[name] for name in request.judges},
+        cache=cache
+    )
+    # Pairwise judging scales past a handful of competitors
+    run = engine.run_pairwise if request.method in PAIRWISE_METHODS else engine.run
+    try:
+        async with admission.slot(client_id(http_request)):
+            return await run_in_threadpool(run, request.query, method=request.method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@app.get("/profiles")
+async def list_profiles():
+    """List available persona profiles and which are loaded in memory."""
+    return {
+        "profiles": profile_store.list_profiles(),
+        **profile_store.stats()
+    }
+
+
+@app.post("/profiles/{profile_id}/chat", response_model=ChatResponse)
+@tracing.traced("endpoint.profile_chat")
+async def chat_with_profile(profile_id: str, request: ChatRequest, http_request: Request):
+    """
+    Chat with a persona, routed by profile ID.
+
+    Example:
+        POST /profiles/tony-gregg/chat
+        {
+            "message": "What is your experience with AKS?",
+            "history": []
+        }
+    """
+    metrics.label_request(model=request.model)
+    try:
+        profile = await run_in_threadpool(profile_store.get, profile_id)  # First use parses the résumé
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if request.model == "gemini":
+        agent = gemini
+    elif request.model == "xai":
+        agent = xai
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown model: {request.model}")
+
+    messages = [{"role": "system", "content": profile.system_prompt}]
+    messages += [m.model_dump() for m in request.history]
+    messages.append({"role": "user", "content": request.message})
+
+    # Cache key is the last user message, so scope it by profile to keep personas apart
+    result = await run_in_threadpool(cache.get, agent.model_name, messages, profile_id=profile_id)
+    is_cached = result is not None
+    if is_cached:
+        metrics.CACHE_REQUESTS.inc(model=agent.model_name, result="hit")
+    else:
+        call = functools.partial(
+            cache.cached_api_call,
+            model_name=agent.model_name,
+            query=messages,
+            api_function=agent.generate,
+            tag=f"profile:{profile_id}",
+            key_kwargs={"profile_id": profile_id}  # Keep personas apart in the cache, not in the response
+        )
+        async with admission.slot(client_id(http_request)):
+            result = await run_in_threadpool(call)
+
+    return ChatResponse(
+        profile_id=profile_id,
+        text=result["text"],
+        model=result["model"],
+        cached=is_cached
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition format, aggregated across all worker processes."""
+    # Reads the other workers' snapshot files
+    text = await run_in_threadpool(metrics.render_metrics)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/admission")
+async def admission_stats():
+    """Admission control and provider scheduler state of the worker process that answers."""
+    return {**admission.stats(), "schedulers": scheduler_stats()}
+
+
+@app.get("/admin/traces")
+async def list_traces(limit: int = 50):
+    """Most recent sampled traces in the in-memory buffer."""
+    return {
+        "sample_rate": Config.TRACE_SAMPLE_RATE,
+        "traces": tracing.tracer.recent_traces(limit)
+    }
+
+
+@app.get("/admin/traces/export")
+async def export_traces(trace_id: Optional[str] = None):
+    """Buffered spans (or one trace) as Chrome trace-event JSON, for chrome://tracing or Perfetto."""
+    spans = tracing.tracer.get_spans(trace_id)
+    if trace_id and not spans:
+        raise HTTPException(status_code=404, detail=f"Trace not found: {trace_id}")
+    return tracing.to_chrome_trace(spans)
+
+
+@app.post("/jobs", response_model=Job, status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a long-running generation, comparison, gap analysis or evaluation
+    and return its job ID immediately. Poll GET /jobs/{id} (optionally with
+    ?wait=<seconds>) or subscribe to GET /jobs/{id}/events for the result.
+
+    Example:
+        POST /jobs
+        {
+            "kind": "generate",
+            "params": {"query": "Explain AI", "model": "xai"}
+        }
+    """
+    try:
+        params = JOB_PARAMS[request.kind](**request.params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    if request.kind == "generate" and params.model not in ("gemini", "xai"):
+        raise HTTPException(status_code=400, detail=f"Unknown model: {params.model}")
+
+    return await run_in_threadpool(jobs.submit, request.kind, params.model_dump())
+
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """Most recent jobs (newest first), optionally filtered by status."""
+    def read():
+        # stats() scans every job record: both reads stay off the event loop
+        return {"jobs": jobs.list_jobs(status, limit), **jobs.stats()}
+
+    return await run_in_threadpool(read)
+
+
+@app.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, wait: float = 0):
+    """Job status and, once finished, its result. wait > 0 long-polls up to that many seconds (max 60) for completion."""
+    # Poll like the SSE stream does instead of holding a worker thread for the whole wait
+    deadline = time.monotonic() + min(max(wait, 0.0), 60.0)
+    while True:
+        job = await run_in_threadpool(jobs.get, job_id)
+        if job is None or job.done or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(Config.JOB_POLL_INTERVAL)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: the job record on every status change, ending when it finishes."""
+    if await run_in_threadpool(jobs.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    async def stream():
+        last_status = None
+        while True:
+            job = await run_in_threadpool(jobs.get, job_id)
+            if job is None:
+                return
+            if job.status != last_status:
+                last_status = job.status
+                yield f"event: {job.status}\ndata: {json.dumps(job.model_dump())}\n\n"
+            if job.done:
+                return
+            await asyncio.sleep(Config.JOB_POLL_INTERVAL)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.delete("/jobs/{job_id}", response_model=Job)
+async def cancel_job(job_id: str):
+    """Cancel a queued job. Jobs that already started can't be cancelled (409)."""
+    job = await run_in_threadpool(jobs.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job.status != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, only queued jobs can be cancelled")
+    return job
+
+
 @app.get("/cache/stats")
 async def cache_stats():
     """Get cache statistics."""
-    return cache.get_cache_size()
+    # Counting entries walks every shard (and may ask the shared tier): keep it off the loop
+    return await run_in_threadpool(cache.get_cache_size)
 
 
 @app.delete("/cache/clear")
 async def clear_cache():
-    """Clear the entire cache."""
-    cache.clear()
-    return {"status": "cache cleared"}
+    """Clear the entire cache, including the frozen FAQ answers."""
+    faq_entries = await run_in_threadpool(cache.clear)
+    return {"status": "cache cleared", "faq_entries_removed": faq_entries}
 
 # Run with: uvicorn api_server:app --reload --port 8000
\ No newline at end of file
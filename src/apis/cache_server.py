@@ -0,0 +1,130 @@
+"""
+Shared LLM cache service for multi-node deployments.
+
+A small HTTP front end to a diskcache directory, so API servers on several
+hosts share one cache tier (see src/utils/remote_cache.py for the client).
+Values must be JSON (LLM response dicts are); requests carry batches of keys
+or entries so a client can pipeline many operations in one round trip.
+
+Run with:
+    uv run python -m src.apis.cache_server [--port 8300] [--dir ./data/cache_server]
+
+and point the API servers at it with REMOTE_CACHE_URL=http://<host>:8300.
+It listens on 127.0.0.1 by default; to serve other hosts (--host 0.0.0.0),
+set CACHE_SERVER_TOKEN on both sides so every request carries a shared token.
+"""
+import argparse
+import ipaddress
+import os
+from typing import Any, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from pydantic import BaseModel
+
+from src.utils.cache_backends import open_backend
+from src.utils.config import Config
+from src.utils.lazy import Lazy
+
+app = FastAPI(title="LLM Cache Service", description="Shared cache tier for the API servers", version="1.0.0")
+
+store = Lazy(lambda: open_backend(str(Config.CACHE_SERVER_DIR), {"backend": "sharded", "shards": Config.CACHE_SHARDS}))
+
+
+class GetRequest(BaseModel):
+    keys: List[str]
+
+
+class Entry(BaseModel):
+    key: str
+    value: Any
+    expire: Optional[float] = None
+    tag: Optional[str] = None
+
+
+class SetRequest(BaseModel):
+    entries: List[Entry]
+
+
+class LockRequest(BaseModel):
+    key: str
+    owner: str
+    expire: float = Config.CACHE_LOCK_EXPIRE
+
+
+def check_token(token: Optional[str]) -> None:
+    if Config.CACHE_SERVER_TOKEN and token != Config.CACHE_SERVER_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid cache token")
+
+
+# Plain `def` endpoints: diskcache blocks, so FastAPI runs them in its thread pool
+@app.get("/health")
+def health():
+    return {"status": "healthy", "service": "LLM Cache Service"}
+
+
+@app.post("/get")
+def get_many(request: GetRequest, x_cache_token: Optional[str] = Header(None)):
+    """Entries (value, tag, absolute expire time) for the keys that exist; missing keys are left out."""
+    check_token(x_cache_token)
+    entries = {}
+    for key in request.keys:
+        entry = store.entry(key)
+        if entry is not None:
+            _, value, expire_time, tag = entry
+            entries[key] = {"value": value, "tag": tag, "expire_time": expire_time}
+    return {"entries": entries}
+
+
+@app.post("/set")
+def set_many(request: SetRequest, x_cache_token: Optional[str] = Header(None)):
+    check_token(x_cache_token)
+    for entry in request.entries:
+        store.set(entry.key, entry.value, expire=entry.expire, tag=entry.tag)
+    return {"stored": len(request.entries)}
+
+
+@app.post("/lock")
+def acquire_lock(request: LockRequest, x_cache_token: Optional[str] = Header(None)):
+    """Try once to take a named lock (e.g. "inflight:<key>") for `owner`; clients poll until acquired."""
+    check_token(x_cache_token)
+    return {"acquired": store.try_lock(request.key, request.owner, request.expire)}
+
+
+@app.post("/unlock")
+def release_lock(request: LockRequest, x_cache_token: Optional[str] = Header(None)):
+    check_token(x_cache_token)
+    return {"released": store.unlock(request.key, request.owner)}  # Compare-and-delete in one transaction
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+@app.get("/stats")
+def stats(x_cache_token: Optional[str] = Header(None)):
+    check_token(x_cache_token)
+    return {"entries": len(store.resolve()), "directory": str(Config.CACHE_SERVER_DIR), **store.describe()}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the shared LLM cache service.")
+    parser.add_argument("--host", default=Config.CACHE_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.CACHE_SERVER_PORT)
+    parser.add_argument("--dir", help="Cache directory (default: Config.CACHE_SERVER_DIR)")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    if not is_loopback(args.host) and not Config.CACHE_SERVER_TOKEN:
+        parser.error(f"refusing to serve the cache on {args.host} without CACHE_SERVER_TOKEN")
+
+    if args.dir:
+        os.environ["CACHE_SERVER_DIR"] = args.dir  # Read by the worker processes' Config
+        Config.CACHE_SERVER_DIR = args.dir
+    uvicorn.run("src.apis.cache_server:app", host=args.host, port=args.port,
+                workers=args.workers, log_level="warning")
@@ -0,0 +1,118 @@
+"""
+Out-of-core data pipeline for the regression examples.
+
+np.loadtxt parses the whole text file into memory on every run. Instead, the
+text dataset is converted once into a binary columnar .npy file (one
+contiguous row per column), which is then opened with np.memmap and read in
+mini-batches. Memory stays bounded by the batch size, so datasets larger than
+RAM can be trained on (see trainer.train_minibatch / train_least_squares_streaming).
+"""
+import json
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+
+def count_rows(text_path, skiprows=1):
+    with open(text_path, "rb") as f:
+        return sum(1 for line in f if line.strip()) - skiprows
+
+
+def convert_text_to_binary(text_path, out_path=None, skiprows=1, chunk_rows=100_000):
+    """
+    Convert a whitespace-separated text dataset into a columnar .npy file.
+
+    Streams the text in chunks of `chunk_rows` lines, so the text is never held
+    in memory at once. Column names come from the header line and are written
+    to a .json sidecar. Returns the .npy path.
+    """
+    text_path = Path(text_path)
+    out_path = Path(out_path) if out_path else text_path.with_suffix(".npy")
+    rows = count_rows(text_path, skiprows)
+
+    with open(text_path, encoding="utf-8") as f:
+        header = [next(f) for _ in range(skiprows)]
+        columns = header[-1].split() if header else []
+
+        first = np.atleast_2d(np.loadtxt(list(islice(f, 1)), ndmin=2))
+        n_cols = first.shape[1]
+        columns = columns if len(columns) == n_cols else ["x%d" % i for i in range(n_cols)]
+
+        # Shape (columns, rows): each column is contiguous on disk
+        data = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float64, shape=(n_cols, rows))
+        data[:, 0] = first[0]
+        position = 1
+        while True:
+            lines = [line for line in islice(f, chunk_rows) if line.strip()]
+            if not lines:
+                break
+            chunk = np.loadtxt(lines, ndmin=2)
+            data[:, position:position + len(chunk)] = chunk.T
+            position += len(chunk)
+        data.flush()
+        del data
+
+    with open(out_path.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump({"columns": columns, "rows": rows, "source": text_path.name}, f)
+    return out_path
+
+
+def open_dataset(path):
+    """Open a converted dataset read-only as a memmap. Returns (data, column names)."""
+    path = Path(path)
+    data = np.load(path, mmap_mode="r")
+    meta_path = path.with_suffix(".json")
+    if meta_path.exists():
+        with open(meta_path, encoding="utf-8") as f:
+            columns = json.load(f)["columns"]
+    else:
+        columns = ["x%d" % i for i in range(data.shape[0])]
+    return data, columns
+
+
+def load_or_convert(text_path, skiprows=1):
+    """Open the binary copy of a text dataset, converting it first if missing or stale."""
+    text_path = Path(text_path)
+    binary_path = text_path.with_suffix(".npy")
+    if not binary_path.exists() or binary_path.stat().st_mtime < text_path.stat().st_mtime:
+        convert_text_to_binary(text_path, binary_path, skiprows=skiprows)
+    return open_dataset(binary_path)
+
+
+def iter_batches(data, batch_size=65_536, target=-1, shuffle=False, seed=None):
+    """
+    Yield (X, Y) mini-batches from a columnar memmap.
+
+    X has shape (batch, features) and Y shape (batch,). With shuffle=True the
+    order of batches is shuffled (rows within a batch stay sequential, so reads
+    remain contiguous).
+    """
+    n_cols, rows = data.shape
+    target = target % n_cols
+    features = [c for c in range(n_cols) if c != target]
+    starts = np.arange(0, rows, batch_size)
+    if shuffle:
+        np.random.default_rng(seed).shuffle(starts)
+
+    for start in starts:
+        end = min(start + batch_size, rows)
+        X = np.array(data[features, start:end].T)  # Copy only this batch into memory
+        Y = np.array(data[target, start:end])
+        yield X, Y
+
+
+# -----------------------------------------------------------------------------
+# Main (run from the repo root: python -m src.machinelearning.basics.dataset)
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    from src.machinelearning.basics import trainer
+
+    data, columns = load_or_convert(Path(__file__).parent / "pizza.txt")
+    print("Opened %s: %d rows, columns %s" % ("pizza.npy", data.shape[1], columns))
+
+    w, b = trainer.train_least_squares_streaming(lambda: iter_batches(data, batch_size=8))
+    print("Streaming least squares: w=%.3f, b=%.3f" % (w[0], b))
+
+    w, b = trainer.train_minibatch(lambda: iter_batches(data, batch_size=8, shuffle=True, seed=0), epochs=200)
+    print("Mini-batch SGD:          w=%.3f, b=%.3f" % (w[0], b))
@@ -0,0 +1,211 @@
+"""
+Hyperparameter sweep for the pizza regression.
+
+Tuning `iterations` and `lr` for pizza.train used to mean editing and re-running
+the script once per setting. This module:
+
+    loss_grid          - loss for a whole grid of (w, b) candidates at once (NumPy broadcasting)
+    train_step_search  - pizza.train's step search, scoring all four neighbours with one loss_grid call
+    run_sweep          - runs every configuration in a process pool and reports timing,
+                         final loss, convergence curves and which runs diverged
+
+Run from the repo root:
+    python -m src.machinelearning.basics.sweep --lrs 0.1 0.01 0.001 --iterations 1000 10000
+"""
+import argparse
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.machinelearning.basics import trainer
+
+CHUNK_ROWS = 65_536  # Rows per broadcast block, bounds memory to grid size x CHUNK_ROWS
+CURVE_POINTS = 100   # Loss samples kept per run for convergence curves
+
+
+def loss_grid(X, Y, ws, bs):
+    """
+    Mean squared error for every (w, b) pair at once.
+
+    ws and bs broadcast against each other (e.g. a meshgrid, or two 1-D arrays
+    of candidates); the result has their broadcast shape.
+    """
+    X = np.asarray(X, dtype=float).ravel()
+    Y = np.asarray(Y, dtype=float).ravel()
+    ws, bs = np.broadcast_arrays(np.asarray(ws, dtype=float), np.asarray(bs, dtype=float))
+
+    total = np.zeros(ws.shape)
+    for start in range(0, len(X), CHUNK_ROWS):
+        x = X[start:start + CHUNK_ROWS]
+        y = Y[start:start + CHUNK_ROWS]
+        # (grid..., 1) * (rows,) -> (grid..., rows)
+        error = ws[..., None] * x + bs[..., None] - y
+        total += np.sum(error ** 2, axis=-1)
+    return total / len(X)
+
+
+def train_step_search(X, Y, iterations, lr, history=None):
+    """
+    Same updates as pizza.train, but the current point and its four neighbours
+    are scored with one broadcast loss evaluation per iteration.
+    """
+    w = b = 0.0
+    steps = np.array([[0, 0], [lr, 0], [-lr, 0], [0, lr], [0, -lr]])
+    for i in range(iterations):
+        candidates = steps + [w, b]
+        losses = loss_grid(X, Y, candidates[:, 0], candidates[:, 1])
+        if history is not None:
+            history.append(losses[0])
+
+        improving = np.nonzero(losses[1:] < losses[0])[0]
+        if len(improving) == 0:
+            return w, b
+        w, b = candidates[improving[0] + 1]  # Same preference order as pizza.train
+
+    raise Exception("Couldn't converge within %d iterations" % iterations)
+
+
+# -----------------------------------------------------------------------------
+# Process pool sweep
+# -----------------------------------------------------------------------------
+_data = {}
+
+
+def _init_worker(X, Y):
+    # Ship the dataset once per worker instead of once per configuration
+    _data["X"], _data["Y"] = X, Y
+
+
+def _status(history, returned):
+    """
+    "converged" only for a run that returned before its iteration limit (the
+    trainers raise at the limit) with a finite loss that never went up;
+    "diverged" if the loss ever increased or stopped being finite.
+    """
+    losses = np.asarray(history, dtype=float)
+    if not np.all(np.isfinite(losses)) or np.any(np.diff(losses) > 0):
+        return "diverged"
+    return "converged" if returned else "iteration limit"
+
+
+def _run_config(config):
+    X, Y = _data["X"], _data["Y"]
+    history = []
+    start = time.perf_counter()
+    try:
+        if config["trainer"] == "step":
+            w, b = train_step_search(X, Y, config["iterations"], config["lr"], history=history)
+        else:
+            w, b = trainer.train_gradient_descent(X, Y, iterations=config["iterations"], lr=config["lr"], history=history)
+            w = w[0]
+        returned = True
+    except trainer.DivergenceError:
+        w = b = None
+        returned = False
+        history.append(np.inf)
+    except Exception:
+        w = b = None
+        returned = False
+    elapsed = time.perf_counter() - start
+
+    status = _status(history, returned)
+    converged = status == "converged"
+    stride = max(1, len(history) // CURVE_POINTS)
+    return {
+        **config,
+        "w": float(w) if converged else None,
+        "b": float(b) if converged else None,
+        "loss": float(loss_grid(X, Y, w, b)) if converged else None,
+        "converged": converged,
+        "status": status,
+        "iterations_run": len(history),
+        "seconds": elapsed,
+        "curve": [float(value) for value in history[::stride]],
+    }
+
+
+def run_sweep(X, Y, lrs, iterations, trainers=("step", "gradient"), workers=None):
+    """Run every (trainer, lr, iterations) configuration in a process pool."""
+    configs = [
+        {"trainer": t, "lr": lr, "iterations": n}
+        for t, lr, n in itertools.product(trainers, lrs, iterations)
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, Y)) as pool:
+        return list(pool.map(_run_config, configs))
+
+
+def best_run(results):
+    """Lowest loss among converged runs (never a diverged one); ties go to the faster run."""
+    converged = [r for r in results if r["converged"]]
+    if not converged:
+        return None
+    return min(converged, key=lambda r: (round(r["loss"], 6), r["seconds"]))
+
+
+def print_report(results):
+    print("%-9s %8s %10s %10s %16s %10s %10s" % ("trainer", "lr", "max iters", "iters run", "status", "loss", "time (ms)"))
+    for r in results:
+        loss = "%.6f" % r["loss"] if r["converged"] else "-"
+        print("%-9s %8g %10d %10d %16s %10s %10.2f" % (
+            r["trainer"], r["lr"], r["iterations"], r["iterations_run"], r["status"], loss, r["seconds"] * 1000
+        ))
+
+    diverged = [r for r in results if r["status"] == "diverged"]
+    if diverged:
+        print("\nDiverged (excluded): %s" % ", ".join(
+            "%s lr=%g iterations=%d" % (r["trainer"], r["lr"], r["iterations"]) for r in diverged
+        ))
+
+    best = best_run(results)
+    if best:
+        print("\nBest: trainer=%s lr=%g iterations=%d => w=%.3f, b=%.3f, loss=%.6f (%.2f ms)" % (
+            best["trainer"], best["lr"], best["iterations"], best["w"], best["b"], best["loss"], best["seconds"] * 1000
+        ))
+    else:
+        print("\nNo configuration converged.")
+
+
+def plot_curves(results):
+    import matplotlib.pyplot as plt
+
+    for r in results:
+        if r["curve"]:
+            plt.plot(r["curve"], label="%s lr=%g" % (r["trainer"], r["lr"]))
+    plt.yscale("log")
+    plt.xlabel("Iteration (sampled)")
+    plt.ylabel("Loss")
+    plt.legend()
+    plt.show()
+
+
+# -----------------------------------------------------------------------------
+# Main
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep learning rates and iteration budgets for the pizza regression.")
+    parser.add_argument("--data", default=str(Path(__file__).parent / "pizza.txt"))
+    parser.add_argument("--lrs", type=float, nargs="+", default=[0.1, 0.03, 0.01, 0.003])
+    parser.add_argument("--iterations", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--trainers", nargs="+", choices=["step", "gradient"], default=["step", "gradient"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="Write all runs (including convergence curves) to this JSON file")
+    parser.add_argument("--plot", action="store_true", help="Plot convergence curves")
+    args = parser.parse_args()
+
+    X, Y = np.loadtxt(args.data, skiprows=1, unpack=True)
+
+    start = time.perf_counter()
+    results = run_sweep(X, Y, args.lrs, args.iterations, args.trainers, args.workers)
+    print("Swept %d configurations in %.2f s\n" % (len(results), time.perf_counter() - start))
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print("\nResults saved to: %s" % args.output)
+    if args.plot:
+        plot_curves(results)
@@ -0,0 +1,207 @@
+"""
+Vectorized trainers for linear regression (pizza.py and friends).
+
+pizza.train steps w and b by a fixed amount and calls loss() up to five times
+per iteration. These trainers use the analytic gradient of the mean squared
+error instead, in batched NumPy math over any number of features:
+
+    train_gradient_descent - full-batch gradient descent on standardized features
+    train_least_squares    - closed-form solution in a single pass
+
+For datasets that don't fit in memory (see dataset.py), the streaming variants
+take a function returning an iterator of (X, Y) mini-batches:
+
+    train_minibatch               - mini-batch gradient descent
+    train_least_squares_streaming - normal equations accumulated batch by batch
+"""
+import numpy as np
+
+MIN_LEARNING_RATE = 1e-12  # Backtracking below this means no step improves the loss any more
+
+
+class DivergenceError(Exception):
+    """The loss went up (or became non-finite) and lowering the learning rate did not help."""
+
+
+def as_matrix(X):
+    """Features as an (m, n) float matrix; a 1-D array is one feature."""
+    X = np.asarray(X, dtype=float)
+    return X.reshape(-1, 1) if X.ndim == 1 else X
+
+
+def predict(X, w, b):
+    return as_matrix(X) @ np.atleast_1d(w) + b
+
+
+def loss(X, Y, w, b):
+    return np.average((predict(X, w, b) - Y) ** 2)
+
+
+def gradients(X, Y, w, b):
+    """Gradient of the mean squared error with respect to w and b."""
+    error = X @ w + b - Y
+    return 2 * (X.T @ error) / len(Y), 2 * np.average(error)
+
+
+def train_gradient_descent(X, Y, iterations=10000, lr=0.5, tolerance=1e-9, history=None, verbose=False):
+    """
+    Full-batch gradient descent. Features are standardized internally so one
+    learning rate suits every column; the returned w, b are on the original scale.
+    A step that would raise the loss is retried with half the learning rate
+    (correlated features can make `lr` too large), so the loss never goes up.
+    Stops when the relative loss improvement drops below `tolerance`.
+    If `history` is a list, the loss of every iteration is appended to it.
+    """
+    X = as_matrix(X)
+    Y = np.asarray(Y, dtype=float)
+
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+
+    w = np.zeros(X.shape[1])
+    b = 0.0
+    error = Z @ w + b - Y
+    current_loss = np.average(error ** 2)
+    for i in range(iterations):
+        if history is not None:
+            history.append(current_loss)
+        if verbose and i % 300 == 0:
+            print("Iteration %4d => Loss: %.6f" % (i, current_loss))
+
+        dw = 2 * (Z.T @ error) / len(Y)
+        db = 2 * np.average(error)
+        while True:
+            new_w = w - lr * dw
+            new_b = b - lr * db
+            new_error = Z @ new_w + new_b - Y
+            new_loss = np.average(new_error ** 2)
+            if new_loss <= current_loss or lr < MIN_LEARNING_RATE:
+                break
+            lr /= 2  # Overshot: backtrack
+        if not np.isfinite(new_loss):
+            raise DivergenceError("Loss is not finite (%s) at iteration %d" % (new_loss, i))
+
+        improvement = current_loss - new_loss
+        if improvement <= tolerance * max(new_loss, 1e-12):
+            if improvement >= 0:
+                w, b = new_w, new_b
+            break
+        w, b, error, current_loss = new_w, new_b, new_error, new_loss
+    else:
+        raise Exception("Couldn't converge within %d iterations" % iterations)
+
+    # Undo the standardization: y = (x - mean) / std * w + b
+    w_original = w / std
+    return w_original, b - mean @ w_original
+
+
+def train_least_squares(X, Y):
+    """Closed-form least squares (one pass over the data)."""
+    X = as_matrix(X)
+    A = np.hstack([X, np.ones((X.shape[0], 1))])
+    solution, *_ = np.linalg.lstsq(A, np.asarray(Y, dtype=float), rcond=None)
+    return solution[:-1], solution[-1]
+
+
+def feature_stats(batches):
+    """Streaming mean and standard deviation of the features (one pass)."""
+    count = 0
+    total = total_sq = 0.0
+    for X, _ in batches():
+        X = as_matrix(X)
+        count += len(X)
+        total = total + X.sum(axis=0)
+        total_sq = total_sq + (X ** 2).sum(axis=0)
+    mean = total / count
+    std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+    std[std == 0] = 1.0
+    return mean, std
+
+
+def train_minibatch(batches, epochs=10, lr=0.1, tolerance=1e-9, history=None, verbose=False):
+    """
+    Mini-batch gradient descent over a stream of (X, Y) batches.
+
+    `batches` is called once per pass and must return a fresh iterator (e.g.
+    lambda: dataset.iter_batches(data)). One extra pass computes feature
+    statistics for standardization. An epoch whose loss is higher than the
+    previous one halves the learning rate (a diverging run settles instead of
+    being mistaken for a converged one). Stops early when the loss improves by
+    less than `tolerance` relative to it. If `history` is a list, the mean loss
+    of every epoch is appended to it.
+    """
+    mean, std = feature_stats(batches)
+    w = np.zeros(len(mean))
+    b = 0.0
+    previous_loss = np.inf
+
+    for epoch in range(epochs):
+        total_loss = 0.0
+        count = 0
+        for X, Y in batches():
+            Z = (as_matrix(X) - mean) / std
+            total_loss += np.sum((Z @ w + b - Y) ** 2)
+            count += len(Y)
+            dw, db = gradients(Z, Y, w, b)
+            w -= lr * dw
+            b -= lr * db
+
+        epoch_loss = total_loss / count
+        if history is not None:
+            history.append(epoch_loss)
+        if verbose:
+            print("Epoch %4d => Loss: %.6f (lr %g)" % (epoch, epoch_loss, lr))
+        if not (np.isfinite(epoch_loss) and np.all(np.isfinite(w))):
+            raise DivergenceError("Loss is not finite (%s) at epoch %d with lr %g" % (epoch_loss, epoch, lr))
+
+        if epoch_loss > previous_loss:
+            if lr < MIN_LEARNING_RATE:
+                break
+            lr /= 2  # Overshot
+        elif previous_loss - epoch_loss <= tolerance * max(epoch_loss, 1e-12):
+            break
+        previous_loss = epoch_loss
+
+    w_original = w / std
+    return w_original, b - mean @ w_original
+
+
+def train_least_squares_streaming(batches):
+    """
+    Exact least squares in one pass: accumulates the normal equations
+    (A^T A, A^T y with A = [X, 1]) batch by batch, so memory is O(features^2).
+    """
+    ata = aty = None
+    for X, Y in batches():
+        X = as_matrix(X)
+        A = np.hstack([X, np.ones((X.shape[0], 1))])
+        ata = A.T @ A if ata is None else ata + A.T @ A
+        aty = A.T @ Y if aty is None else aty + A.T @ Y
+    solution, *_ = np.linalg.lstsq(ata, aty, rcond=None)
+    return solution[:-1], solution[-1]
+
+
+def train(X, Y, mode="gradient", **kwargs):
+    """Train with mode "gradient" (gradient descent) or "least_squares" (closed form)."""
+    if mode == "gradient":
+        return train_gradient_descent(X, Y, **kwargs)
+    if mode == "least_squares":
+        return train_least_squares(X, Y)
+    raise ValueError("Unknown training mode: %s" % mode)
+
+
+# -----------------------------------------------------------------------------
+# Main
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    X, Y = np.loadtxt("pizza.txt", skiprows=1, unpack=True)
+
+    w, b = train(X, Y, mode="gradient", verbose=True)
+    print("\nGradient descent: w=%.3f, b=%.3f, loss=%.6f" % (w[0], b, loss(X, Y, w, b)))
+
+    w, b = train(X, Y, mode="least_squares")
+    print("Least squares:    w=%.3f, b=%.3f, loss=%.6f" % (w[0], b, loss(X, Y, w, b)))
+
+    print("Prediction: x=%d => y=%.2f" % (20, predict([20], w, b)[0]))
@@ -0,0 +1,27 @@
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel
+
+JobKind = Literal["generate", "compare", "gap_analysis", "evaluation"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class Job(BaseModel):
+    id: str
+    kind: JobKind
+    params: Dict[str, Any] = {}
+    status: JobStatus = "queued"
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    heartbeat_at: Optional[float] = None  # Refreshed while running; stale = worker lost
+    worker: Optional[str] = None  # "<hostname>:<pid>" of the worker running it
+    attempts: int = 0
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ResponseLog(BaseModel):
+    query: str
+    response: str
+    could_answer: bool
+    reason: Optional[str] = None
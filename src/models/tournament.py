@@ -0,0 +1,17 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class TournamentResult(BaseModel):
+    question: str
+    competitors: List[str]
+    answers: Dict[str, str]
+    judge_rankings: Dict[str, List[str]]
+    consensus: List[str]
+    # borda: Borda points; kemeny: judge pairwise preferences agreeing with each
+    # competitor's consensus position; pairwise: Bradley-Terry / Elo ratings
+    scores: Dict[str, float]
+    method: str
+    comparisons: int = 0  # Pairwise mode: judge comparisons made (cached or not)
+    failed_judges: List[str] = []  # Judges dropped after provider errors
@@ -0,0 +1,153 @@
+"""
+Admission control and load shedding for requests that call a provider.
+
+Each server process admits at most Config.ADMISSION_MAX_IN_FLIGHT requests
+that may call a provider at a time; the rest wait in a FIFO queue. A request is
+shed straight away instead of queueing when:
+
+- its client already has Config.ADMISSION_PER_CLIENT requests admitted or
+  queued -> 429 Too Many Requests, or
+- the estimated queue wait (requests ahead of it x recent service time / slots)
+  exceeds Config.ADMISSION_MAX_QUEUE_WAIT -> 503 Service Unavailable.
+
+A queued request that still hasn't got a slot after ADMISSION_MAX_QUEUE_WAIT
+seconds also gets a 503. Both carry a Retry-After hint. Failing fast keeps
+provider quota for answers someone is still waiting for, instead of spending
+it on requests whose clients have timed out.
+
+Cache hits don't call a provider and are served without going through here.
+Limits are per process, like the worker's event loop this runs on.
+"""
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from src.utils.config import Config
+from src.utils.metrics import ADMISSION_DECISIONS, ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_QUEUE_WAIT
+
+SERVICE_TIME_ALPHA = 0.2  # Weight of the newest sample in the service-time moving average
+
+
+class AdmissionRejected(Exception):
+    """Request shed by admission control; maps to an HTTP response with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+    """In-flight limit with a bounded-wait FIFO queue and per-client concurrency limits."""
+
+    def __init__(self, max_in_flight: int = None, max_queue_wait: float = None, per_client: int = None):
+        self.max_in_flight = max_in_flight if max_in_flight is not None else Config.ADMISSION_MAX_IN_FLIGHT
+        self.max_queue_wait = max_queue_wait if max_queue_wait is not None else Config.ADMISSION_MAX_QUEUE_WAIT
+        self.per_client = per_client if per_client is not None else Config.ADMISSION_PER_CLIENT
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.clients: Dict[str, int] = defaultdict(int)  # Admitted + queued requests per client
+        self.service_time: Optional[float] = None  # Moving average of admitted request durations
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the request at queue `position` (1 = next) gets a slot."""
+        if self.service_time is None or self.max_in_flight <= 0:
+            return 0.0
+        return position * self.service_time / self.max_in_flight
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "max_in_flight": self.max_in_flight,
+            "max_queue_wait": self.max_queue_wait,
+            "per_client": self.per_client,
+            "service_time": self.service_time,
+        }
+
+    @asynccontextmanager
+    async def slot(self, client: str):
+        """Hold a provider-call slot for the body of the `async with`, or raise AdmissionRejected."""
+        if self.per_client > 0 and self.clients[client] >= self.per_client:
+            ADMISSION_DECISIONS.inc(decision="rejected_client")
+            raise AdmissionRejected(
+                429, f"Too many concurrent requests for client {client} (limit {self.per_client})",
+                retry_after=self.service_time or 1.0
+            )
+
+        self.clients[client] += 1
+        try:
+            await self._acquire()
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._observe(time.perf_counter() - start)
+                self._release()
+        finally:
+            self.clients[client] -= 1
+            if not self.clients[client]:
+                del self.clients[client]
+
+    async def _acquire(self) -> None:
+        if self.max_in_flight <= 0 or (self.in_flight < self.max_in_flight and not self.waiters):
+            self.in_flight += 1
+            ADMISSION_IN_FLIGHT.inc()
+            ADMISSION_DECISIONS.inc(decision="admitted")
+            return
+
+        estimate = self.estimated_wait(len(self.waiters) + 1)
+        if estimate > self.max_queue_wait:
+            ADMISSION_DECISIONS.inc(decision="rejected_overload")
+            raise AdmissionRejected(
+                503, f"Server overloaded: estimated queue wait {estimate:.1f}s", retry_after=estimate
+            )
+
+        # Queue; _release() hands its slot directly to the oldest waiter
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        ADMISSION_QUEUED.inc()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_queue_wait)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self.waiters.remove(future)
+                ADMISSION_DECISIONS.inc(decision="rejected_timeout")
+                raise AdmissionRejected(
+                    503, f"Server overloaded: no capacity within {self.max_queue_wait:.1f}s",
+                    retry_after=self.estimated_wait(len(self.waiters) + 1) or self.max_queue_wait
+                )
+            # The slot arrived just as the wait timed out: keep it
+        except asyncio.CancelledError:
+            # Client went away while queued
+            if future.done():
+                self._release()
+            else:
+                future.cancel()
+                self.waiters.remove(future)
+            raise
+        finally:
+            ADMISSION_QUEUED.dec()
+            ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start)
+        ADMISSION_DECISIONS.inc(decision="admitted_after_queue")
+
+    def _release(self) -> None:
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # Slot changes hands; in_flight unchanged
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.dec()
+
+    def _observe(self, seconds: float) -> None:
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time += SERVICE_TIME_ALPHA * (seconds - self.service_time)
@@ -1,21 +1,70 @@
 """
 Cache utility for LLM API responses.
 """
-import diskcache as dc
+import asyncio
 import hashlib
 import json
-from typing import Any, Callable, Optional
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 
+from src.utils.cache_backends import LAYOUT_CHECK_INTERVAL, CacheBackend, layout_version, open_cache
 from src.utils.config import Config
+from src.utils.faq_store import faq_store
+from src.utils.metrics import CACHE_REQUESTS
+from src.utils.tracing import span, traced
+
+TAG_SEPARATOR = "|"
+
+
+def entry_tag(model_name: str, tag: str = None) -> str:
+    """Stored tag of a cache entry: the model, plus the caller's tag if given ("model|tag")."""
+    return f"{model_name}{TAG_SEPARATOR}{tag}" if tag else model_name
+
+
+def parse_entry_tag(stored: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(model, tag) from a stored tag; (None, None) for entries written without one."""
+    if not stored:
+        return None, None
+    model_name, _, tag = stored.partition(TAG_SEPARATOR)
+    return model_name, tag or None
 
 
 class LLMCache:
     """Cache manager for LLM API responses."""
 
-    def __init__(self, cache_dir: str = "./data/llm_cache"):
-        self.cache = dc.Cache(cache_dir)
+    def __init__(self, cache_dir: str = "./data/llm_cache", backend: CacheBackend = None):
+        # Backend per the directory's recorded layout (see cache_backends.py), in front of
+        # the shared tier if configured; diskcache backends are safe to share between processes
+        self.cache_dir = cache_dir
+        self._backend = backend if backend is not None else open_cache(cache_dir)
+        self._follow_layout = backend is None
+        self._layout_version = layout_version(cache_dir)
+        self._layout_checked = time.monotonic()
+        self._reopen_lock = threading.Lock()
+        # Frozen FAQ answers are checked first; caches on an explicit backend (tools, benchmarks) skip them
+        self.faq = faq_store if backend is None else None
+        self._refreshed = set()  # Keys re-fetched with force_refresh: their FAQ answers are stale here
+        self._async_inflight: Dict[str, List] = {}  # key -> [provider call task, waiters] (acached_api_call)
+
+    @property
+    def cache(self) -> CacheBackend:
+        """The storage backend, reopened if a reshard swapped the directory."""
+        if self._follow_layout and time.monotonic() - self._layout_checked > LAYOUT_CHECK_INTERVAL:
+            self._layout_checked = time.monotonic()
+            version = layout_version(self.cache_dir)
+            if version is not None and version != self._layout_version:
+                with self._reopen_lock:
+                    if version != self._layout_version:
+                        print(f"Cache layout changed in {self.cache_dir}; reopening")
+                        # The previous backend is not closed: calls still using it keep their
+                        # connections to the old (renamed) directory instead of reconnecting by path
+                        self._backend = open_cache(self.cache_dir)
+                        self._layout_version = version
+        return self._backend
 
+    @traced("cache.key")
     def _generate_key(
             self,
             model_name: str,
@@ -59,7 +108,15 @@ class LLMCache:
             **kwargs
     ) -> Optional[Any]:
         key = self._generate_key(model_name, query, use_full_context, **kwargs)
-        return self.cache.get(key)
+        with span("cache.get") as current:
+            if self.faq is not None and key not in self._refreshed:
+                value = self.faq.get(key)
+                if value is not None:
+                    current.set(hit=True, tier="faq")
+                    return value
+            value = self.cache.get(key)
+            current.set(hit=value is not None)
+            return value
 
     def set(
             self,
@@ -67,10 +124,13 @@ class LLMCache:
             query: Any,
             response: Any,
             use_full_context: bool = False,
+            tag: str = None,
             **kwargs
     ) -> None:
         key = self._generate_key(model_name, query, use_full_context, **kwargs)
-        self.cache.set(key, response)
+        with span("cache.set"):
+            # Model and tag are stored with the entry for filtered export (cache_tool export)
+            self.cache.set(key, response, tag=entry_tag(model_name, tag))
 
     def cached_api_call(
             self,
@@ -79,24 +139,119 @@ class LLMCache:
             api_function: Callable,
             force_refresh: bool = False,
             use_full_context: bool = False,  # New parameter
+            tag: str = None,  # Label stored with a new entry, e.g. "profile:<id>" (not part of the key)
+            key_kwargs: Dict[str, Any] = None,  # Part of the key only, not passed to api_function
+            **api_kwargs
+    ) -> Any:
+        key_args = {**api_kwargs, **(key_kwargs or {})}
+        if not force_refresh:
+            cached = self.get(model_name, query, use_full_context, **key_args)
+            if cached is not None:
+                CACHE_REQUESTS.inc(model=model_name, result="hit")
+                print(f"✓ Cache hit for [{model_name}]")
+                return cached
+
+        # One provider call per key across threads and worker processes: concurrent
+        # misses wait for the first caller and return as soon as its result is in the cache
+        key = self._generate_key(model_name, query, use_full_context, **key_args)
+        filled = None
+
+        def written() -> bool:
+            nonlocal filled
+            filled = self.cache.get(key)
+            return filled is not None
+
+        with self.cache.lock(f"inflight:{key}", expire=Config.CACHE_LOCK_EXPIRE,
+                             until=None if force_refresh else written):
+            if not force_refresh and (filled is not None or written()):
+                CACHE_REQUESTS.inc(model=model_name, result="hit")
+                print(f"✓ Cache hit for [{model_name}] (filled by a concurrent call)")
+                return filled
+
+            CACHE_REQUESTS.inc(model=model_name, result="miss")
+            print(f"✗ Cache miss for [{model_name}] - calling API...")
+            with span("provider.call", model=model_name):
+                response = api_function(query, **api_kwargs)
+            self.set(model_name, query, response, use_full_context, tag, **key_args)
+        if force_refresh:
+            self._refreshed.add(key)
+        return response
+
+    async def acached_api_call(
+            self,
+            model_name: str,
+            query: Any,
+            api_function: Callable[..., Awaitable[Any]],
+            force_refresh: bool = False,
+            use_full_context: bool = False,
+            tag: str = None,
+            key_kwargs: Dict[str, Any] = None,
             **api_kwargs
     ) -> Any:
+        """
+        cached_api_call() for a coroutine `api_function`, on the event loop.
+
+        Concurrent misses for one key in this process share one provider call.
+        Cancelling the await (e.g. the chatbot's Stop button) withdraws this
+        caller; once no caller is waiting any more the provider call itself is
+        cancelled. Processes don't coordinate here: the cross-process lock of
+        cached_api_call would block the event loop.
+        """
+        key_args = {**api_kwargs, **(key_kwargs or {})}
         if not force_refresh:
-            cached = self.get(model_name, query, use_full_context, **api_kwargs)
+            # The cache tier may be SQLite or a remote round trip: look it up in a thread
+            cached = await asyncio.to_thread(self.get, model_name, query, use_full_context, **key_args)
             if cached is not None:
+                CACHE_REQUESTS.inc(model=model_name, result="hit")
                 print(f"✓ Cache hit for [{model_name}]")
                 return cached
 
-        print(f"✗ Cache miss for [{model_name}] - calling API...")
-        response = api_function(query, **api_kwargs)
-        self.set(model_name, query, response, use_full_context, **api_kwargs)
+        key = self._generate_key(model_name, query, use_full_context, **key_args)
+        if force_refresh:
+            self._refreshed.add(key)
+        inflight = self._async_inflight.get(key)
+        if inflight is None:
+            CACHE_REQUESTS.inc(model=model_name, result="miss")
+            print(f"✗ Cache miss for [{model_name}] - calling API...")
+            task = asyncio.ensure_future(
+                self._acall_and_store(model_name, query, api_function, use_full_context, tag, key_args, api_kwargs))
+            inflight = self._async_inflight[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget_inflight(key, inflight))
+        else:
+            CACHE_REQUESTS.inc(model=model_name, result="hit")
+            print(f"✓ Waiting for a concurrent call for [{model_name}]")
+
+        inflight[1] += 1
+        try:
+            return await asyncio.shield(inflight[0])
+        finally:
+            inflight[1] -= 1
+            if inflight[1] == 0 and not inflight[0].done():
+                # Nobody is waiting for the answer any more: stop paying for it
+                self._forget_inflight(key, inflight)
+                inflight[0].cancel()
+
+    async def _acall_and_store(self, model_name, query, api_function, use_full_context, tag, key_args, api_kwargs):
+        with span("provider.call", model=model_name):
+            response = await api_function(query, **api_kwargs)
+        # SQLite writes may wait on other writers' locks: keep them off the event loop
+        await asyncio.to_thread(self.set, model_name, query, response, use_full_context, tag, **key_args)
         return response
 
+    def _forget_inflight(self, key: str, inflight: List) -> None:
+        if self._async_inflight.get(key) is inflight:
+            del self._async_inflight[key]
+
     def get_cache_size(self):
         return {
             "cache_size": len(self.cache) if hasattr(self.cache, '__len__') else "unknown",
-            "cache_directory": str(Config.CACHE_DIR)
+            "cache_directory": str(self.cache_dir),
+            **self.cache.describe(),
+            **(self.faq.describe() if self.faq is not None else {})
         }
 
-    def clear(self):
-        self.cache.clear()
\ No newline at end of file
+    def clear(self) -> int:
+        """Clear the cache tier and remove the FAQ store; returns how many FAQ entries were dropped."""
+        self.cache.clear()
+        self._refreshed.clear()
+        return self.faq.remove() if self.faq is not None else 0
\ No newline at end of file
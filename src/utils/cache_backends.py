@@ -0,0 +1,228 @@
+"""
+Storage backends for LLMCache.
+
+    single   one diskcache.Cache (one SQLite database); the original layout
+    sharded  diskcache.FanoutCache: keys hash-partitioned across N databases,
+             so concurrent writers (threads, server workers, batch runs)
+             mostly hit different SQLite write locks
+
+A cache directory records its layout in layout.json. An existing directory is
+always opened with its recorded layout (a directory without one is a
+pre-layout single cache), so changing Config.CACHE_BACKEND / CACHE_SHARDS
+only affects new directories; convert existing ones online with
+
+    python -m src.utils.cache_tool reshard --shards 16
+
+LLMCache re-reads layout.json every LAYOUT_CHECK_INTERVAL seconds and reopens
+the directory when the reshard tool has swapped in a new one.
+
+With Config.REMOTE_CACHE_URL set, open_cache() puts the directory in front of
+the shared cache service as a near cache (see remote_cache.py).
+"""
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import diskcache as dc
+
+from src.utils.config import Config
+
+LAYOUT_FILE = "layout.json"
+LAYOUT_CHECK_INTERVAL = 1.0  # Seconds between layout.json checks in LLMCache
+LOCK_POLL_INTERVAL = 0.002  # First wait between lock attempts; doubles up to LOCK_POLL_MAX
+LOCK_POLL_MAX = 0.1
+
+# (key, value, absolute expire time or None, tag or None)
+Entry = Tuple[str, Any, Optional[float], Optional[str]]
+
+
+class CacheBackend:
+    """Interface LLMCache stores through. Keys are strings, values are picklable."""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None, tag: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def lock(self, key: str, expire: float, until: Callable[[], bool] = None):
+        """
+        Context manager: mutual exclusion on `key` across threads and processes.
+        Yields True once the lock is held. While waiting, `until` (if given) is
+        checked between attempts; when it returns true the wait ends without
+        the lock and False is yielded.
+        """
+        raise NotImplementedError
+
+    def keys(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def entry(self, key: str) -> Optional[Entry]:
+        """Key with its value, expire time and tag (for export and resharding), or None."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class DiskCacheBackend(CacheBackend):
+    """diskcache.Cache or FanoutCache: both are safe to share between processes."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.store.get(key, retry=True)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None, tag: Optional[str] = None) -> None:
+        self.store.set(key, value, expire=expire, tag=tag, retry=True)
+
+    def try_lock(self, key: str, owner: str, expire: float) -> bool:
+        return self.store.add(key, owner, expire=expire, retry=True)
+
+    def unlock(self, key: str, owner: str) -> bool:
+        """Delete the lock if `owner` still holds it (it may have expired and been taken over)."""
+        with self.store.transact(retry=True):
+            if self.store.get(key) != owner:
+                return False
+            return self.store.delete(key)
+
+    @contextmanager
+    def lock(self, key: str, expire: float, until: Callable[[], bool] = None):
+        # Backoff instead of diskcache.Lock's 1 ms spin: fewer SQLite writes from waiters
+        owner = uuid.uuid4().hex
+        wait = LOCK_POLL_INTERVAL
+        while not self.try_lock(key, owner, expire):
+            if until is not None and until():
+                yield False
+                return
+            time.sleep(wait)
+            wait = min(wait * 2, LOCK_POLL_MAX)
+        try:
+            yield True
+        finally:
+            self.unlock(key, owner)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.store)
+
+    def entry(self, key: str) -> Optional[Entry]:
+        value, expire_time, tag = self.store.get(key, expire_time=True, tag=True, retry=True)
+        if value is None:
+            return None
+        return key, value, expire_time, tag
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def clear(self) -> None:
+        self.store.clear(retry=True)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+class SingleBackend(DiskCacheBackend):
+    name = "single"
+
+    def __init__(self, directory: str):
+        super().__init__(dc.Cache(directory, timeout=Config.CACHE_DB_TIMEOUT))
+
+
+class ShardedBackend(DiskCacheBackend):
+    name = "sharded"
+
+    def __init__(self, directory: str, shards: int):
+        self.shards = shards
+        super().__init__(dc.FanoutCache(directory, shards=shards, timeout=Config.CACHE_DB_TIMEOUT))
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.name, "shards": self.shards}
+
+
+BACKENDS = {
+    "single": lambda directory, layout: SingleBackend(directory),
+    "sharded": lambda directory, layout: ShardedBackend(directory, int(layout["shards"])),
+}
+
+
+def read_layout(directory: Path) -> Optional[Dict[str, Any]]:
+    path = Path(directory) / LAYOUT_FILE
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if (Path(directory) / "cache.db").exists():
+        return {"backend": "single"}  # Written before layouts were recorded
+    return None
+
+
+def write_layout(directory: Path, layout: Dict[str, Any]) -> None:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f"{LAYOUT_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**layout, "created": time.time()}, f)
+    os.replace(tmp_path, directory / LAYOUT_FILE)
+
+
+def layout_version(directory: Path) -> Optional[Tuple[int, int]]:
+    """Identity of the directory's layout.json; changes when a reshard swaps directories."""
+    try:
+        stat = os.stat(Path(directory) / LAYOUT_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def default_layout() -> Dict[str, Any]:
+    layout = {"backend": Config.CACHE_BACKEND}
+    if Config.CACHE_BACKEND == "sharded":
+        layout["shards"] = Config.CACHE_SHARDS
+    return layout
+
+
+def open_backend(directory: str, layout: Dict[str, Any] = None) -> CacheBackend:
+    """
+    Open a cache directory with its recorded layout. New directories get
+    `layout` (default: Config.CACHE_BACKEND / CACHE_SHARDS) and record it.
+    """
+    recorded = read_layout(Path(directory))
+    if recorded is None:
+        recorded = layout or default_layout()
+    elif layout and layout["backend"] != recorded["backend"]:
+        print(f"Cache {directory} uses the {recorded['backend']} layout; "
+              f"reshard it to switch to {layout['backend']}")
+
+    if recorded["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown cache backend: {recorded['backend']} (expected one of {', '.join(BACKENDS)})")
+    backend = BACKENDS[recorded["backend"]](str(directory), recorded)
+    if not (Path(directory) / LAYOUT_FILE).exists():
+        write_layout(Path(directory), recorded)
+    return backend
+
+
+def open_cache(directory: str) -> CacheBackend:
+    """
+    Backend LLMCache serves from: the directory's own backend, fronting the
+    shared tier when Config.REMOTE_CACHE_URL is set (see remote_cache.py).
+    """
+    backend = open_backend(directory)
+    if Config.REMOTE_CACHE_URL:
+        from src.utils.remote_cache import TieredBackend, remote_for
+        backend = TieredBackend(backend, remote_for(Config.REMOTE_CACHE_URL))
+    return backend
@@ -0,0 +1,442 @@
+"""
+Maintenance commands for the LLM cache directory.
+
+    python -m src.utils.cache_tool info
+    python -m src.utils.cache_tool reshard --shards 16      # or --single
+    python -m src.utils.cache_tool export snapshot.jsonl.gz [--model M ...] [--tag T ...]
+    python -m src.utils.cache_tool import snapshot.jsonl.gz [--overwrite]
+    python -m src.utils.cache_tool warm [--questions-file F] [--rate 2] [--concurrency 4] [--max-calls 100]
+    python -m src.utils.cache_tool compile-faq [--questions-file F] [--profiles P ...] [--tag T ...]
+
+Snapshots are JSON Lines, one entry per line (gzip when the name ends in .gz,
+stdin/stdout for "-"), written and read as a stream so a large cache never has
+to fit in memory. `warm` fills the cache with the chatbot's answers to common
+questions before a new deployment takes traffic, and `compile-faq` freezes
+those answers into the memory-mapped FAQ store (see faq_store.py).
+"""
+import argparse
+import errno
+import gzip
+import importlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.utils.cache import entry_tag, parse_entry_tag
+from src.utils.cache_backends import LAYOUT_CHECK_INTERVAL, CacheBackend, open_backend, read_layout
+from src.utils.config import Config
+from src.utils.faq_store import compile_store
+from src.utils.scheduler import BATCH, prioritized
+
+LOCK_PREFIX = "inflight:"  # Single-flight locks held by cached_api_call, never copied
+CATCH_UP_PASSES = 5
+SWAP_ATTEMPTS = 5  # Times a cache directory recreated mid-swap is moved aside
+
+
+# -----------------------------------------------------------------------------
+# Resharding
+# -----------------------------------------------------------------------------
+def copy_entries(source: CacheBackend, target: CacheBackend, skip_existing: bool = True) -> int:
+    """Copy entries (with their remaining expiry and tag) from source to target. Returns how many."""
+    copied = 0
+    now = time.time()
+    for key in list(source.keys()):
+        if isinstance(key, str) and key.startswith(LOCK_PREFIX):
+            continue
+        if skip_existing and target.get(key) is not None:
+            continue
+        entry = source.entry(key)
+        if entry is None:
+            continue  # Evicted or expired since listing
+        _, value, expire_time, tag = entry
+        expire = None
+        if expire_time is not None:
+            expire = expire_time - now
+            if expire <= 0:
+                continue
+        target.set(key, value, expire=expire, tag=tag)
+        copied += 1
+    return copied
+
+
+def reshard(cache_dir: Path, layout: dict, keep_old: bool = True) -> None:
+    """
+    Rebuild `cache_dir` with a new layout while it stays in use.
+
+    Entries are copied into a sibling directory, followed by catch-up passes
+    for keys written meanwhile (cached responses don't change once written).
+    The directories are then swapped (see swap_in); running LLMCache
+    instances notice the new layout.json within LAYOUT_CHECK_INTERVAL and
+    reopen, and a final pass copies anything still written to the old
+    directory, or to one recreated during the swap, in that window.
+    """
+    cache_dir = Path(cache_dir)
+    current = read_layout(cache_dir)
+    if current is None:
+        raise FileNotFoundError(f"No cache at {cache_dir}")
+    if {k: current.get(k) for k in layout} == layout:
+        print(f"{cache_dir} already uses {layout}")
+        return
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    new_dir = cache_dir.with_name(f"{cache_dir.name}.reshard-{stamp}")
+    old_dir = cache_dir.with_name(f"{cache_dir.name}.old-{stamp}")
+
+    source = open_backend(str(cache_dir))
+    target = open_backend(str(new_dir), layout)
+    print(f"Resharding {cache_dir}: {source.describe()} -> {target.describe()}, {len(source)} entries")
+
+    start = time.perf_counter()
+    copied = copy_entries(source, target, skip_existing=False)
+    print(f"  copied {copied} entries in {time.perf_counter() - start:.1f}s")
+    for attempt in range(CATCH_UP_PASSES):
+        caught_up = copy_entries(source, target)
+        print(f"  catch-up pass {attempt + 1}: {caught_up} new entries")
+        if caught_up == 0:
+            break
+    source.close()
+    target.close()
+
+    strays = swap_in(cache_dir, new_dir, old_dir)
+    print(f"  swapped in the new layout; waiting for running processes to reopen")
+    time.sleep(LAYOUT_CHECK_INTERVAL * 2 + 1)
+
+    new = open_backend(str(cache_dir))
+    for previous in [old_dir] + strays:
+        old = open_backend(str(previous))
+        print(f"  final pass: {copy_entries(old, new)} entries written to {previous.name} during the swap")
+        old.close()
+    new.close()
+
+    if keep_old:
+        print(f"Done. Previous cache kept at {old_dir}")
+    else:
+        for previous in [old_dir] + strays:
+            shutil.rmtree(previous)
+        print("Done. Previous cache removed")
+
+
+def swap_in(cache_dir: Path, new_dir: Path, old_dir: Path) -> List[Path]:
+    """
+    Move `cache_dir` to `old_dir` and `new_dir` into its place.
+
+    The two renames are not atomic together: between them `cache_dir` does not
+    exist, and a process opening the cache in that window (a starting worker,
+    or one reopening after a layout check) recreates it with the default
+    layout and writes there. The second rename then fails on the non-empty
+    directory, so that directory is moved aside as well and the rename retried.
+    Returns the directories moved aside this way; their entries still need
+    merging into the new cache.
+    """
+    os.rename(cache_dir, old_dir)
+    strays = []
+    for attempt in range(SWAP_ATTEMPTS):
+        try:
+            os.rename(new_dir, cache_dir)
+            return strays
+        except OSError as e:
+            if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                raise
+        stray = old_dir.with_name(f"{old_dir.name}.stray-{attempt}")
+        os.rename(cache_dir, stray)
+        strays.append(stray)
+        print(f"  {cache_dir} was recreated during the swap; moved it to {stray.name}")
+    raise RuntimeError(f"{cache_dir} keeps being recreated; new layout left at {new_dir}")
+
+
+# -----------------------------------------------------------------------------
+# Snapshots
+# -----------------------------------------------------------------------------
+def open_snapshot(path: str, mode: str):
+    if path == "-":
+        return sys.stdout if mode == "w" else sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def export_entries(
+        backend: CacheBackend,
+        models: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None
+) -> Iterator[Dict]:
+    """Snapshot records for entries matching any of `models` and any of `tags` (None = all)."""
+    for key in backend.keys():
+        if isinstance(key, str) and key.startswith(LOCK_PREFIX):
+            continue
+        entry = backend.entry(key)
+        if entry is None:
+            continue
+        _, value, expire_time, stored_tag = entry
+        model, tag = parse_entry_tag(stored_tag)
+        if models and model not in models:
+            continue
+        if tags and tag not in tags:
+            continue
+        yield {"key": key, "model": model, "tag": tag, "expire_time": expire_time, "value": value}
+
+
+def export_snapshot(backend: CacheBackend, path: str, models=None, tags=None) -> Dict[str, int]:
+    counts = {"exported": 0, "skipped_unserializable": 0}
+    out = open_snapshot(path, "w")
+    try:
+        for record in export_entries(backend, models, tags):
+            try:
+                line = json.dumps(record, ensure_ascii=False)
+            except TypeError:
+                counts["skipped_unserializable"] += 1
+                continue
+            out.write(line + "\n")
+            counts["exported"] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return counts
+
+
+def import_snapshot(backend: CacheBackend, path: str, overwrite: bool = False) -> Dict[str, int]:
+    """Load a snapshot; existing keys are kept unless `overwrite`, expired entries are dropped."""
+    counts = {"imported": 0, "skipped_existing": 0, "skipped_expired": 0}
+    now = time.time()
+    source = open_snapshot(path, "r")
+    try:
+        for line in source:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            expire = None
+            if record.get("expire_time") is not None:
+                expire = record["expire_time"] - now
+                if expire <= 0:
+                    counts["skipped_expired"] += 1
+                    continue
+            if not overwrite and backend.get(record["key"]) is not None:
+                counts["skipped_existing"] += 1
+                continue
+            stored_tag = entry_tag(record["model"], record.get("tag")) if record.get("model") else None
+            backend.set(record["key"], record["value"], expire=expire, tag=stored_tag)
+            counts["imported"] += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    return counts
+
+
+# -----------------------------------------------------------------------------
+# Warm-up
+# -----------------------------------------------------------------------------
+class RateBudget:
+    """At most `rate` acquisitions per second (evenly spaced) and `max_calls` in total."""
+
+    def __init__(self, rate: float, max_calls: Optional[int] = None):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.max_calls = max_calls
+        self.calls = 0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Wait for the next slot; False once the call budget is spent."""
+        with self.lock:
+            if self.max_calls is not None and self.calls >= self.max_calls:
+                return False
+            self.calls += 1
+            wait = self.next_at - time.monotonic()
+            self.next_at = max(self.next_at, time.monotonic()) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+def default_questions() -> List[str]:
+    """The chatbot's UI examples plus the gap-analysis and evaluation test questions."""
+    from src.agents.me import about_me, gap_analyzer
+    evaluator = importlib.import_module("src.agents.me.response-evaluator")
+
+    questions = about_me.EXAMPLES + gap_analyzer.TEST_QUESTIONS + evaluator.TEST_QUESTIONS
+    return list(dict.fromkeys(questions))
+
+
+def read_questions(path: Optional[str]) -> List[str]:
+    """One question per line of `path`, or default_questions() without one."""
+    if not path:
+        return default_questions()
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def warm(
+        questions: List[str],
+        profile_ids: List[Optional[str]],
+        rate: float,
+        concurrency: int,
+        max_calls: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Answer each question as the chatbot would (same cache keys as about_me and
+    /profiles/{id}/chat). Cached answers are skipped for free; provider calls
+    are spread to at most `rate` per second and `max_calls` in total.
+    """
+    from src.agents.me import about_me
+    from src.agents.me.profile_store import profile_store
+
+    budget = RateBudget(rate, max_calls)
+    counts = {"cached": 0, "warmed": 0, "failed": 0, "over_budget": 0}
+    counts_lock = threading.Lock()
+
+    def count(outcome: str) -> None:
+        with counts_lock:
+            counts[outcome] += 1
+
+    def warm_one(question: str, profile) -> None:
+        if about_me.is_cached(question, [], profile):
+            count("cached")
+            return
+        if not budget.acquire():
+            count("over_budget")
+            return
+        try:
+            about_me.answer(question, [], profile)
+            count("warmed")
+            print(f"  warmed [{profile.profile_id}] {question}")
+        except Exception as e:
+            count("failed")
+            print(f"  failed [{profile.profile_id}] {question}: {e}")
+
+    profiles = [profile_store.get(profile_id) for profile_id in profile_ids]
+    work = [(question, profile) for profile in profiles for question in questions]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        list(pool.map(prioritized(BATCH, lambda item: warm_one(*item)), work))
+    return counts
+
+
+# -----------------------------------------------------------------------------
+# FAQ store
+# -----------------------------------------------------------------------------
+def faq_entries(
+        backend: CacheBackend,
+        questions: List[str],
+        profile_ids: List[Optional[str]],
+        counts: Dict[str, int]
+) -> Iterator[tuple]:
+    """(key, value) of the cached chatbot answer to each question, per profile."""
+    from src.agents.me import about_me
+    from src.agents.me.profile_store import profile_store
+
+    for profile_id in profile_ids:
+        profile = profile_store.get(profile_id)
+        for question in questions:
+            key = about_me.cache_key(question, [], profile)
+            entry = backend.entry(key)
+            if entry is None:
+                counts["not_cached"] += 1
+                print(f"  not cached [{profile.profile_id}] {question}")
+                continue
+            yield key, entry[1]
+
+
+def compile_faq(
+        backend: CacheBackend,
+        output: Path,
+        questions: List[str] = None,
+        profile_ids: List[Optional[str]] = None,
+        models: List[str] = None,
+        tags: List[str] = None
+) -> Dict[str, int]:
+    """
+    Freeze cache entries into the FAQ store: the chatbot answers to `questions`
+    (run `warm` first), or every entry matching `models` / `tags` when given.
+    Entries that are not JSON are skipped.
+    """
+    counts = {"not_cached": 0, "skipped_unserializable": 0}
+    if models or tags:
+        selected = ((record["key"], record["value"]) for record in export_entries(backend, models, tags))
+    else:
+        selected = faq_entries(backend, questions, profile_ids, counts)
+
+    def serializable():
+        for key, value in selected:
+            try:
+                json.dumps(value)
+            except TypeError:
+                counts["skipped_unserializable"] += 1
+                continue
+            yield key, value
+
+    return {**compile_store(serializable(), output), **counts}
+
+
+def info(cache_dir: Path) -> None:
+    layout = read_layout(cache_dir)
+    if layout is None:
+        print(f"No cache at {cache_dir}")
+        return
+    backend = open_backend(str(cache_dir))
+    print(f"{cache_dir}: {backend.describe()}, {len(backend)} entries")
+    backend.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM cache maintenance.")
+    parser.add_argument("--cache-dir", type=Path, default=Config.CACHE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("info", help="Show the cache layout and size")
+
+    reshard_parser = commands.add_parser("reshard", help="Change the cache layout online")
+    target = reshard_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--shards", type=int, help="Sharded layout with this many databases")
+    target.add_argument("--single", action="store_true", help="Back to one database")
+    reshard_parser.add_argument("--delete-old", action="store_true", help="Remove the previous directory afterwards")
+
+    export_parser = commands.add_parser("export", help="Write cache entries to a JSONL snapshot")
+    export_parser.add_argument("path", help="Snapshot file (.jsonl, .jsonl.gz or - for stdout)")
+    export_parser.add_argument("--model", nargs="+", help="Only entries for these model names")
+    export_parser.add_argument("--tag", nargs="+", help="Only entries with these tags, e.g. profile:tony-gregg")
+
+    import_parser = commands.add_parser("import", help="Load a JSONL snapshot into the cache")
+    import_parser.add_argument("path", help="Snapshot file (.jsonl, .jsonl.gz or - for stdin)")
+    import_parser.add_argument("--overwrite", action="store_true", help="Replace entries that already exist")
+
+    warm_parser = commands.add_parser("warm", help="Pre-compute chatbot answers for a question list")
+    warm_parser.add_argument("--questions-file", help="One question per line (default: UI examples + test questions)")
+    warm_parser.add_argument("--profiles", nargs="+", default=[None], help="Profile IDs (default: the default profile)")
+    warm_parser.add_argument("--rate", type=float, default=1.0, help="Max provider calls per second")
+    warm_parser.add_argument("--concurrency", type=int, default=4, help="Max provider calls in flight")
+    warm_parser.add_argument("--max-calls", type=int, default=None, help="Stop calling the provider after this many")
+
+    faq_parser = commands.add_parser("compile-faq", help="Freeze common answers into the memory-mapped FAQ store")
+    faq_parser.add_argument("--output", type=Path, default=Config.FAQ_STORE_PATH)
+    faq_parser.add_argument("--questions-file", help="One question per line (default: UI examples + test questions)")
+    faq_parser.add_argument("--profiles", nargs="+", default=[None], help="Profile IDs (default: the default profile)")
+    faq_parser.add_argument("--model", nargs="+", help="Instead of questions: all entries for these model names")
+    faq_parser.add_argument("--tag", nargs="+", help="Instead of questions: all entries with these tags")
+
+    args = parser.parse_args()
+    if args.command == "info":
+        info(args.cache_dir)
+    elif args.command == "reshard":
+        new_layout = {"backend": "single"} if args.single else {"backend": "sharded", "shards": args.shards}
+        reshard(args.cache_dir, new_layout, keep_old=not args.delete_old)
+    elif args.command == "export":
+        result = export_snapshot(open_backend(str(args.cache_dir)), args.path, args.model, args.tag)
+        print(f"Export: {result}", file=sys.stderr)
+    elif args.command == "import":
+        print(f"Import: {import_snapshot(open_backend(str(args.cache_dir)), args.path, args.overwrite)}")
+    elif args.command == "compile-faq":
+        result = compile_faq(open_backend(str(args.cache_dir)), args.output, read_questions(args.questions_file),
+                             args.profiles, args.model, args.tag)
+        print(f"FAQ store {args.output}: {result}")
+    elif args.command == "warm":
+        question_list = read_questions(args.questions_file)
+        print(f"Warming {len(question_list)} question(s) x {len(args.profiles)} profile(s) "
+              f"at up to {args.rate:g} call(s)/s...")
+        start = time.perf_counter()
+        result = warm(question_list, args.profiles, args.rate, args.concurrency, args.max_calls)
+        print(f"Warm-up: {result} in {time.perf_counter() - start:.1f}s")
@@ -14,16 +14,89 @@ class Config:
     GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY","")
     XAI_API_KEY = os.environ.get("XAI_API_KEY","")
 
-    # Base URLs
-    GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
-    XAI_BASE_URL = "https://api.x.ai/v1"
+    # Base URLs (override to point at a local mock provider, see benchmarks/mock_provider.py)
+    GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
+    XAI_BASE_URL = os.environ.get("XAI_BASE_URL", "https://api.x.ai/v1")
 
     # Model Names
     GEMINI_MODEL = os.environ.get("GEMINI_MODEL")
-    XAI_MODEL = "grok-4-1-fast-reasoning"
+    XAI_MODEL = os.environ.get("XAI_MODEL", "grok-4-1-fast-reasoning")
 
     # Cache settings
-    CACHE_DIR = Path("./data/llm_cache")
+    CACHE_DIR = Path(os.environ.get("CACHE_DIR", "./data/llm_cache"))
+    CACHE_DB_TIMEOUT = float(os.environ.get("CACHE_DB_TIMEOUT", 60))  # Seconds a writer waits on the SQLite lock
+    CACHE_LOCK_EXPIRE = float(os.environ.get("CACHE_LOCK_EXPIRE", 120))  # Max seconds a miss holds its in-flight lock
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "single")  # Layout for new cache dirs: single / sharded
+    CACHE_SHARDS = int(os.environ.get("CACHE_SHARDS", 8))  # SQLite databases in a sharded cache
+
+    FAQ_STORE_PATH = Path(os.environ.get("FAQ_STORE_PATH", "./data/faq_store.bin"))  # From cache_tool compile-faq; absent = off
+
+    # Shared cache tier (src/apis/cache_server.py, client in src/utils/remote_cache.py)
+    REMOTE_CACHE_URL = os.environ.get("REMOTE_CACHE_URL", "")  # Empty = local cache only
+    REMOTE_CACHE_TIMEOUT = float(os.environ.get("REMOTE_CACHE_TIMEOUT", 0.5))  # Seconds per request
+    REMOTE_CACHE_POOL = int(os.environ.get("REMOTE_CACHE_POOL", 16))  # Pooled connections per process
+    REMOTE_CACHE_RETRY_AFTER = float(os.environ.get("REMOTE_CACHE_RETRY_AFTER", 30))  # Seconds local-only after a failure
+    REMOTE_CACHE_BATCH = int(os.environ.get("REMOTE_CACHE_BATCH", 100))  # Writes per pipelined request
+    REMOTE_CACHE_MAX_PENDING = int(os.environ.get("REMOTE_CACHE_MAX_PENDING", 10000))  # Queued writes before dropping
+    REMOTE_CACHE_LOCK_WAIT = float(os.environ.get("REMOTE_CACHE_LOCK_WAIT", 10))  # Seconds to wait for a fleet-wide lock
+    CACHE_SERVER_DIR = Path(os.environ.get("CACHE_SERVER_DIR", "./data/cache_server"))
+    CACHE_SERVER_HOST = os.environ.get("CACHE_SERVER_HOST", "127.0.0.1")  # Other addresses require CACHE_SERVER_TOKEN
+    CACHE_SERVER_PORT = int(os.environ.get("CACHE_SERVER_PORT", 8300))
+    CACHE_SERVER_TOKEN = os.environ.get("CACHE_SERVER_TOKEN", "")
+
+    # Profile store settings (multi-persona serving)
+    PROFILES_DIR = Path(os.environ.get("PROFILES_DIR", "./data/profiles"))
+    DEFAULT_PROFILE_ID = os.environ.get("DEFAULT_PROFILE_ID", "tony-gregg")
+    PROFILE_CACHE_MAX_BYTES = int(os.environ.get("PROFILE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    PROFILE_INGEST_WORKERS = int(os.environ.get("PROFILE_INGEST_WORKERS", os.cpu_count() or 1))
+
+    # Evaluation runner settings (gap analysis / evaluation suites)
+    EVAL_CONCURRENCY = int(os.environ.get("EVAL_CONCURRENCY", 4))  # In-flight calls per provider
+    EVAL_RUNS_DIR = Path(os.environ.get("EVAL_RUNS_DIR", "./data/eval_runs"))
+    GAP_RESULTS_DIR = Path(os.environ.get("GAP_RESULTS_DIR", "./data/gap_results"))
+    PRESCREEN_THRESHOLD = float(os.environ.get("PRESCREEN_THRESHOLD", 0.8))  # 0..1, higher = fewer local decisions
+
+    # Tracing (see src/utils/tracing.py)
+    TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0.0))  # 0..1, fraction of requests traced
+    TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", 10000))  # Finished spans kept in memory
+
+    # Metrics (see src/utils/metrics.py): per-worker snapshots merged on /metrics
+    METRICS_DIR = Path(os.environ.get("METRICS_DIR", "./data/metrics"))
+    METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 1.0))  # Seconds
+
+    # Production server (run_server.py --prod)
+    SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = int(os.environ.get("SERVER_PORT", 8000))
+    SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", os.cpu_count() or 1))
+    GRACEFUL_TIMEOUT = float(os.environ.get("GRACEFUL_TIMEOUT", 30))  # Seconds to drain in-flight requests
+
+    # Admission control (see src/utils/admission.py); limits are per server process
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", 16))  # Provider-calling requests; 0 = no limit
+    ADMISSION_MAX_QUEUE_WAIT = float(os.environ.get("ADMISSION_MAX_QUEUE_WAIT", 5.0))  # Seconds before shedding with 503
+    ADMISSION_PER_CLIENT = int(os.environ.get("ADMISSION_PER_CLIENT", 4))  # Concurrent requests per client; 0 = no limit
+
+    # Provider-call scheduler (see src/utils/scheduler.py); per model, fair queuing per process, shared quota per host
+    SCHEDULER_CAPACITY = int(os.environ.get("SCHEDULER_CAPACITY", 8))  # Concurrent calls per model
+    SCHEDULER_WEIGHTS = os.environ.get("SCHEDULER_WEIGHTS", "interactive=8,batch=1")
+    SCHEDULER_INTERACTIVE_RESERVE = int(os.environ.get("SCHEDULER_INTERACTIVE_RESERVE", 2))  # Slots batch calls leave free
+    SCHEDULER_SHARED_DIR = os.environ.get("SCHEDULER_SHARED_DIR", "")  # Host-wide slot table; empty = per process only (run_server.py --prod: ./data/scheduler)
+    SCHEDULER_SHARED_CAPACITY = int(os.environ.get("SCHEDULER_SHARED_CAPACITY", 0))  # Calls per model across processes; 0 = CAPACITY x SERVER_WORKERS
+    SCHEDULER_LEASE = float(os.environ.get("SCHEDULER_LEASE", 600))  # Seconds a crashed process's shared slots stay taken
+
+    # Background jobs (see src/utils/job_queue.py)
+    JOBS_DIR = Path(os.environ.get("JOBS_DIR", "./data/jobs"))
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))  # Worker threads per server process
+    JOB_LEASE = float(os.environ.get("JOB_LEASE", 60))  # Seconds without heartbeat before a running job is requeued
+    JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETENTION = float(os.environ.get("JOB_RETENTION", 7 * 24 * 3600))  # Seconds finished jobs are kept
+    JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 0.5))  # Seconds between queue/status polls
+
+    # Gradio chatbot (src/agents/me/about_me.py, limits in src/utils/session_limits.py)
+    CHAT_CONCURRENCY = int(os.environ.get("CHAT_CONCURRENCY", 32))  # Turns answered at once
+    CHAT_QUEUE_SIZE = int(os.environ.get("CHAT_QUEUE_SIZE", 200))  # Turns waiting before new ones are turned away
+    CHAT_SESSION_RATE = float(os.environ.get("CHAT_SESSION_RATE", 10))  # Messages per minute per browser session
+    CHAT_SESSION_BURST = int(os.environ.get("CHAT_SESSION_BURST", 3))  # Messages a session may send back to back
+    CHAT_SESSION_MAX_IN_FLIGHT = int(os.environ.get("CHAT_SESSION_MAX_IN_FLIGHT", 1))
 
     # Model Settings
     DEFAULT_TEMPERATURE = 0.7
@@ -0,0 +1,170 @@
+"""
+Frozen answers to the chatbot's canonical questions, memory-mapped.
+
+Most chatbot traffic asks a stable set of questions. `cache_tool compile-faq`
+freezes those cache entries into one immutable file with a precomputed hash
+index; LLMCache.get checks it before the cache tier. A hit is an index probe
+and a JSON decode of the mapped bytes: no SQLite query, no lock, no unpickling.
+The file is mapped read-only, so all worker processes share its pages through
+the OS page cache (one copy in memory however many workers there are).
+
+File layout (little-endian):
+
+    header   MAGIC, slot count (a power of two), entry count
+    index    one slot per SLOT: key hash, record offset, key length, value length
+             (offset 0 = empty slot); open addressing with linear probing,
+             at most half full
+    records  key bytes (UTF-8) followed by the value as JSON (UTF-8)
+
+The compiler writes a temporary file and renames it over the old one; readers
+notice the new file within CHECK_INTERVAL seconds and map it. Clearing the
+cache (LLMCache.clear, /cache/clear) removes the file, which other processes
+notice the same way. A force_refresh call bypasses the FAQ answer for its key
+in its own process; other processes keep serving it until the store is
+recompiled or removed.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.utils.config import Config
+from src.utils.lazy import Lazy
+
+MAGIC = b"LLMFAQ01"
+HEADER = struct.Struct("<8sII")  # magic, slots, entries
+SLOT = struct.Struct("<QQII")  # key hash, record offset, key length, value length
+CHECK_INTERVAL = 1.0  # Seconds between checks for a recompiled file
+
+
+def key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def compile_store(entries: Iterable[Tuple[str, Any]], path: Path) -> Dict[str, int]:
+    """
+    Write (key, JSON-serializable value) pairs to an FAQ store at `path`,
+    replacing any previous one atomically. Later duplicates of a key are ignored.
+    """
+    records: Dict[bytes, bytes] = {}
+    for key, value in entries:
+        records.setdefault(key.encode("utf-8"), json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    slots = 8
+    while slots < len(records) * 2:
+        slots *= 2
+    index = [(0, 0, 0, 0)] * slots
+    data = bytearray()
+    data_start = HEADER.size + slots * SLOT.size
+
+    for key, value in records.items():
+        h = key_hash(key)
+        i = h & (slots - 1)
+        while index[i][1]:
+            i = (i + 1) & (slots - 1)
+        index[i] = (h, data_start + len(data), len(key), len(value))
+        data += key + value
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, slots, len(records)))
+        for slot in index:
+            f.write(SLOT.pack(*slot))
+        f.write(data)
+    os.replace(tmp_path, path)
+    return {"entries": len(records), "slots": slots, "bytes": data_start + len(data)}
+
+
+class FaqStore:
+    """Read-only lookups in a compiled FAQ file; missing file = empty store (thread-safe)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._view: Optional[memoryview] = None
+        self._slots = 0
+        self._entries = 0
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Map the current file (or drop the mapping if it was removed)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._view, self._version = None, None
+            return
+        version = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        if version == self._version:
+            return
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        magic, slots, entries = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled FAQ store")
+        # The previous mapping is left to the GC: lookups may still hold views into it
+        self._view, self._slots, self._entries, self._version = view, slots, entries, version
+
+    def _current(self) -> Optional[memoryview]:
+        if time.monotonic() - self._checked > CHECK_INTERVAL:
+            with self._lock:
+                if time.monotonic() - self._checked > CHECK_INTERVAL:
+                    try:
+                        self.load()
+                    except (OSError, ValueError) as e:
+                        print(f"FAQ store {self.path} not loaded: {e}")
+                        self._view, self._version = None, None
+                    self._checked = time.monotonic()
+        return self._view
+
+    def get_raw(self, key: str) -> Optional[memoryview]:
+        """The stored JSON bytes for `key` as a view into the mapping (no copy), or None."""
+        view = self._current()
+        if view is None:
+            return None
+        key_bytes = key.encode("utf-8")
+        h = key_hash(key_bytes)
+        mask = self._slots - 1
+        i = h & mask
+        while True:
+            slot_hash, offset, key_len, value_len = SLOT.unpack_from(view, HEADER.size + i * SLOT.size)
+            if not offset:
+                return None
+            if slot_hash == h and view[offset:offset + key_len] == key_bytes:
+                start = offset + key_len
+                return view[start:start + value_len]
+            i = (i + 1) & mask
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.get_raw(key)
+        return None if raw is None else json.loads(raw.tobytes())
+
+    def __len__(self) -> int:
+        return self._entries if self._current() is not None else 0
+
+    def remove(self) -> int:
+        """Delete the file and drop the mapping; returns how many entries it had."""
+        entries = len(self)
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._view, self._version, self._entries = None, None, 0
+            self._checked = time.monotonic()
+        return entries
+
+    def describe(self) -> Dict[str, Any]:
+        return {"faq_store": str(self.path), "faq_entries": len(self)}
+
+
+# One mapping per process, shared by every LLMCache
+faq_store = Lazy(lambda: FaqStore(Config.FAQ_STORE_PATH))
@@ -0,0 +1,255 @@
+"""
+Durable background jobs for long-running work (reasoning-model generation,
+model comparisons, gap analysis, evaluation suites).
+
+Jobs and the queue live in a diskcache directory (Config.JOBS_DIR), so they
+survive restarts and are shared by every server worker process: submitting
+appends the job ID to the queue, and each process runs a small pool of worker
+threads that pull IDs atomically, run the registered handler and store the
+result on the job record.
+
+A running job's record carries a heartbeat refreshed by the process running
+it. If that process dies (crash, SIGKILL, deploy), the heartbeat goes stale and
+after Config.JOB_LEASE seconds any worker puts the job back on the queue, up
+to Config.JOB_MAX_ATTEMPTS attempts. Handlers can therefore run more than once
+and should be idempotent; the ones here go through the LLM cache, so a rerun
+only pays for the calls the first attempt didn't finish.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+import diskcache as dc
+
+from src.models.job import Job
+from src.utils.config import Config
+from src.utils.metrics import JOB_DURATION, JOBS_FINISHED
+from src.utils.scheduler import BATCH, priority
+from src.utils.tracing import trace
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+QUEUE_PREFIX = "queue"
+JOB_PREFIX = "job:"
+
+# ID of the job a handler is running for (None outside jobs); stable across retries
+current_job_id: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+
+class JobQueue:
+    """Persistent job store + queue, with a worker pool started per process."""
+
+    def __init__(self, handlers: Dict[str, Handler], jobs_dir: str = None):
+        self.cache = dc.Cache(str(jobs_dir or Config.JOBS_DIR), timeout=Config.CACHE_DB_TIMEOUT)
+        self.handlers = handlers
+        self.worker_id: Optional[str] = None
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._running: Dict[str, threading.Thread] = {}  # Job ID -> worker thread, this process only
+        self._running_lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Records
+    # -------------------------------------------------------------------------
+    def _save(self, job: Job) -> None:
+        # Finished jobs are kept for Config.JOB_RETENTION seconds, then evicted
+        expire = Config.JOB_RETENTION if job.done else None
+        self.cache.set(JOB_PREFIX + job.id, job.model_dump(), expire=expire)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        data = self.cache.get(JOB_PREFIX + job_id)
+        return Job(**data) if data is not None else None
+
+    def _update(self, job_id: str, **changes) -> Optional[Job]:
+        """Read-modify-write one record atomically (across threads and processes)."""
+        with self.cache.transact():
+            job = self.get(job_id)
+            if job is None:
+                return None
+            job = job.model_copy(update=changes)
+            self._save(job)
+        return job
+
+    def list_jobs(self, status: str = None, limit: int = 50) -> List[Job]:
+        """Most recently created jobs first, optionally filtered by status."""
+        jobs = []
+        for key in self.cache.iterkeys():
+            if isinstance(key, str) and key.startswith(JOB_PREFIX):
+                job = self.get(key[len(JOB_PREFIX):])
+                if job and (status is None or job.status == status):
+                    jobs.append(job)
+        jobs.sort(key=lambda j: j.created_at, reverse=True)
+        return jobs[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.list_jobs(limit=None):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "by_status": counts,
+            "workers_per_process": Config.JOB_WORKERS,
+            "jobs_directory": str(self.cache.directory),
+        }
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params, created_at=time.time())
+        with self.cache.transact():
+            self._save(job)
+            self.cache.push(job.id, prefix=QUEUE_PREFIX)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job. Running jobs can't be interrupted and are returned unchanged."""
+        with self.cache.transact():
+            job = self.get(job_id)
+            if job is None or job.status != "queued":
+                return job
+            job = job.model_copy(update={"status": "cancelled", "finished_at": time.time()})
+            self._save(job)
+        return job
+
+    def wait(self, job_id: str, timeout: float, unless_status: str = None) -> Optional[Job]:
+        """
+        Long-poll: return once the job is done or its status differs from
+        `unless_status`, or after `timeout` seconds with its current state.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.done or (unless_status and job.status != unless_status):
+                return job
+            if time.monotonic() >= deadline:
+                return job
+            time.sleep(Config.JOB_POLL_INTERVAL)
+
+    # -------------------------------------------------------------------------
+    # Worker side
+    # -------------------------------------------------------------------------
+    def start(self, workers: int = None) -> None:
+        """Start the worker threads and the heartbeat/reaper thread (once per process, after fork)."""
+        if self._threads:
+            return
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop.clear()
+        for i in range(workers if workers is not None else Config.JOB_WORKERS):
+            self._threads.append(threading.Thread(target=self._work_loop, name=f"job-worker-{i}", daemon=True))
+        self._threads.append(threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stop pulling new jobs and wait up to `timeout` seconds for running ones.
+        Jobs still running afterwards are put back on the queue for the next worker.
+        """
+        self._stop.set()
+        deadline = time.monotonic() + (timeout if timeout is not None else Config.GRACEFUL_TIMEOUT)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self._running_lock:
+            unfinished = list(self._running)
+        for job_id in unfinished:
+            self._requeue(job_id, reason="worker shut down")
+        self._threads = []
+
+    def _claim(self) -> Optional[Job]:
+        """Pull the next queued job and mark it running for this worker."""
+        with self.cache.transact():
+            _, job_id = self.cache.pull(prefix=QUEUE_PREFIX)
+            if job_id is None:
+                return None
+            job = self.get(job_id)
+            if job is None or job.status != "queued":
+                return None  # Cancelled (or evicted) while queued
+            now = time.time()
+            job = job.model_copy(update={
+                "status": "running", "started_at": now, "heartbeat_at": now,
+                "worker": self.worker_id, "attempts": job.attempts + 1, "error": None
+            })
+            self._save(job)
+        return job
+
+    def _work_loop(self) -> None:
+        while not self._stop.is_set():
+            job = self._claim()
+            if job is None:
+                self._stop.wait(Config.JOB_POLL_INTERVAL)
+                continue
+            with self._running_lock:
+                self._running[job.id] = threading.current_thread()
+            try:
+                self._run(job)
+            finally:
+                with self._running_lock:
+                    self._running.pop(job.id, None)
+
+    def _run(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        start = time.perf_counter()
+        # Jobs are background work: their provider calls yield to interactive traffic
+        job_token = current_job_id.set(job.id)
+        with trace(f"job.{job.kind}") as root, priority(BATCH):
+            root.set(job_id=job.id, attempt=job.attempts)
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job kind: {job.kind}")
+                result = handler(job.params)
+                changes = {"status": "succeeded", "result": result}
+            except Exception as e:
+                print(f"Job {job.id} ({job.kind}) failed: {e}")
+                changes = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            finally:
+                current_job_id.reset(job_token)
+        JOB_DURATION.observe(time.perf_counter() - start, kind=job.kind)
+        JOBS_FINISHED.inc(kind=job.kind, status=changes["status"])
+
+        # Only record the outcome if the job is still ours (not reaped after a stall)
+        with self.cache.transact():
+            current = self.get(job.id)
+            if current and current.status == "running" and current.worker == self.worker_id:
+                self._save(current.model_copy(update={**changes, "finished_at": time.time()}))
+
+    def _requeue(self, job_id: str, reason: str) -> None:
+        with self.cache.transact():
+            job = self.get(job_id)
+            if job is None or job.status != "running":
+                return
+            if job.attempts >= Config.JOB_MAX_ATTEMPTS:
+                job = job.model_copy(update={
+                    "status": "failed", "finished_at": time.time(),
+                    "error": f"{reason}; gave up after {job.attempts} attempt(s)"
+                })
+            else:
+                job = job.model_copy(update={"status": "queued", "worker": None, "error": reason})
+                self.cache.push(job.id, prefix=QUEUE_PREFIX, side="front")
+            self._save(job)
+        print(f"Job {job_id}: {reason} -> {job.status}")
+
+    def _heartbeat_loop(self) -> None:
+        interval = Config.JOB_LEASE / 3
+        last_reap = 0.0
+        while not self._stop.wait(interval):
+            with self._running_lock:
+                running = list(self._running)
+            for job_id in running:
+                self._update(job_id, heartbeat_at=time.time())
+
+            if time.monotonic() - last_reap >= Config.JOB_LEASE:
+                last_reap = time.monotonic()
+                self.reap()
+
+    def reap(self) -> int:
+        """Requeue running jobs whose worker stopped heartbeating. Returns how many."""
+        cutoff = time.time() - Config.JOB_LEASE
+        stale = [job for job in self.list_jobs(status="running", limit=None)
+                 if (job.heartbeat_at or 0) < cutoff]
+        for job in stale:
+            self._requeue(job.id, reason=f"worker {job.worker} lost")
+        return len(stale)
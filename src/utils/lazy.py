@@ -0,0 +1,46 @@
+"""
+Deferred construction of module-level singletons.
+
+    gemini = Lazy(GeminiAgent)
+
+reads like a module-level instance, but GeminiAgent() only runs on the first
+attribute access. Importing a module therefore no longer needs every API key,
+client library or resume file: only the code paths that are actually used pay
+for them.
+"""
+import threading
+from typing import Any, Callable
+
+
+class Lazy:
+    """Proxy that builds its target with `factory()` on first use (thread-safe)."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def resolve(self) -> Any:
+        """The underlying object, constructing it if needed."""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+                instance = self._instance
+        return instance
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<Lazy {getattr(self._factory, '__name__', self._factory)} (not loaded)>"
+        return repr(self._instance)
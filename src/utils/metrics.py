@@ -0,0 +1,418 @@
+"""
+Prometheus-style metrics (counters, gauges, histograms) in text exposition format.
+
+Each process keeps its metrics in memory and a background thread writes a
+snapshot to Config.METRICS_DIR/<pid>.json every Config.METRICS_FLUSH_INTERVAL
+seconds. Rendering merges the live state of this process with the snapshots of
+the other processes, so whichever uvicorn worker answers GET /metrics reports
+totals for all of them: counters and histograms are summed, and gauges are
+summed too (in-flight calls across workers). Snapshots left by processes that
+are no longer running are removed, which Prometheus sees as a counter reset.
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.config import Config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, object] = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            samples = [[list(key), value] for key, value in self.values.items()]
+        return {"type": self.kind, "help": self.documentation, "labels": list(self.labelnames), "samples": samples}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def reset(self) -> None:
+        with self.lock:
+            self.values = {key: 0.0 for key in self.values}
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, the last one is +Inf
+                state = self.values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            state["counts"][index] += 1
+            state["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            samples = [[list(key), {"counts": list(v["counts"]), "sum": v["sum"]}] for key, v in self.values.items()]
+        return {"type": self.kind, "help": self.documentation, "labels": list(self.labelnames),
+                "buckets": list(self.buckets), "samples": samples}
+
+
+# -----------------------------------------------------------------------------
+# Registry (per process) and multi-process aggregation
+# -----------------------------------------------------------------------------
+class Registry:
+    def __init__(self, directory: Optional[Path] = None, flush_interval: float = None):
+        self.metrics: Dict[str, Metric] = {}
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval if flush_interval is not None else Config.METRICS_FLUSH_INTERVAL
+        self._flusher = None
+        self._pid = None
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    # -------------------------------------------------------------------------
+    # Snapshot files
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        """Start flushing this process's snapshot (once per process; safe after fork)."""
+        if self.directory is None or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._remove_dead_snapshots()
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _snapshot_path(self, pid: int) -> Path:
+        return self.directory / f"{pid}.json"
+
+    def flush(self) -> None:
+        path = self._snapshot_path(os.getpid())
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)  # Readers never see a half-written file
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Metrics flush failed: {e}")
+
+    def close(self) -> None:
+        """On exit: gauges drop to zero, counters stay until the file is cleaned up."""
+        for metric in self.metrics.values():
+            if isinstance(metric, Gauge):
+                metric.reset()
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def _remove_dead_snapshots(self) -> None:
+        for path in self.directory.glob("*.json"):
+            try:
+                pid = int(path.stem)
+            except ValueError:
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                path.unlink(missing_ok=True)
+
+    def _other_snapshots(self) -> List[Dict]:
+        if self.directory is None or not self.directory.exists():
+            return []
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            if path.stem == str(os.getpid()):
+                continue  # Use this process's live values instead
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                continue
+        return snapshots
+
+    # -------------------------------------------------------------------------
+    # Aggregation and exposition
+    # -------------------------------------------------------------------------
+    def collect(self) -> Dict[str, Dict]:
+        """Merged metrics of all processes writing to the same directory."""
+        merged = self.snapshot()
+        for snapshot in self._other_snapshots():
+            for name, data in snapshot.items():
+                target = merged.setdefault(name, {**data, "samples": []})
+                if data.get("buckets") != target.get("buckets"):
+                    continue  # Bucket layout changed between deployments
+                samples = {tuple(key): value for key, value in target["samples"]}
+                for key, value in data["samples"]:
+                    key = tuple(key)
+                    if key not in samples:
+                        samples[key] = value
+                    elif isinstance(value, dict):
+                        samples[key] = {
+                            "counts": [a + b for a, b in zip(samples[key]["counts"], value["counts"])],
+                            "sum": samples[key]["sum"] + value["sum"],
+                        }
+                    else:
+                        samples[key] = samples[key] + value
+                target["samples"] = [[list(key), value] for key, value in samples.items()]
+        return merged
+
+    def render(self, merged: Dict[str, Dict] = None) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        merged = merged if merged is not None else self.collect()
+        lines = []
+        for name, data in merged.items():
+            lines.append(f"# HELP {name} {data['help']}")
+            lines.append(f"# TYPE {name} {data['type']}")
+            labelnames = data["labels"]
+            for key, value in sorted(data["samples"], key=lambda sample: sample[0]):
+                labels = list(zip(labelnames, key))
+                if data["type"] == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(data["buckets"] + ["+Inf"], value["counts"]):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+registry = Registry(directory=Config.METRICS_DIR)
+
+
+# -----------------------------------------------------------------------------
+# Application metrics
+# -----------------------------------------------------------------------------
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route, method, model and status.",
+    ["route", "method", "model", "status"])
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route, method and model.",
+    ["route", "method", "model"])
+CACHE_REQUESTS = registry.counter(
+    "llm_cache_requests_total", "LLM cache lookups in cached_api_call by model and result (hit/miss).",
+    ["model", "result"])
+REMOTE_CACHE_REQUESTS = registry.counter(
+    "remote_cache_requests_total",
+    "Shared cache tier operations by op (get/set/lock/unlock) and result "
+    "(ok/error/skipped while unreachable/dropped writes).", ["op", "result"])
+PROVIDER_IN_FLIGHT = registry.gauge(
+    "llm_provider_calls_in_flight", "Provider API calls currently in flight.", ["model"])
+PROVIDER_LATENCY = registry.histogram(
+    "llm_provider_request_duration_seconds", "Provider API call latency by model.", ["model"])
+PROVIDER_ERRORS = registry.counter(
+    "llm_provider_errors_total", "Failed provider API calls by model and HTTP status (429 = rate limited).",
+    ["model", "status"])
+PROVIDER_RESPONSES = registry.counter(
+    "llm_provider_http_responses_total", "HTTP responses from providers by model and status, including retried 429s.",
+    ["model", "status"])
+PROVIDER_TOKENS = registry.counter(
+    "llm_provider_tokens_total", "Tokens reported in the providers' usage by model and kind.",
+    ["model", "kind"])
+ADMISSION_DECISIONS = registry.counter(
+    "admission_decisions_total",
+    "Admission decisions for provider-calling requests (admitted, admitted_after_queue, "
+    "rejected_client, rejected_overload, rejected_timeout).", ["decision"])
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight", "Requests holding an admission slot.")
+ADMISSION_QUEUED = registry.gauge(
+    "admission_queued", "Requests waiting for an admission slot.")
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds", "Time queued requests waited for a slot (or until shed).")
+SCHEDULER_QUEUE_DEPTH = registry.gauge(
+    "llm_scheduler_queue_depth", "Provider calls waiting for a scheduler slot by model and priority class.",
+    ["model", "priority"])
+SCHEDULER_WAIT = registry.histogram(
+    "llm_scheduler_wait_seconds", "Time provider calls waited for a scheduler slot by model and priority class.",
+    ["model", "priority"])
+JOBS_FINISHED = registry.counter(
+    "jobs_finished_total", "Background jobs finished by kind and status (succeeded/failed).", ["kind", "status"])
+JOB_DURATION = registry.histogram(
+    "job_duration_seconds", "Background job run time by kind.", ["kind"],
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0))
+
+
+# Per-request labels that endpoints fill in (e.g. the model), read by the HTTP middleware
+_request_labels: contextvars.ContextVar = contextvars.ContextVar("metrics_request_labels", default=None)
+
+
+@contextmanager
+def request_labels():
+    """Collect labels set with label_request() while handling one request."""
+    labels = {}
+    token = _request_labels.set(labels)
+    try:
+        yield labels
+    finally:
+        _request_labels.reset(token)
+
+
+def label_request(**labels) -> None:
+    current = _request_labels.get()
+    if current is not None:
+        current.update(labels)
+
+
+@contextmanager
+def provider_call(model: str):
+    """Track one provider API call: in-flight gauge, latency and errors by status."""
+    PROVIDER_IN_FLIGHT.inc(model=model)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        status = getattr(e, "status_code", None) or type(e).__name__
+        PROVIDER_ERRORS.inc(model=model, status=status)
+        raise
+    finally:
+        PROVIDER_IN_FLIGHT.dec(model=model)
+        PROVIDER_LATENCY.observe(time.perf_counter() - start, model=model)
+
+
+def provider_http_client(model: str):
+    """HTTP client for an OpenAI SDK client that counts every response by status."""
+    from openai import DefaultHttpxClient
+
+    def count_response(response):
+        PROVIDER_RESPONSES.inc(model=model, status=response.status_code)
+
+    return DefaultHttpxClient(event_hooks={"response": [count_response]})
+
+
+def provider_async_http_client(model: str):
+    """provider_http_client() for the OpenAI SDK's async clients."""
+    from openai import DefaultAsyncHttpxClient
+
+    async def count_response(response):
+        PROVIDER_RESPONSES.inc(model=model, status=response.status_code)
+
+    return DefaultAsyncHttpxClient(event_hooks={"response": [count_response]})
+
+
+def record_usage(model: str, usage: Optional[Dict]) -> None:
+    """Count tokens from a response's usage (the agents' metadata["usage"])."""
+    if not usage:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            PROVIDER_TOKENS.inc(usage[kind], model=model, kind=kind.replace("_tokens", ""))
+
+
+def render_metrics() -> str:
+    """All metrics across workers, plus the derived cache hit ratio per model."""
+    merged = registry.collect()
+    totals: Dict[str, Dict[str, float]] = {}
+    for (model, result), value in ((tuple(k), v) for k, v in merged["llm_cache_requests_total"]["samples"]):
+        totals.setdefault(model, {})[result] = value
+    merged["llm_cache_hit_ratio"] = {
+        "type": "gauge",
+        "help": "Share of cached_api_call lookups served from the cache, by model.",
+        "labels": ["model"],
+        "samples": [
+            [[model], counts.get("hit", 0.0) / (counts.get("hit", 0.0) + counts.get("miss", 0.0))]
+            for model, counts in totals.items()
+            if counts.get("hit", 0.0) + counts.get("miss", 0.0) > 0
+        ],
+    }
+    return registry.render(merged)
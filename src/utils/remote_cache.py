@@ -0,0 +1,305 @@
+"""
+Shared cache tier for multi-node deployments.
+
+With REMOTE_CACHE_URL set, LLMCache stores through a TieredBackend:
+
+    near    the node's own cache directory (single or sharded, as before),
+            read first, so repeated questions never leave the host
+    remote  the shared cache service (src/apis/cache_server.py), read on a
+            near miss, so an answer paid for on one node is a hit on all
+
+Reads of the remote tier pull the value with its tag and expiry and copy it
+into the near cache. Writes go to the near cache immediately and to the remote
+tier write-behind: a flusher thread batches up to REMOTE_CACHE_BATCH queued
+entries per request over a pooled keep-alive connection. The in-flight lock of
+cached_api_call is taken on the remote tier, so concurrent misses for one key
+make one provider call across the whole fleet; the holder flushes its write
+before releasing, so waiters find the answer.
+
+The remote tier is an optimization, never a dependency: a failed or slow
+(> REMOTE_CACHE_TIMEOUT) request marks it unreachable for
+REMOTE_CACHE_RETRY_AFTER seconds, during which the node serves from and locks
+on its near cache alone, exactly like a single-node deployment. A fleet-wide
+lock that stays taken for more than REMOTE_CACHE_LOCK_WAIT seconds is given up
+on the same way, for the node's own lock.
+
+Every method blocks on the network; async callers run them in a thread.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from src.utils.cache_backends import CacheBackend, Entry
+from src.utils.config import Config
+from src.utils.metrics import REMOTE_CACHE_REQUESTS
+
+LOCK_POLL_INTERVAL = 0.05  # First wait between /lock attempts; doubles up to LOCK_POLL_MAX
+LOCK_POLL_MAX = 0.5
+
+
+class RemoteUnavailable(Exception):
+    """The shared cache tier did not answer (or is in its retry-after window)."""
+
+
+class RemoteBackend:
+    """Client of the cache service: pooled connections, batched reads and write-behind writes."""
+
+    def __init__(self, url: str, timeout: float = None, pool: int = None, token: str = None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout if timeout is not None else Config.REMOTE_CACHE_TIMEOUT
+        self.pool = pool if pool is not None else Config.REMOTE_CACHE_POOL
+        self.token = token if token is not None else Config.CACHE_SERVER_TOKEN
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+        self._client = None
+        self._pid = None
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._unflushed = 0  # Queued plus in-flight writes
+        self._cond = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+        self._client_lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Transport
+    # -------------------------------------------------------------------------
+
+    @property
+    def client(self):
+        # Created on first use in each process: connections must not cross a fork
+        if self._client is None or self._pid != os.getpid():
+            with self._client_lock:
+                if self._client is None or self._pid != os.getpid():
+                    import httpx
+                    headers = {"X-Cache-Token": self.token} if self.token else {}
+                    self._client = httpx.Client(
+                        base_url=self.url, timeout=self.timeout, headers=headers,
+                        limits=httpx.Limits(max_connections=self.pool, max_keepalive_connections=self.pool))
+                    self._pid = os.getpid()
+                    self._flusher = None
+        return self._client
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def _post(self, op: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.available():
+            REMOTE_CACHE_REQUESTS.inc(op=op, result="skipped")
+            raise RemoteUnavailable(self.last_error)
+        import httpx
+        try:
+            response = self.client.post(path, json=payload)
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            REMOTE_CACHE_REQUESTS.inc(op=op, result="error")
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.down_until = time.monotonic() + Config.REMOTE_CACHE_RETRY_AFTER
+            print(f"Remote cache {self.url} unreachable ({self.last_error}); "
+                  f"local cache only for {Config.REMOTE_CACHE_RETRY_AFTER:.0f}s")
+            raise RemoteUnavailable(self.last_error) from e
+        REMOTE_CACHE_REQUESTS.inc(op=op, result="ok")
+        return data
+
+    # -------------------------------------------------------------------------
+    # Reads and writes
+    # -------------------------------------------------------------------------
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """{key: {"value", "tag", "expire_time"}} for the keys the tier has, in one round trip."""
+        return self._post("get", "/get", {"keys": keys})["entries"]
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None, tag: Optional[str] = None) -> None:
+        """Queue a write for the flusher. Dropped (not raised) when unreachable, non-JSON or backlogged."""
+        if not self.available():
+            REMOTE_CACHE_REQUESTS.inc(op="set", result="skipped")
+            return
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            REMOTE_CACHE_REQUESTS.inc(op="set", result="dropped")
+            return
+        self.client  # Resets the flusher after a fork
+        with self._cond:
+            if len(self._pending) >= Config.REMOTE_CACHE_MAX_PENDING:
+                REMOTE_CACHE_REQUESTS.inc(op="set", result="dropped")
+                return
+            self._pending.append({"key": key, "value": value, "expire": expire, "tag": tag})
+            self._unflushed += 1
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="remote-cache-flusher", daemon=True)
+                self._flusher.start()
+            self._cond.notify_all()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), Config.REMOTE_CACHE_BATCH))]
+            try:
+                self._post("set", "/set", {"entries": batch})
+            except RemoteUnavailable:
+                pass  # Lost writes only cost a later provider call on another node
+            with self._cond:
+                self._unflushed -= len(batch)
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until queued writes are sent (or dropped). False on timeout."""
+        timeout = timeout if timeout is not None else self.timeout * 2
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unflushed == 0, timeout=timeout)
+
+    # -------------------------------------------------------------------------
+    # Locks
+    # -------------------------------------------------------------------------
+
+    def acquire(self, key: str, expire: float, until: Callable[[], bool] = None, timeout: float = None) -> Optional[str]:
+        """
+        Poll the tier until the named lock is ours; returns the owner token to
+        release it with, or None if `until()` became true while waiting.
+        Raises RemoteUnavailable after `timeout` (Config.REMOTE_CACHE_LOCK_WAIT) seconds.
+        """
+        owner = uuid.uuid4().hex
+        timeout = timeout if timeout is not None else Config.REMOTE_CACHE_LOCK_WAIT
+        deadline = time.monotonic() + timeout
+        wait = LOCK_POLL_INTERVAL
+        while not self._post("lock", "/lock", {"key": key, "owner": owner, "expire": expire})["acquired"]:
+            if until is not None and until():
+                return None
+            if time.monotonic() + wait > deadline:
+                REMOTE_CACHE_REQUESTS.inc(op="lock", result="timeout")
+                raise RemoteUnavailable(f"lock {key} still held after {timeout:.0f}s")
+            time.sleep(wait)
+            wait = min(wait * 2, LOCK_POLL_MAX)
+        return owner
+
+    def release(self, key: str, owner: str) -> None:
+        try:
+            self._post("unlock", "/unlock", {"key": key, "owner": owner})
+        except RemoteUnavailable:
+            pass  # The lock expires on its own
+
+    def describe(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "url": self.url,
+            "available": self.available(),
+            "pending_writes": pending,
+            "last_error": self.last_error,
+        }
+
+
+class TieredBackend(CacheBackend):
+    """Near (local) cache in front of the shared remote tier."""
+
+    name = "tiered"
+
+    def __init__(self, near: CacheBackend, remote: RemoteBackend):
+        self.near = near
+        self.remote = remote
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.near.get(key)
+        if value is not None or not self.remote.available():
+            return value
+        try:
+            found = self.remote.get_many([key]).get(key)
+        except RemoteUnavailable:
+            return None
+        if found is None:
+            return None
+        self._fill_near(key, found)
+        return found["value"]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values for the keys found in either tier; remote lookups for near misses share one request."""
+        values = {}
+        missing = []
+        for key in keys:
+            value = self.near.get(key)
+            if value is not None:
+                values[key] = value
+            else:
+                missing.append(key)
+        if missing and self.remote.available():
+            try:
+                found = self.remote.get_many(missing)
+            except RemoteUnavailable:
+                found = {}
+            for key, item in found.items():
+                self._fill_near(key, item)
+                values[key] = item["value"]
+        return values
+
+    def _fill_near(self, key: str, item: Dict[str, Any]) -> None:
+        expire_time = item.get("expire_time")
+        expire = max(expire_time - time.time(), 1.0) if expire_time else None
+        self.near.set(key, item["value"], expire=expire, tag=item.get("tag"))
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None, tag: Optional[str] = None) -> None:
+        self.near.set(key, value, expire=expire, tag=tag)
+        self.remote.set(key, value, expire=expire, tag=tag)
+
+    @contextmanager
+    def lock(self, key: str, expire: float, until: Callable[[], bool] = None):
+        owner = None
+        if self.remote.available():
+            try:
+                owner = self.remote.acquire(key, expire, until)
+            except RemoteUnavailable:
+                owner = None  # Unreachable, or the holder is taking too long
+            else:
+                if owner is None:
+                    yield False
+                    return
+        if owner is None:
+            # Single-flight per node only
+            with self.near.lock(key, expire, until) as acquired:
+                yield acquired
+            return
+        try:
+            yield True
+        finally:
+            self.remote.flush()  # Waiters on other nodes read the holder's answer after release
+            self.remote.release(key, owner)
+
+    # Enumeration, export and size cover this node's near cache
+    def keys(self) -> Iterator[str]:
+        return self.near.keys()
+
+    def entry(self, key: str) -> Optional[Entry]:
+        return self.near.entry(key)
+
+    def __len__(self) -> int:
+        return len(self.near)
+
+    def clear(self) -> None:
+        """Clear the near cache only; the shared tier is managed on the cache server."""
+        self.near.clear()
+
+    def close(self) -> None:
+        self.remote.flush()
+        self.near.close()
+
+    def describe(self) -> Dict[str, Any]:
+        return {**self.near.describe(), "remote": self.remote.describe()}
+
+
+_remotes: Dict[str, RemoteBackend] = {}
+_remotes_lock = threading.Lock()
+
+
+def remote_for(url: str) -> RemoteBackend:
+    """One client (pool, write queue, breaker state) per URL and process, shared across reopens."""
+    remote = _remotes.get(url)
+    if remote is None:
+        with _remotes_lock:
+            remote = _remotes.setdefault(url, RemoteBackend(url))
+    return remote
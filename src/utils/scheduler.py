@@ -0,0 +1,331 @@
+"""
+Provider-call scheduler: shares each model's concurrency between priority
+classes with weighted fair queuing.
+
+Every provider call takes a slot from its model's scheduler first (see the
+agents). A model has Config.SCHEDULER_CAPACITY slots per process. When they are
+all busy, calls queue per priority class, and a freed slot goes to the class
+with the smallest virtual time: each dispatch advances its class by
+1 / weight, so with the default weights (interactive=8, batch=1) interactive
+calls get eight slots for every batch one while both are waiting. A queued
+interactive call therefore jumps ahead of queued batch calls, while batch calls
+still make progress and use all the capacity interactive traffic leaves idle.
+
+While no interactive call is waiting, batch calls leave the last
+Config.SCHEDULER_INTERACTIVE_RESERVE slots free, so a chatbot turn that arrives
+during an evaluation sweep starts right away instead of waiting for a batch
+call to finish.
+
+Async callers (the Gradio chatbot) wait with `async with provider_aslot(model)`,
+which queues the same way without blocking the event loop; a call cancelled
+while queued just leaves the queue.
+
+The priority class comes from the calling context: interactive by default,
+batch inside `with priority("batch")` (evaluation runs, background jobs).
+
+Fair queuing is per process. When Config.SCHEDULER_SHARED_DIR is set (off by
+default; run_server.py --prod sets it for its workers), separate processes on
+one host (the Gradio chatbot, API server workers, a standalone gap_analyzer or
+response-evaluator run started with the same setting) also share a quota
+through SharedSlots, a slot table in that directory: a call holds a host-wide
+lease next to its local slot. Batch calls leave the interactive reserve free host-wide as well, and
+take no new leases while an interactive call anywhere on the host is waiting
+for one. Leases of a crashed process expire after Config.SCHEDULER_LEASE.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import diskcache as dc
+
+from src.utils.config import Config
+from src.utils.lazy import Lazy
+from src.utils.metrics import SCHEDULER_QUEUE_DEPTH, SCHEDULER_WAIT
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+SHARED_POLL_INTERVAL = 0.005  # First wait between shared-slot attempts; doubles up to SHARED_POLL_MAX
+SHARED_POLL_MAX = 0.1
+WAITING_TTL = 1.0  # Seconds an interactive waiter's claim lasts without being renewed by its next attempt
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("provider_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(name: str):
+    """Run provider calls made in this block (and this thread) under priority class `name`."""
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def prioritized(name: str, fn: Callable) -> Callable:
+    """Wrap `fn` to run under priority class `name`, e.g. before handing it to a thread pool."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with priority(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """"interactive=8,batch=1" -> {"interactive": 8.0, "batch": 1.0}"""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+class _FutureReady:
+    """Event-like wakeup for an asyncio waiter, set from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.loop = loop
+        self.future = future
+
+    def set(self) -> None:
+        self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+
+
+class SharedSlots:
+    """
+    Per-model leases in a diskcache directory shared by every process on the
+    host. Each model's entry holds its live leases and the interactive calls
+    waiting for one; every attempt reads and rewrites it in one transaction.
+    """
+
+    def __init__(self, directory: str, capacity: int = None, reserve: int = None, lease: float = None):
+        self.cache = dc.Cache(str(directory), timeout=Config.CACHE_DB_TIMEOUT)
+        self.capacity = capacity or Config.SCHEDULER_SHARED_CAPACITY or Config.SCHEDULER_CAPACITY * Config.SERVER_WORKERS
+        self.reserve = reserve if reserve is not None else Config.SCHEDULER_INTERACTIVE_RESERVE
+        self.lease = lease if lease is not None else Config.SCHEDULER_LEASE
+
+    def _live(self, model: str, now: float) -> Dict[str, Dict[str, Any]]:
+        table = self.cache.get(model, retry=True) or {"leases": {}, "waiting": {}}
+        return {
+            "leases": {ticket: lease for ticket, lease in table["leases"].items() if lease[1] > now},
+            "waiting": {ticket: until for ticket, until in table["waiting"].items() if until > now},
+        }
+
+    def try_acquire(self, model: str, cls: str, ticket: str) -> bool:
+        now = time.time()
+        with self.cache.transact(retry=True):
+            table = self._live(model, now)
+            leases, waiting = table["leases"], table["waiting"]
+            if cls == INTERACTIVE:
+                granted = len(leases) < self.capacity
+            else:
+                granted = not waiting and len(leases) < max(1, self.capacity - self.reserve)
+            if granted:
+                leases[ticket] = [cls, now + self.lease]
+                waiting.pop(ticket, None)
+            elif cls == INTERACTIVE:
+                waiting[ticket] = now + WAITING_TTL
+            self.cache.set(model, table, retry=True)
+        return granted
+
+    def release(self, model: str, ticket: str) -> None:
+        """Drop the ticket's lease or waiting claim."""
+        with self.cache.transact(retry=True):
+            table = self._live(model, time.time())
+            table["leases"].pop(ticket, None)
+            table["waiting"].pop(ticket, None)
+            self.cache.set(model, table, retry=True)
+
+    def acquire(self, model: str, cls: str, ticket: str) -> None:
+        wait = SHARED_POLL_INTERVAL
+        while not self.try_acquire(model, cls, ticket):
+            time.sleep(wait)
+            wait = min(wait * 2, SHARED_POLL_MAX)
+
+    async def aacquire(self, model: str, cls: str, ticket: str) -> None:
+        """acquire() for coroutines; on cancellation nothing of the ticket is left behind."""
+        loop = asyncio.get_running_loop()
+        wait = SHARED_POLL_INTERVAL
+        while True:
+            attempt = loop.run_in_executor(None, self.try_acquire, model, cls, ticket)
+            try:
+                if await asyncio.shield(attempt):
+                    return
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # The attempt may still be running in its thread: clean up once it's done
+                attempt.add_done_callback(lambda _: self.release_later(loop, model, ticket))
+                raise
+            wait = min(wait * 2, SHARED_POLL_MAX)
+
+    def release_later(self, loop: asyncio.AbstractEventLoop, model: str, ticket: str) -> None:
+        """release() in a worker thread, without waiting for it (from event loop code)."""
+        loop.run_in_executor(None, self.release, model, ticket)
+
+    def stats(self, model: str) -> Dict:
+        table = self._live(model, time.time())
+        return {"in_use": len(table["leases"]), "capacity": self.capacity, "waiting": len(table["waiting"])}
+
+
+_shared_slots = Lazy(lambda: SharedSlots(Config.SCHEDULER_SHARED_DIR))
+
+
+def shared_slots() -> Optional[SharedSlots]:
+    """The host-wide slot table, or None when Config.SCHEDULER_SHARED_DIR is empty."""
+    return _shared_slots.resolve() if Config.SCHEDULER_SHARED_DIR else None
+
+
+class ProviderScheduler:
+    """Weighted fair queuing of provider calls for one model (thread-safe)."""
+
+    def __init__(self, model: str, capacity: int = None, weights: Dict[str, float] = None, reserve: int = None,
+                 shared: SharedSlots = None):
+        self.model = model
+        self.capacity = capacity if capacity is not None else Config.SCHEDULER_CAPACITY
+        self.weights = weights or parse_weights(Config.SCHEDULER_WEIGHTS)
+        self.reserve = reserve if reserve is not None else Config.SCHEDULER_INTERACTIVE_RESERVE
+        self.in_use = 0
+        self.queues: Dict[str, Deque[Tuple[Any, float]]] = {name: deque() for name in self.weights}
+        self.virtual: Dict[str, float] = {name: 0.0 for name in self.weights}
+        self.now = 0.0  # Virtual time of the last dispatch
+        self.lock = threading.Lock()
+        self.shared = shared
+
+    def limit(self, cls: str) -> int:
+        """
+        Slots class `cls` may fill. Batch leaves the interactive reserve free for
+        arriving interactive calls; once those are queued, the weights decide.
+        """
+        if cls == INTERACTIVE or self.queues.get(INTERACTIVE):
+            return self.capacity
+        return max(1, self.capacity - self.reserve)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            stats = {
+                "in_use": self.in_use,
+                "capacity": self.capacity,
+                "queued": {name: len(queue) for name, queue in self.queues.items()},
+            }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats(self.model)
+        return stats
+
+    @contextmanager
+    def slot(self, cls: str = None):
+        cls = cls or _priority.get()
+        if cls not in self.queues:
+            raise ValueError(f"Unknown priority class: {cls} (expected one of {', '.join(self.queues)})")
+
+        waiter = (threading.Event(), time.perf_counter())
+        self._enqueue(cls, waiter)
+        waiter[0].wait()
+        try:
+            ticket = uuid.uuid4().hex
+            if self.shared is not None:
+                self.shared.acquire(self.model, cls, ticket)
+            SCHEDULER_WAIT.observe(time.perf_counter() - waiter[1], model=self.model, priority=cls)
+            try:
+                yield
+            finally:
+                if self.shared is not None:
+                    self.shared.release(self.model, ticket)
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, cls: str = None):
+        """slot() for coroutines: waits without blocking the event loop."""
+        cls = cls or _priority.get()
+        if cls not in self.queues:
+            raise ValueError(f"Unknown priority class: {cls} (expected one of {', '.join(self.queues)})")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (_FutureReady(loop, future), time.perf_counter())
+        self._enqueue(cls, waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                if waiter in self.queues[cls]:
+                    self.queues[cls].remove(waiter)
+                    SCHEDULER_QUEUE_DEPTH.dec(model=self.model, priority=cls)
+                    raise
+            self._release()  # Dispatched while being cancelled: hand the slot on
+            raise
+        try:
+            ticket = uuid.uuid4().hex
+            if self.shared is not None:
+                await self.shared.aacquire(self.model, cls, ticket)
+            SCHEDULER_WAIT.observe(time.perf_counter() - waiter[1], model=self.model, priority=cls)
+            try:
+                yield
+            finally:
+                if self.shared is not None:
+                    self.shared.release_later(loop, self.model, ticket)
+        finally:
+            self._release()
+
+    def _enqueue(self, cls: str, waiter: Tuple[Any, float]) -> None:
+        with self.lock:
+            if not self.queues[cls]:
+                # A class returning from idle starts at the current virtual time (no banked credit)
+                self.virtual[cls] = max(self.virtual[cls], self.now)
+            self.queues[cls].append(waiter)
+            SCHEDULER_QUEUE_DEPTH.inc(model=self.model, priority=cls)
+            self._dispatch()
+
+    def _release(self) -> None:
+        with self.lock:
+            self.in_use -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting calls, smallest virtual time first. Caller holds the lock."""
+        while True:
+            eligible = [
+                name for name, queue in self.queues.items()
+                if queue and self.in_use < self.limit(name)
+            ]
+            if not eligible:
+                return
+            cls = min(eligible, key=lambda name: (self.virtual[name], name != INTERACTIVE))
+            ready, _ = self.queues[cls].popleft()
+            self.now = self.virtual[cls]
+            self.virtual[cls] += 1.0 / self.weights[cls]
+            self.in_use += 1
+            SCHEDULER_QUEUE_DEPTH.dec(model=self.model, priority=cls)
+            ready.set()
+
+
+_schedulers: Dict[str, ProviderScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler_for(model: str) -> ProviderScheduler:
+    scheduler = _schedulers.get(model)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.setdefault(model, ProviderScheduler(model, shared=shared_slots()))
+    return scheduler
+
+
+def provider_slot(model: str):
+    """Context manager holding a scheduler slot for one call to `model`, in the current priority class."""
+    return scheduler_for(model).slot()
+
+
+def provider_aslot(model: str):
+    """Async context manager: provider_slot() for coroutines."""
+    return scheduler_for(model).aslot()
+
+
+def scheduler_stats() -> Dict[str, Dict]:
+    return {model: scheduler.stats() for model, scheduler in list(_schedulers.items())}
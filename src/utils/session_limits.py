@@ -0,0 +1,81 @@
+"""
+Per-session limits for the Gradio chatbot.
+
+Every browser session (Gradio's session hash) gets a token bucket of
+Config.CHAT_SESSION_RATE messages per minute with bursts of
+Config.CHAT_SESSION_BURST, and may have at most
+Config.CHAT_SESSION_MAX_IN_FLIGHT turns being answered at once. One visitor
+pasting questions in a loop therefore slows down to the sustained rate instead
+of filling the queue and the provider quota that other visitors share.
+
+State is per process and bounded: the least recently seen sessions are
+forgotten beyond MAX_SESSIONS.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from src.utils.config import Config
+
+MAX_SESSIONS = 10000
+
+
+class SessionLimited(Exception):
+    """A session exceeded its rate or in-flight limit."""
+
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+@dataclass
+class _Session:
+    tokens: float
+    updated: float = field(default_factory=time.monotonic)
+    in_flight: int = 0
+
+
+class SessionLimiter:
+    """Token bucket plus in-flight cap per session (thread-safe)."""
+
+    def __init__(self, rate_per_minute: float = None, burst: int = None, max_in_flight: int = None):
+        self.rate = (rate_per_minute if rate_per_minute is not None else Config.CHAT_SESSION_RATE) / 60.0
+        self.burst = burst if burst is not None else Config.CHAT_SESSION_BURST
+        self.max_in_flight = max_in_flight if max_in_flight is not None else Config.CHAT_SESSION_MAX_IN_FLIGHT
+        self.sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _session(self, session_id: str) -> _Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = _Session(tokens=self.burst)
+            while len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        now = time.monotonic()
+        session.tokens = min(self.burst, session.tokens + (now - session.updated) * self.rate)
+        session.updated = now
+        return session
+
+    @contextmanager
+    def turn(self, session_id: str):
+        """Hold one of the session's turns for the body of the `with`, or raise SessionLimited."""
+        with self.lock:
+            session = self._session(session_id)
+            if session.in_flight >= self.max_in_flight:
+                raise SessionLimited("Please wait for the current answer before asking again.", 1)
+            if session.tokens < 1:
+                wait = (1 - session.tokens) / self.rate if self.rate > 0 else 60
+                raise SessionLimited(f"You're sending messages quickly; try again in {math.ceil(wait)}s.", wait)
+            session.tokens -= 1
+            session.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                session.in_flight -= 1
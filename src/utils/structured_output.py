@@ -0,0 +1,382 @@
+"""
+Structured output parsing for LLM responses.
+
+LLMs asked for "ONLY JSON" still wrap it in chatty text or code fences, leave
+trailing commas, use single quotes or Python literals, or get cut off by the
+token limit. This module finds the JSON value inside such text and repairs
+those defects in a single pass, instead of failing on the first
+json.JSONDecodeError.
+
+The same repairer also works incrementally: StreamingJSONParser is fed chunks
+from a token stream and can return a best-effort partial value at any point,
+so validation can start before generation finishes.
+"""
+import json
+import re
+from typing import Any, Callable, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+WORD_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.+-")
+LITERALS = {
+    "true": "true", "True": "true", "TRUE": "true",
+    "false": "false", "False": "false", "FALSE": "false",
+    "null": "null", "None": "null", "NULL": "null", "undefined": "null",
+    "NaN": "null", "Infinity": "null", "-Infinity": "null",
+}
+CLOSERS = {"{": "}", "[": "]"}
+JSON_ESCAPES = set('"\\/bfnrtu')
+NUMBER_PATTERN = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")  # Lenient: allows .5, 5. and +5
+MAX_CANDIDATES = 16  # Start positions tried by extract_json before giving up
+
+
+class StructuredOutputError(ValueError):
+    """Raised when no JSON value can be recovered from model output."""
+
+
+class JSONRepairer:
+    """
+    Single-pass, incremental JSON repairer.
+
+    Skips text before the first '{' or '[', then copies the value while fixing:
+    single-quoted strings, raw newlines and invalid escapes in strings,
+    trailing commas, // and /* */ comments, Python / JS literals, numbers like
+    .5 or 5., bare words (quoted as strings), and mismatched closers. Stops
+    at the end of the first top-level value. If input ends early, `snapshot`
+    closes whatever is still open.
+
+    Two values with only whitespace between them are kept apart: a missing
+    "," (or ":" after an object key) is inserted, so "[1 2]" reads as [1, 2]
+    rather than [12]. Where that doesn't give valid JSON ({"a": 1 2}) the
+    result fails to parse instead of silently merging the tokens.
+    """
+
+    def __init__(self):
+        self.out: List[str] = []
+        self.stack: List[str] = []       # Open containers: "{" or "["
+        self.members: List[int] = []     # len(out) at the last member boundary of each container
+        self.quote: Optional[str] = None  # Quote char of the string being copied
+        self.escape = False
+        self.comment: Optional[str] = None  # "//" or "/*" while inside a comment
+        self.slash = False                  # Saw a "/" that may start a comment
+        self.word: List[str] = []
+        self.started = False
+        self.done = False
+
+    def feed(self, text: str) -> int:
+        """Consume text. Returns the index just past the top-level value once it closes, else -1."""
+        for i, c in enumerate(text):
+            if self.done:
+                return i
+            self._consume(c)
+            if self.done:
+                return i + 1
+        return -1
+
+    def _consume(self, c: str):
+        if not self.started:
+            if c in CLOSERS:
+                self.started = True
+                self._open(c)
+            return
+
+        if self.quote:
+            self._consume_string_char(c)
+            return
+
+        if self._consume_comment_char(c):
+            return
+
+        if c in WORD_CHARS:
+            self.word.append(c)
+            return
+
+        self._flush_word()
+        if c in CLOSERS:
+            self._separate()
+            self._open(c)
+        elif c in "}]":
+            self._close()
+        elif c in "\"'":
+            self._separate()
+            self.quote = c
+            self.out.append('"')
+        elif c == ",":
+            self._strip_trailing_comma()  # Collapse ",," into one
+            self.out.append(",")
+            self.members[-1] = len(self.out)
+        elif c == ":":
+            self.out.append(":")
+        elif c in " \t\r\n":
+            pass
+        # Any other stray character outside a string is dropped
+
+    def _consume_comment_char(self, c: str) -> bool:
+        """Skip // and /* */ comments. Returns True if `c` was part of one."""
+        if self.comment == "//":
+            if c == "\n":
+                self.comment = None
+            return True
+        if self.comment == "/*":
+            if self.slash and c == "/":
+                self.comment = None
+            self.slash = c == "*"  # Reuse the flag for the "*" of "*/"
+            return True
+
+        if self.slash:
+            self.slash = False
+            if c in "/*":
+                self.comment = "/" + c
+                return True
+            # A lone "/" is a stray character: drop it and handle `c` normally
+        if c == "/":
+            self._flush_word()
+            self.slash = True
+            return True
+        return False
+
+    def _consume_string_char(self, c: str):
+        if self.escape:
+            self.escape = False
+            if c == "'":
+                self.out.append("'")
+            elif c in JSON_ESCAPES:
+                self.out.append("\\" + c)
+            else:
+                self.out.append("\\\\" + c)  # Invalid escape ("C:\dir"): keep the backslash literally
+        elif c == "\\":
+            self.escape = True
+        elif c == self.quote:
+            self.quote = None
+            self.out.append('"')
+        elif c == '"':
+            self.out.append('\\"')  # Double quote inside a single-quoted string
+        elif c == "\n":
+            self.out.append("\\n")
+        elif c == "\r":
+            self.out.append("\\r")
+        elif c == "\t":
+            self.out.append("\\t")
+        else:
+            self.out.append(c)
+
+    def _open(self, c: str):
+        self.stack.append(c)
+        self.out.append(c)
+        self.members.append(len(self.out))
+
+    def _close(self):
+        if not self.stack:
+            return
+        self._strip_trailing_comma()
+        if self.out and self.out[-1] == ":":
+            self.out.append("null")
+        self.out.append(CLOSERS[self.stack.pop()])  # Use the expected closer even if mismatched
+        self.members.pop()
+        if not self.stack:
+            self.done = True
+
+    def _strip_trailing_comma(self):
+        while self.out and self.out[-1] == ",":
+            self.out.pop()
+
+    def _flush_word(self):
+        if not self.word:
+            return
+        word = "".join(self.word)
+        self.word = []
+        self._separate()
+        self.out.append(self._render_word(word))
+
+    def _separate(self):
+        """Before a value: insert the separator if it directly follows another value."""
+        if not self.stack or not self.out or self.out[-1][-1] in "[{,:":
+            return
+        in_value = self.stack[-1] == "[" or ":" in self.out[self.members[-1]:]
+        self.out.append("," if in_value else ":")
+        if in_value:
+            self.members[-1] = len(self.out)
+
+    @staticmethod
+    def _render_word(word: str) -> str:
+        if word in LITERALS:
+            return LITERALS[word]
+        candidate = word.rstrip("eE+-")  # Number cut off mid-token
+        if NUMBER_PATTERN.fullmatch(candidate):
+            # JSON spelling: no "+" sign or leading zeros, digits on both sides of "."
+            sign = "-" if candidate.startswith("-") else ""
+            number = candidate.lstrip("+-")
+            number = re.sub(r"^0+(?=\d)", "", number)
+            number = re.sub(r"^\.", "0.", number)
+            number = re.sub(r"\.(?=[eE]|$)", ".0", number)
+            return sign + number
+        return json.dumps(word)  # Bare word: keep it as a string
+
+    # -------------------------------------------------------------------------
+    # Results
+    # -------------------------------------------------------------------------
+    def text(self) -> str:
+        """Repaired JSON text so far (complete only once `done`)."""
+        return "".join(self.out)
+
+    def snapshot(self) -> Any:
+        """
+        Best-effort value for the input consumed so far, closing open strings and
+        containers. Drops the last incomplete member if closing alone isn't enough.
+        Returns None if nothing usable has been seen yet.
+        """
+        if not self.started:
+            return None
+        if self.done:
+            return json.loads(self.text())
+
+        out = list(self.out)
+        if self.word:
+            out.append(self._render_word("".join(self.word)))
+        if self.quote:
+            out.append('"')
+
+        members = list(self.members)
+        stack = list(self.stack)
+        # First try closing as-is, then cut back to member boundaries, innermost first
+        cut_points = [None] + sorted(set(members), reverse=True)
+        for cut in cut_points:
+            candidate = out if cut is None else out[:cut]
+            depth = len(stack) if cut is None else sum(1 for m in members if m <= cut)
+            try:
+                return json.loads(self._close_all(candidate, stack[:depth]))
+            except json.JSONDecodeError:
+                continue
+        return None
+
+    @staticmethod
+    def _close_all(out: List[str], stack: List[str]) -> str:
+        out = list(out)
+        while out and out[-1] == ",":
+            out.pop()
+        if out and out[-1] == ":":
+            out.append("null")
+        return "".join(out) + "".join(CLOSERS[c] for c in reversed(stack))
+
+
+def _candidates(text: str) -> List[str]:
+    """Text regions to search: fenced blocks first, then the whole text."""
+    regions = [match.group(1) for match in FENCE_PATTERN.finditer(text)]
+    regions.append(text)
+    return regions
+
+
+def extract_json(text: str, accept: Callable[[Any], bool] = None) -> Any:
+    """
+    Find and parse the JSON object or array in model output.
+
+    Handles chatty preambles, code fences, trailing commas, single quotes,
+    Python literals and truncated output. Values are tried in order of
+    appearance; with `accept`, the first value it accepts wins (so "see [2]"
+    in prose doesn't shadow the real answer), falling back to the first value
+    found. Raises StructuredOutputError if no value can be recovered.
+    """
+    if not text:
+        raise StructuredOutputError("Empty model output")
+
+    # Fast path: already valid JSON
+    stripped = text.strip()
+    if stripped[:1] in CLOSERS:
+        try:
+            value = json.loads(stripped)
+            if accept is None or accept(value):
+                return value
+        except json.JSONDecodeError:
+            pass
+
+    first = None
+    tried = 0
+    for region in _candidates(text):
+        start = 0
+        while tried < MAX_CANDIDATES:
+            positions = [p for p in (region.find("{", start), region.find("[", start)) if p != -1]
+            if not positions:
+                break
+            position = min(positions)
+            tried += 1
+
+            repairer = JSONRepairer()
+            repairer.feed(region[position:])
+            try:
+                value = repairer.snapshot()
+            except json.JSONDecodeError:
+                value = None
+            if value is not None:
+                if accept is None or accept(value):
+                    return value
+                if first is None:
+                    first = value
+            start = position + 1
+
+    if first is not None:
+        return first
+    raise StructuredOutputError(f"No JSON value found in model output: {text[:200]!r}")
+
+
+def validates(response_format: Type[BaseModel]) -> Callable[[Any], bool]:
+    """extract_json `accept` predicate: the value validates against `response_format`."""
+    def accept(value: Any) -> bool:
+        try:
+            response_format.model_validate(value)
+            return True
+        except ValidationError:
+            return False
+    return accept
+
+
+def parse_structured(text: str, response_format: Type[BaseModel]) -> BaseModel:
+    """Extract JSON from model output and validate it against a Pydantic model."""
+    return response_format.model_validate(extract_json(text, accept=validates(response_format)))
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a token stream.
+
+    Usage:
+        parser = StreamingJSONParser()
+        for chunk in stream:
+            value = parser.feed(chunk)
+            if value is not None:
+                break               # Top-level value complete
+            preview = parser.partial()  # Best-effort value so far
+    """
+
+    def __init__(self):
+        self._repairer = JSONRepairer()
+        self.value: Any = None
+        self.complete = False
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """Consume a chunk. Returns the parsed value once the top-level value closes."""
+        if self.complete:
+            return self.value
+        if self._repairer.feed(chunk) != -1:
+            try:
+                self.value = json.loads(self._repairer.text())
+            except json.JSONDecodeError as e:
+                raise StructuredOutputError(f"Unrecoverable JSON in stream: {self._repairer.text()[:200]!r}") from e
+            self.complete = True
+            return self.value
+        return None
+
+    def partial(self) -> Any:
+        """Best-effort value from what has been streamed so far (None if nothing yet)."""
+        if self.complete:
+            return self.value
+        return self._repairer.snapshot()
+
+    def finish(self) -> Any:
+        """Call at end of stream: returns the (possibly repaired) value or raises StructuredOutputError."""
+        value = self.partial()
+        if value is None:
+            raise StructuredOutputError("Stream ended without a JSON value")
+        self.value = value
+        self.complete = True
+        return value
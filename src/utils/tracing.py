@@ -0,0 +1,239 @@
+"""
+Lightweight span tracing.
+
+A request (or script run) starts a root span with `trace()`; code underneath
+opens child spans with `span()` or the `@traced` decorator. The current span
+lives in a ContextVar, so it follows asyncio tasks automatically; thread pool
+work keeps it by wrapping the function with `bind()`.
+
+Sampling is decided once per root span (Config.TRACE_SAMPLE_RATE). When a trace
+is not sampled, `span()` is a single ContextVar lookup returning a shared no-op,
+so instrumentation can stay in hot paths.
+
+Finished spans go to a bounded in-memory buffer (`tracer`), readable from the
+API's /admin/traces endpoints and exportable as Chrome trace-event JSON
+(open in chrome://tracing or https://ui.perfetto.dev).
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.config import Config
+
+_current: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+# perf_counter for precise durations, shifted onto the wall clock for export
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class _NoopSpan:
+    """Returned when the current trace is not sampled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed operation; use as a context manager."""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "start_ns", "duration_ns", "thread_id", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.thread_id = 0
+        self._token = None
+
+    def set(self, **attrs) -> None:
+        """Attach attributes (model name, cache hit, token counts...)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        tracer.record(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_us": (self.start_ns + _EPOCH_OFFSET_NS) / 1000,
+            "duration_us": self.duration_ns / 1000,
+            "thread_id": self.thread_id,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """Rolling buffer of finished spans."""
+
+    def __init__(self, max_spans: int = None):
+        self.spans = deque(maxlen=max_spans or Config.TRACE_BUFFER_SIZE)
+        self.lock = threading.Lock()
+
+    def record(self, finished: Span) -> None:
+        with self.lock:
+            self.spans.append(finished)
+
+    def get_spans(self, trace_id: str = None) -> List[Span]:
+        with self.lock:
+            spans = list(self.spans)
+        return [s for s in spans if trace_id is None or s.trace_id == trace_id]
+
+    def recent_traces(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Summaries of the most recent traces whose root span is still in the buffer."""
+        spans = self.get_spans()
+        counts: Dict[str, int] = {}
+        for s in spans:
+            counts[s.trace_id] = counts.get(s.trace_id, 0) + 1
+        roots = [s for s in spans if s.parent_id is None]
+        return [
+            {
+                "trace_id": s.trace_id,
+                "name": s.name,
+                "start_us": (s.start_ns + _EPOCH_OFFSET_NS) / 1000,
+                "duration_ms": s.duration_ns / 1e6,
+                "spans": counts[s.trace_id],
+                "attrs": s.attrs,
+            }
+            for s in reversed(roots[-limit:])
+        ]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.spans.clear()
+
+
+tracer = Tracer()
+
+
+# -----------------------------------------------------------------------------
+# Instrumentation API
+# -----------------------------------------------------------------------------
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def trace(name: str, sampled: bool = None, **attrs):
+    """
+    Start a root span (or a child span when already inside a trace).
+    sampled=None samples at Config.TRACE_SAMPLE_RATE; True/False forces it.
+    """
+    parent = _current.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, attrs)
+    if sampled is None:
+        sampled = Config.TRACE_SAMPLE_RATE > 0 and random.random() < Config.TRACE_SAMPLE_RATE
+    if not sampled:
+        return NOOP_SPAN
+    return Span(name, uuid.uuid4().hex, None, attrs)
+
+
+def span(name: str, **attrs):
+    """Child span of the current span; a no-op outside a sampled trace."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, attrs)
+
+
+def traced(name: str = None):
+    """Decorator wrapping a function (sync or async) in a child span."""
+    def decorator(fn: Callable):
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    Carry the current trace context into another thread, e.g.
+    pool.submit(bind(fn), ...) or pool.map(bind(fn), ...).
+    Each call runs in its own copy of the context, so the wrapper can be used
+    from several threads at once.
+    """
+    if _current.get() is None:
+        return fn
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+# -----------------------------------------------------------------------------
+# Chrome trace-event export
+# -----------------------------------------------------------------------------
+def to_chrome_trace(spans: List[Span]) -> Dict[str, Any]:
+    """Complete ("X") events, one row per thread."""
+    pid = os.getpid()
+    events = []
+    for s in spans:
+        events.append({
+            "name": s.name,
+            "cat": s.name.split(".")[0],
+            "ph": "X",
+            "ts": (s.start_ns + _EPOCH_OFFSET_NS) / 1000,
+            "dur": s.duration_ns / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": {"trace_id": s.trace_id, "span_id": s.span_id, "parent_id": s.parent_id, **s.attrs},
+        })
+    events.sort(key=lambda e: e["ts"])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: Path, trace_id: str = None) -> Path:
+    """Write buffered spans (optionally one trace) as a Chrome trace file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(tracer.get_spans(trace_id)), f, default=str)
+    return path
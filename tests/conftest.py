@@ -0,0 +1,15 @@
+"""
+Shared test setup: point every on-disk directory at a throwaway location
+before src.utils.config is imported, so tests never touch ./data, and give
+the agents stub credentials (tests replace their generate methods).
+"""
+import os
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix="agentic_tests_")
+for name in ("CACHE_DIR", "METRICS_DIR", "JOBS_DIR", "CACHE_SERVER_DIR", "SCHEDULER_SHARED_DIR"):
+    os.environ.setdefault(name, os.path.join(_data_dir, name.lower()))
+os.environ.setdefault("FAQ_STORE_PATH", os.path.join(_data_dir, "faq_store.bin"))
+for name in ("GEMINI_API_KEY", "XAI_API_KEY"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("GEMINI_MODEL", "test-gemini")
@@ -0,0 +1,95 @@
+"""Tests for admission control (src/utils/admission.py) and its use in the API."""
+import asyncio
+
+import pytest
+
+from src.utils.admission import AdmissionController, AdmissionRejected
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_per_client_limit_sheds_with_429():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=10, max_queue_wait=1, per_client=1)
+        async with admission.slot("a"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with admission.slot("a"):
+                    pass
+            async with admission.slot("b"):
+                pass
+        return rejected.value
+
+    rejected = run(scenario())
+    assert rejected.status_code == 429 and rejected.retry_after >= 1
+
+
+def test_queued_requests_get_slots_in_order_or_time_out():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue_wait=0.2, per_client=0)
+        order = []
+
+        async def request(name, hold):
+            async with admission.slot(name):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        first = asyncio.ensure_future(request("first", 0.1))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(request("second", 0.3))
+        await asyncio.sleep(0)
+        third = asyncio.ensure_future(request("third", 0))
+        results = await asyncio.gather(first, second, third, return_exceptions=True)
+        return order, results, admission.stats()
+
+    order, results, stats = run(scenario())
+    assert order == ["first", "second"]
+    assert isinstance(results[2], AdmissionRejected) and results[2].status_code == 503
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue_wait=5, per_client=0)
+        async with admission.slot("holder"):
+            waiter = asyncio.ensure_future(admission.slot("waiter").__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        return admission.stats(), dict(admission.clients)
+
+    stats, clients = run(scenario())
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert clients == {}
+
+
+def test_cache_hits_skip_admission_and_clients_are_keyed_by_address(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.apis import api_server
+
+    calls = []
+
+    def generate(query, **kwargs):
+        calls.append(query)
+        return {"text": f"answer to {query}", "model": "stub", "metadata": {}}
+
+    monkeypatch.setattr(api_server.gemini, "generate", generate)
+    monkeypatch.setattr(api_server, "admission", AdmissionController(max_in_flight=0, per_client=1))
+    client = TestClient(api_server.app)
+
+    body = {"query": "admission test question", "model": "gemini"}
+    assert client.post("/generate", json=body).json()["cached"] is False
+    hit = client.post("/generate", json=body).json()
+    assert hit["cached"] is True and hit["text"] == "answer to admission test question"
+    assert calls == ["admission test question"]
+
+    # A client can't dodge its limit by inventing identities
+    async def held():
+        async with api_server.admission.slot("testclient"):
+            response = await asyncio.to_thread(
+                client.post, "/generate", json={"query": "another question", "model": "gemini"},
+                headers={"X-Client-Id": "someone-else"})
+        return response
+
+    assert run(held()).status_code == 429
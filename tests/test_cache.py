@@ -0,0 +1,55 @@
+"""Tests for LLMCache single flight and the cache backend locks."""
+import threading
+import time
+
+import pytest
+
+from src.utils.cache import LLMCache
+from src.utils.cache_backends import open_backend
+
+
+@pytest.fixture(params=[{"backend": "single"}, {"backend": "sharded", "shards": 4}], ids=["single", "sharded"])
+def cache(request, tmp_path):
+    return LLMCache(cache_dir=str(tmp_path), backend=open_backend(str(tmp_path), request.param))
+
+
+def test_concurrent_misses_make_one_provider_call(cache):
+    calls = []
+
+    def api(query):
+        calls.append(query)
+        time.sleep(0.3)
+        return {"text": "answer"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.cached_api_call("m", "q", api)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"text": "answer"}] * 8
+    assert list(cache.cache.keys()) == [cache._generate_key("m", "q")]  # The in-flight lock is gone
+
+
+def test_waiter_returns_when_the_value_is_written(cache):
+    backend = cache.cache
+    key = cache._generate_key("m", "q")
+    with backend.lock(f"inflight:{key}", expire=60) as acquired:
+        assert acquired
+        threading.Timer(0.2, lambda: backend.set(key, {"text": "late"})).start()
+        start = time.monotonic()
+        # Holder still has the lock: the waiter must leave through the cache, not the lock
+        assert cache.cached_api_call("m", "q", lambda query: pytest.fail("provider called")) == {"text": "late"}
+        assert time.monotonic() - start < 1.0
+
+
+def test_unlock_only_releases_its_own_lock(cache):
+    backend = cache.cache
+    assert backend.try_lock("lock", "a", expire=60)
+    assert not backend.try_lock("lock", "b", expire=60)
+    assert not backend.unlock("lock", "b")
+    assert backend.unlock("lock", "a")
+    assert backend.try_lock("lock", "b", expire=60)
@@ -0,0 +1,104 @@
+"""Tests for the cache maintenance commands (src/utils/cache_tool.py)."""
+import os
+import time
+
+from src.utils import cache_tool
+from src.utils.cache_backends import open_backend, read_layout
+
+
+def test_reshard_merges_a_cache_recreated_during_the_swap(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    backend = open_backend(str(cache_dir), {"backend": "single"})
+    for i in range(20):
+        backend.set(f"key{i}", {"text": str(i)}, tag="m|gap_analysis")
+    backend.close()
+
+    rename = os.rename
+    renames = []
+
+    def racing_rename(source, target):
+        rename(source, target)
+        renames.append(target)
+        if len(renames) == 1:
+            # Another process opens the cache while it is missing and writes to it
+            intruder = open_backend(str(cache_dir), {"backend": "single"})
+            intruder.set("late", {"text": "written mid-swap"})
+            intruder.close()
+
+    monkeypatch.setattr(cache_tool.os, "rename", racing_rename)
+    monkeypatch.setattr(cache_tool, "LAYOUT_CHECK_INTERVAL", 0)
+    cache_tool.reshard(cache_dir, {"backend": "sharded", "shards": 4}, keep_old=False)
+
+    assert read_layout(cache_dir)["backend"] == "sharded"
+    resharded = open_backend(str(cache_dir))
+    assert len(resharded) == 21
+    assert resharded.get("late") == {"text": "written mid-swap"}
+    assert resharded.entry("key3")[3] == "m|gap_analysis"
+    resharded.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache"]
+
+
+def test_snapshot_round_trip_keeps_expiry_and_tags(tmp_path):
+    source = open_backend(str(tmp_path / "source"), {"backend": "single"})
+    source.set("chat", {"text": "hello"}, tag="gemini|profile:jane")
+    source.set("eval", {"text": "verdict"}, expire=3600, tag="xai|evaluation")
+    source.set("untagged", {"text": "legacy"})
+    source.set("inflight:chat", "lock owner")
+
+    snapshot = str(tmp_path / "snapshot.jsonl.gz")
+    assert cache_tool.export_snapshot(source, snapshot) == {"exported": 3, "skipped_unserializable": 0}
+    filtered = str(tmp_path / "filtered.jsonl")
+    assert cache_tool.export_snapshot(source, filtered, models=["gemini", "xai"], tags=["evaluation"])["exported"] == 1
+
+    target = open_backend(str(tmp_path / "target"), {"backend": "sharded", "shards": 2})
+    target.set("chat", {"text": "kept"})
+    assert cache_tool.import_snapshot(target, snapshot) == {
+        "imported": 2, "skipped_existing": 1, "skipped_expired": 0}
+    assert target.get("chat") == {"text": "kept"}
+    assert target.entry("untagged")[3] is None
+
+    _, value, expire_time, tag = target.entry("eval")
+    assert value == {"text": "verdict"} and tag == "xai|evaluation"
+    assert abs(expire_time - source.entry("eval")[2]) < 5
+
+    assert cache_tool.import_snapshot(target, snapshot, overwrite=True)["imported"] == 3
+    assert target.get("chat") == {"text": "hello"}
+    assert target.entry("chat")[3] == "gemini|profile:jane"
+
+
+def test_expired_snapshot_entries_are_dropped(tmp_path, monkeypatch):
+    source = open_backend(str(tmp_path / "source"), {"backend": "single"})
+    source.set("soon", {"text": "short-lived"}, expire=60, tag="m")
+    snapshot = str(tmp_path / "snapshot.jsonl")
+    cache_tool.export_snapshot(source, snapshot)
+
+    real_time = cache_tool.time.time
+    monkeypatch.setattr(cache_tool.time, "time", lambda: real_time() + 120)
+    target = open_backend(str(tmp_path / "target"), {"backend": "single"})
+    assert cache_tool.import_snapshot(target, snapshot)["skipped_expired"] == 1
+    assert target.get("soon") is None
+
+
+def test_rate_budget_spaces_and_caps_calls():
+    budget = cache_tool.RateBudget(rate=20, max_calls=3)
+    start = time.monotonic()
+    assert [budget.acquire() for _ in range(4)] == [True, True, True, False]
+    assert time.monotonic() - start >= 0.09  # Three calls, 50ms apart
+
+
+def test_warm_skips_cached_answers_and_stops_at_the_budget(monkeypatch):
+    from types import SimpleNamespace
+
+    from src.agents.me import about_me, profile_store
+
+    cached = {"What is your experience with AKS?"}
+    answered = []
+    monkeypatch.setattr(profile_store, "profile_store", SimpleNamespace(
+        get=lambda profile_id: SimpleNamespace(profile_id=profile_id or "default")))
+    monkeypatch.setattr(about_me, "is_cached", lambda question, history, profile: question in cached)
+    monkeypatch.setattr(about_me, "answer", lambda question, history, profile: answered.append(question))
+
+    questions = ["What is your experience with AKS?", "Do you have any pets?", "What languages?", "Hobbies?"]
+    counts = cache_tool.warm(questions, [None], rate=0, concurrency=2, max_calls=2)
+    assert counts == {"cached": 1, "warmed": 2, "failed": 0, "over_budget": 1}
+    assert len(answered) == 2 and not cached & set(answered)
@@ -0,0 +1,124 @@
+"""Tests for the async chatbot path: session limits, async single flight and cancellation."""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.me import about_me
+from src.utils.cache import LLMCache
+from src.utils.cache_backends import open_backend
+from src.utils.session_limits import SessionLimited, SessionLimiter
+
+
+def test_session_burst_then_rate_limit():
+    limiter = SessionLimiter(rate_per_minute=60, burst=2, max_in_flight=5)
+    for _ in range(2):
+        with limiter.turn("visitor"):
+            pass
+    with pytest.raises(SessionLimited) as limited:
+        with limiter.turn("visitor"):
+            pass
+    assert limited.value.retry_after == 1
+    with limiter.turn("someone-else"):  # Buckets are per session
+        pass
+
+
+def test_session_in_flight_cap():
+    limiter = SessionLimiter(rate_per_minute=600, burst=10, max_in_flight=1)
+    with limiter.turn("visitor"):
+        with pytest.raises(SessionLimited, match="Please wait"):
+            with limiter.turn("visitor"):
+                pass
+    with limiter.turn("visitor"):  # Released with the first turn
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(cache_dir=str(tmp_path), backend=open_backend(str(tmp_path), {"backend": "single"}))
+
+
+class Provider:
+    """Async provider call that waits until released (or cancelled)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.release = None
+
+    async def __call__(self, query):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"text": f"answer to {query}"}
+
+
+def test_concurrent_async_misses_share_one_call(cache):
+    provider = Provider()
+
+    async def scenario():
+        provider.release = asyncio.Event()
+        callers = [asyncio.ensure_future(cache.acached_api_call("m", "q", provider)) for _ in range(5)]
+        await asyncio.sleep(0.2)
+        provider.release.set()
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(scenario()) == [{"text": "answer to q"}] * 5
+    assert provider.calls == 1
+    assert cache.get("m", "q") == {"text": "answer to q"}
+
+
+def test_provider_call_is_cancelled_only_with_its_last_waiter(cache):
+    provider = Provider()
+
+    async def scenario():
+        provider.release = asyncio.Event()
+        first = asyncio.ensure_future(cache.acached_api_call("m", "q", provider))
+        second = asyncio.ensure_future(cache.acached_api_call("m", "q", provider))
+        await asyncio.sleep(0.2)
+
+        first.cancel()
+        await asyncio.sleep(0.05)
+        assert provider.cancelled == 0  # `second` still wants the answer
+
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert provider.cancelled == 1
+    assert cache._async_inflight == {}
+    assert cache.get("m", "q") is None
+
+
+def test_chat_handler_keeps_blocking_work_off_the_event_loop(cache, monkeypatch):
+    profile_threads = set()
+    profile = SimpleNamespace(profile_id="test", system_prompt="You are a test persona.")
+
+    class Profiles:
+        def get(self, profile_id=None):
+            profile_threads.add(threading.current_thread())
+            return profile
+
+    async def agenerate(query, **kwargs):
+        return {"text": "hello", "model": "stub", "metadata": {}}
+
+    monkeypatch.setattr(about_me, "profile_store", Profiles())
+    monkeypatch.setattr(about_me, "cache", SimpleNamespace(
+        is_loaded=True, acached_api_call=cache.acached_api_call, _generate_key=cache._generate_key))
+    monkeypatch.setattr(about_me, "agent", SimpleNamespace(model_name="stub", agenerate=agenerate))
+    monkeypatch.setattr(about_me, "session_limits", SessionLimiter(rate_per_minute=60, burst=1))
+
+    async def scenario():
+        first = await about_me.achat_with_tony("hi", [], session_id="s")
+        second = await about_me.achat_with_tony("hi again", [], session_id="s")
+        return first, second, threading.current_thread()
+
+    first, second, loop_thread = asyncio.run(scenario())
+    assert first == "hello"
+    assert second.startswith("You're sending messages quickly")
+    assert loop_thread not in profile_threads
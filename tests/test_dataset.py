@@ -0,0 +1,61 @@
+"""Tests for the memory-mapped dataset pipeline (src/machinelearning/basics/dataset.py)."""
+import os
+
+import numpy as np
+import pytest
+
+from src.machinelearning.basics import dataset, trainer
+
+
+def write_text(path, rows=250, seed=0):
+    rng = np.random.default_rng(seed)
+    data = np.column_stack([rng.integers(0, 50, size=rows), rng.normal(size=rows), rng.normal(size=rows)])
+    data[:, 2] = 3 * data[:, 0] - 2 * data[:, 1] + 7
+    np.savetxt(path, data, header="Reservations Temperature Pizzas", comments="")
+    return data
+
+
+def test_conversion_round_trips_the_text_in_chunks(tmp_path):
+    text_path = tmp_path / "pizza.txt"
+    expected = write_text(text_path)
+
+    data, columns = dataset.open_dataset(dataset.convert_text_to_binary(text_path, chunk_rows=64))
+    assert isinstance(data, np.memmap) and not data.flags.writeable
+    assert columns == ["Reservations", "Temperature", "Pizzas"]
+    assert data.shape == (3, 250)
+    np.testing.assert_array_equal(np.asarray(data).T, expected)
+
+
+def test_batches_cover_every_row_once(tmp_path):
+    text_path = tmp_path / "pizza.txt"
+    expected = write_text(text_path)
+    data, _ = dataset.load_or_convert(text_path)
+
+    batches = list(dataset.iter_batches(data, batch_size=64, shuffle=True, seed=1))
+    assert [len(Y) for X, Y in batches if len(Y) != 64] == [250 % 64]
+    rows = [tuple(x) + (y,) for X, Y in batches for x, y in zip(X, Y)]
+    assert sorted(rows) == sorted(map(tuple, expected))
+
+
+def test_stale_binary_copies_are_reconverted(tmp_path):
+    text_path = tmp_path / "pizza.txt"
+    write_text(text_path, rows=10)
+    first, _ = dataset.load_or_convert(text_path)
+    assert first.shape == (3, 10)
+    del first
+
+    write_text(text_path, rows=20, seed=1)
+    os.utime(text_path, (2**31, 2**31))  # Newer than the .npy
+    data, _ = dataset.load_or_convert(text_path)
+    assert data.shape == (3, 20)
+
+
+def test_streaming_least_squares_matches_the_in_memory_fit(tmp_path):
+    text_path = tmp_path / "pizza.txt"
+    expected = write_text(text_path)
+    data, _ = dataset.load_or_convert(text_path)
+
+    w, b = trainer.train_least_squares_streaming(lambda: dataset.iter_batches(data, batch_size=32))
+    w_ref, b_ref = trainer.train_least_squares(expected[:, :2], expected[:, 2])
+    np.testing.assert_allclose(w, w_ref, rtol=1e-8)
+    assert b == pytest.approx(b_ref)
@@ -0,0 +1,115 @@
+"""Tests for the evaluation runner (checkpoint/resume) and the gap analysis results store."""
+import random
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from src.agents.me.eval_runner import EvaluationRunner
+from src.agents.me.results_store import ResultsStore, diff_results, input_key
+
+QUESTIONS = ["q0", "q1", "q2", "q3"]
+
+
+class Verdict(BaseModel):
+    ok: bool
+
+
+class Agent:
+    """Answer stage that fails once on a chosen question, like an interrupted run."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.asked = []
+
+    def __call__(self, question):
+        if question == self.fail_on:
+            self.fail_on = None
+            time.sleep(0.2)  # Let the earlier questions' judgements land first
+            raise RuntimeError("interrupted")
+        self.asked.append(question)
+        return {"text": f"answer to {question}"}
+
+
+def judge(question, answer_text):
+    return Verdict(ok=answer_text.endswith(question))
+
+
+def run(runner, agent, **kwargs):
+    return runner.run(QUESTIONS, answer=("a", agent), judge=("j", judge), result_model=Verdict, **kwargs)
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(tmp_path):
+    runner = EvaluationRunner(default_limit=1, runs_dir=tmp_path)
+    keys = [input_key(q, "profile", "model", "1") for q in QUESTIONS]
+    agent = Agent(fail_on="q2")
+
+    with pytest.raises(RuntimeError):
+        run(runner, agent, run_name="suite", item_keys=keys)
+    assert runner.checkpoint_path("suite", keys).exists()
+    first_run = len(agent.asked)
+
+    items = run(runner, agent, run_name="suite", item_keys=keys)
+    assert [item.question for item in items] == QUESTIONS
+    assert all(item.result.ok for item in items)
+    assert "q0" not in agent.asked[first_run:]  # Judged before the interruption
+    assert agent.asked[first_run:][-2:] == ["q2", "q3"]
+    assert list(tmp_path.iterdir()) == []  # Finished runs drop their checkpoint
+
+
+def test_checkpoint_names_follow_item_inputs_and_run_name(tmp_path):
+    runner = EvaluationRunner(runs_dir=tmp_path)
+    keys = [input_key(q, "profile", "model", "1") for q in QUESTIONS]
+    edited_profile = [input_key(q, "profile v2", "model", "1") for q in QUESTIONS]
+
+    assert runner.checkpoint_path("suite", keys) == runner.checkpoint_path("suite", list(keys))
+    assert runner.checkpoint_path("suite", keys) != runner.checkpoint_path("suite", edited_profile)
+    assert runner.checkpoint_path("suite", keys) != runner.checkpoint_path("suite_job2", keys)
+
+
+def test_changed_inputs_skip_a_stale_checkpoint(tmp_path):
+    runner = EvaluationRunner(default_limit=1, runs_dir=tmp_path)
+    with pytest.raises(RuntimeError):
+        run(runner, Agent(fail_on="q2"), run_name="suite", item_keys=["old"] * 4)
+
+    agent = Agent()
+    run(runner, agent, run_name="suite", item_keys=["new"] * 4)
+    assert agent.asked == QUESTIONS
+
+
+def test_results_store_only_reuses_entries_with_the_same_inputs(tmp_path):
+    store = ResultsStore("profile", results_dir=tmp_path)
+    key = input_key("q0", "profile", "model", "1")
+    store.save({"q0": {"key": key, "result": {"could_answer": True}},
+                "q1": {"key": "k1", "result": {"could_answer": True}}})
+
+    reloaded = ResultsStore("profile", results_dir=tmp_path)
+    assert reloaded.lookup("q0", key)["result"] == {"could_answer": True}
+    assert reloaded.lookup("q0", input_key("q0", "profile", "model", "2")) is None
+    assert reloaded.lookup("missing", key) is None
+
+    current = {"q0": {"key": key, "result": {"could_answer": False}},
+               "q2": {"key": "k2", "result": {"could_answer": True}}}
+    assert diff_results(reloaded.entries, current, "could_answer") == [
+        ("q0", True, False), ("q2", None, True), ("q1", True, None)
+    ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_pipelined_results_keep_input_order(tmp_path, batch_size):
+    questions = [f"q{i}" for i in range(10)]
+
+    def answer(question):
+        time.sleep(random.uniform(0, 0.02))  # Finish out of order
+        return {"text": f"answer to {question}"}
+
+    def judge_batch(pairs):
+        assert len(pairs) <= batch_size
+        return [judge(question, text) for question, text in pairs]
+
+    runner = EvaluationRunner(default_limit=4, runs_dir=tmp_path)
+    items = runner.run(questions, answer=("a", answer), judge=("j", judge_batch if batch_size > 1 else judge),
+                       result_model=Verdict, judge_batch_size=batch_size)
+    assert [item.question for item in items] == questions
+    assert [item.index for item in items] == list(range(10))
+    assert all(item.result.ok for item in items)
@@ -0,0 +1,43 @@
+"""Tests for the memory-mapped FAQ store and how LLMCache uses it."""
+import pytest
+
+from src.utils.cache import LLMCache
+from src.utils.cache_backends import open_backend
+from src.utils.faq_store import FaqStore, compile_store
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(cache_dir=str(tmp_path / "cache"), backend=open_backend(str(tmp_path / "cache"), {"backend": "single"}))
+    cache.faq = FaqStore(tmp_path / "faq.bin")
+    return cache
+
+
+def test_compiled_entries_are_found_and_others_are_not(tmp_path):
+    entries = [(f"key-{i}", {"text": f"answer {i}"}) for i in range(100)]
+    assert compile_store(entries, tmp_path / "faq.bin")["entries"] == 100
+
+    store = FaqStore(tmp_path / "faq.bin")
+    assert all(store.get(key) == value for key, value in entries)
+    assert store.get("key-100") is None
+    assert len(store) == 100
+
+
+def test_force_refresh_bypasses_the_faq_answer(cache):
+    key = cache._generate_key("m", "q")
+    compile_store([(key, {"text": "frozen"})], cache.faq.path)
+    assert cache.cached_api_call("m", "q", lambda query: pytest.fail("provider called")) == {"text": "frozen"}
+
+    fresh = cache.cached_api_call("m", "q", lambda query: {"text": "fresh"}, force_refresh=True)
+    assert fresh == {"text": "fresh"}
+    assert cache.get("m", "q") == {"text": "fresh"}
+
+
+def test_clear_removes_the_faq_store(cache):
+    key = cache._generate_key("m", "q")
+    compile_store([(key, {"text": "frozen"})], cache.faq.path)
+    assert cache.get("m", "q") == {"text": "frozen"}
+
+    assert cache.clear() == 1
+    assert not cache.faq.path.exists()
+    assert cache.get("m", "q") is None
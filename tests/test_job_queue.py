@@ -0,0 +1,102 @@
+"""Tests for the durable job queue (src/utils/job_queue.py) and the /jobs endpoints."""
+import threading
+import time
+
+import pytest
+
+from src.utils.config import Config
+from src.utils.job_queue import JobQueue
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(Config, "JOB_POLL_INTERVAL", 0.02)
+
+
+def wait_done(queue, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.done:
+            return job
+        time.sleep(0.02)
+    pytest.fail(f"job {job_id} did not finish")
+
+
+def test_each_job_runs_once_across_workers(tmp_path):
+    ran = []
+    lock = threading.Lock()
+
+    def handler(params):
+        with lock:
+            ran.append(params["n"])
+        return params["n"] * 2
+
+    queue = JobQueue(handlers={"generate": handler}, jobs_dir=str(tmp_path))
+    submitted = [queue.submit("generate", {"n": n}) for n in range(20)]
+    queue.start(workers=4)
+    try:
+        results = [wait_done(queue, job.id) for job in submitted]
+    finally:
+        queue.stop(timeout=5)
+
+    assert sorted(ran) == list(range(20))
+    assert [job.result for job in results] == [n * 2 for n in range(20)]
+    assert queue.stats()["by_status"] == {"succeeded": 20}
+
+
+def test_cancelled_jobs_are_skipped(tmp_path):
+    queue = JobQueue(handlers={"generate": lambda params: pytest.fail("cancelled job ran")}, jobs_dir=str(tmp_path))
+    job = queue.submit("generate", {})
+    assert queue.cancel(job.id).status == "cancelled"
+    queue.start(workers=1)
+    try:
+        time.sleep(0.2)
+    finally:
+        queue.stop(timeout=5)
+    assert queue.get(job.id).status == "cancelled"
+
+
+def test_stale_running_jobs_are_requeued(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "JOB_LEASE", 0.1)
+    queue = JobQueue(handlers={}, jobs_dir=str(tmp_path))
+    queue.worker_id = "lost-host:1"
+    job = queue.submit("generate", {})
+    assert queue._claim().id == job.id
+
+    time.sleep(0.2)
+    assert queue.reap() == 1
+    requeued = queue.get(job.id)
+    assert requeued.status == "queued" and requeued.error == "worker lost-host:1 lost"
+
+
+def test_get_job_long_polls_until_done(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.apis import api_server
+
+    def slow_generate(query, **kwargs):
+        time.sleep(0.3)
+        return {"text": f"answer to {query}", "model": "stub", "metadata": {"usage": None}}
+
+    monkeypatch.setattr(api_server.gemini, "generate", slow_generate)
+    with TestClient(api_server.app) as client:
+        job = client.post("/jobs", json={"kind": "generate", "params": {"query": "long poll test"}}).json()
+        response = client.get(f"/jobs/{job['id']}", params={"wait": 10})
+        listing = client.get("/jobs").json()
+
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"]["text"] == "answer to long poll test"
+    assert listing["by_status"]["succeeded"] >= 1
+
+
+def test_handlers_see_their_job_id(tmp_path):
+    from src.utils.job_queue import current_job_id
+
+    queue = JobQueue(handlers={"generate": lambda params: current_job_id.get()}, jobs_dir=str(tmp_path))
+    job = queue.submit("generate", {})
+    queue.start(workers=1)
+    try:
+        assert wait_done(queue, job.id).result == job.id
+    finally:
+        queue.stop(timeout=5)
+    assert current_job_id.get() is None
@@ -0,0 +1,69 @@
+"""Tests for the Lazy singleton proxy (src/utils/lazy.py)."""
+import threading
+import time
+
+import pytest
+
+from src.utils.lazy import Lazy
+
+
+class Agent:
+    built = 0
+
+    def __init__(self):
+        time.sleep(0.05)  # Widen the race between first users
+        Agent.built += 1
+        self.model_name = "stub"
+
+    def generate(self, query):
+        return f"answer to {query}"
+
+
+def test_nothing_is_built_until_first_use():
+    Agent.built = 0
+    agent = Lazy(Agent)
+    assert not agent.is_loaded
+    assert repr(agent) == "<Lazy Agent (not loaded)>"
+    assert Agent.built == 0
+
+    assert agent.generate("q") == "answer to q"
+    assert agent.is_loaded and Agent.built == 1
+    assert agent.resolve() is agent.resolve()
+
+
+def test_concurrent_first_use_builds_once():
+    Agent.built = 0
+    agent = Lazy(Agent)
+    threads = [threading.Thread(target=lambda: agent.model_name) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Agent.built == 1
+
+
+def test_attribute_writes_reach_the_instance(monkeypatch):
+    agent = Lazy(Agent)
+    agent.model_name = "other"
+    assert agent.resolve().model_name == "other"
+
+    monkeypatch.setattr(agent, "generate", lambda query: "patched")
+    assert agent.generate("q") == "patched"
+    monkeypatch.undo()
+    assert agent.generate("q") == "answer to q"
+
+
+def test_a_failed_build_is_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("missing API key")
+        return Agent()
+
+    agent = Lazy(factory)
+    with pytest.raises(RuntimeError):
+        agent.model_name
+    assert not agent.is_loaded
+    assert agent.model_name == "stub" and len(attempts) == 2
@@ -0,0 +1,122 @@
+"""Tests for multi-process metrics (src/utils/metrics.py)."""
+import json
+import os
+
+from src.utils import metrics
+from src.utils.metrics import Registry
+
+
+def worker_registry(directory):
+    registry = Registry(directory=directory)
+    requests = registry.counter("llm_cache_requests_total", "Cache lookups.", ["model", "result"])
+    in_flight = registry.gauge("in_flight", "Calls in flight.", ["model"])
+    latency = registry.histogram("latency_seconds", "Latency.", ["model"], buckets=(0.1, 1.0))
+    return registry, requests, in_flight, latency
+
+
+def write_other_worker(directory, pid, snapshot):
+    with open(directory / f"{pid}.json", "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+
+def test_snapshots_of_other_workers_are_merged(tmp_path):
+    other, requests, in_flight, latency = worker_registry(tmp_path)
+    requests.inc(model="m", result="hit")
+    requests.inc(model="m", result="miss")
+    in_flight.inc(model="m")
+    latency.observe(0.05, model="m")
+    latency.observe(5.0, model="m")
+    write_other_worker(tmp_path, os.getpid() + 1, other.snapshot())
+
+    this, requests, in_flight, latency = worker_registry(tmp_path)
+    requests.inc(3, model="m", result="hit")
+    in_flight.inc(2, model="m")
+    latency.observe(0.5, model="m")
+
+    merged = this.collect()
+    assert sorted(map(tuple, merged["llm_cache_requests_total"]["samples"])) == [
+        (["m", "hit"], 4.0), (["m", "miss"], 1.0)]
+    assert merged["in_flight"]["samples"] == [[["m"], 3.0]]
+    assert merged["latency_seconds"]["samples"] == [[["m"], {"counts": [1, 1, 1], "sum": 5.55}]]
+
+    text = this.render(merged)
+    assert 'latency_seconds_bucket{model="m",le="1.0"} 2' in text
+    assert 'latency_seconds_count{model="m"} 3' in text
+
+
+def test_histograms_with_other_buckets_are_not_merged(tmp_path):
+    other = Registry(directory=tmp_path)
+    other.histogram("latency_seconds", "Latency.", ["model"], buckets=(0.5,)).observe(0.1, model="m")
+    write_other_worker(tmp_path, os.getpid() + 1, other.snapshot())
+
+    this, _, _, latency = worker_registry(tmp_path)
+    latency.observe(0.5, model="m")
+    assert this.collect()["latency_seconds"]["samples"] == [[["m"], {"counts": [0, 1, 0], "sum": 0.5}]]
+
+
+def test_hit_ratio_is_derived_from_all_workers(tmp_path, monkeypatch):
+    other, requests, _, _ = worker_registry(tmp_path)
+    requests.inc(3, model="a", result="hit")
+    write_other_worker(tmp_path, os.getpid() + 1, other.snapshot())
+
+    this, requests, _, _ = worker_registry(tmp_path)
+    requests.inc(model="a", result="miss")
+    requests.inc(model="b", result="miss")
+    monkeypatch.setattr(metrics, "registry", this)
+
+    text = metrics.render_metrics()
+    assert 'llm_cache_hit_ratio{model="a"} 0.75' in text
+    assert 'llm_cache_hit_ratio{model="b"} 0.0' in text
+
+
+def test_stats_endpoints_answer():
+    from fastapi.testclient import TestClient
+    from src.apis import api_server
+
+    client = TestClient(api_server.app)
+    assert client.get("/cache/stats").status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200 and "# TYPE llm_cache_requests_total counter" in response.text
+
+
+def test_precheck_cache_hits_are_counted(monkeypatch, tmp_path):
+    import uuid
+
+    from fastapi.testclient import TestClient
+    from src.agents.me.profile_store import ProfileStore
+    from src.apis import api_server
+
+    (tmp_path / "visitor").mkdir()
+    (tmp_path / "visitor" / "resume.pdf").write_bytes(b"not a pdf")
+    os.utime(tmp_path / "visitor" / "resume.pdf", (1, 1))
+    (tmp_path / "visitor" / "resume.txt").write_text("Resume text", encoding="utf-8")
+    monkeypatch.setattr(api_server, "profile_store", ProfileStore(profiles_dir=tmp_path))
+
+    def generate(query, **kwargs):
+        return {"text": "answer", "model": "stub", "metadata": {}}
+
+    monkeypatch.setattr(api_server.gemini, "generate", generate)
+    monkeypatch.setattr(api_server.xai, "generate", generate)
+    models = {name: getattr(api_server, name).model_name for name in ("gemini", "xai")}
+
+    def counts():
+        values = metrics.CACHE_REQUESTS.values
+        return {(model, result): values.get((model, result), 0.0)
+                for model in models.values() for result in ("hit", "miss")}
+
+    client = TestClient(api_server.app)
+    before = counts()
+    query = f"metrics test {uuid.uuid4().hex}"
+    for _ in range(3):
+        client.post("/generate", json={"query": query, "model": "gemini"})
+        client.post("/compare", json={"query": query + " compare", "models": ["gemini", "xai"]})
+        client.post("/profiles/visitor/chat", json={"message": query, "model": "xai"})
+    after = counts()
+
+    delta = {key: after[key] - before[key] for key in after}
+    assert delta[(models["gemini"], "miss")] == 2 and delta[(models["gemini"], "hit")] == 4
+    assert delta[(models["xai"], "miss")] == 2 and delta[(models["xai"], "hit")] == 4
+
+    hits, misses = after[(models["gemini"], "hit")], after[(models["gemini"], "miss")]
+    text = client.get("/metrics").text
+    assert f'llm_cache_hit_ratio{{model="{models["gemini"]}"}} {hits / (hits + misses)!r}' in text
@@ -0,0 +1,48 @@
+"""Tests for the local gap analysis pre-screen (src/agents/me/prescreen.py)."""
+from src.agents.me.prescreen import PRESCREEN_RESPONSE, ResumeIndex, calibrate, confidence, prescreen
+
+RESUME = """Senior platform engineer. Built Python services on Azure Kubernetes Service (AKS).
+Programming languages: Python, Go, C#. Led a team of eight engineers."""
+
+index = ResumeIndex([RESUME])
+
+
+def test_confidence_is_distance_from_the_midpoint():
+    assert confidence(0.5) == 0.0
+    assert confidence(1.0) == confidence(0.0) == 1.0
+    assert confidence(0.75) == 0.5
+
+
+def test_covered_questions_are_answerable_and_missing_terms_are_gaps():
+    covered = prescreen("What programming languages do you know?", index, threshold=0.8)
+    assert covered.could_answer and covered.reason is None
+    assert covered.response == PRESCREEN_RESPONSE
+
+    gap = prescreen("Do you have any pets?", index, threshold=0.8)
+    assert not gap.could_answer
+    assert gap.reason == "Resume and summary do not mention: pet"
+
+
+def test_ambiguous_questions_go_to_the_llm():
+    assert index.score("Why?") == (0.5, [], [])
+    assert prescreen("Why?", index, threshold=0.01) is None
+    assert prescreen("What is your experience with Python and gardening?", index, threshold=0.8) is None
+
+
+def test_calibration_trades_local_decisions_for_precision():
+    verdicts = {
+        "What programming languages do you know?": True,
+        "Do you have any pets?": False,
+        "Have you used Kubernetes?": True,
+        "What is your favorite food?": False,
+        "Do you speak Python fluently at conferences?": False,  # Mentions resume terms, still a gap
+    }
+    rows = calibrate(verdicts, index, thresholds=(0.0, 0.8, 1.0))
+
+    assert [row["threshold"] for row in rows] == [0.0, 0.8, 1.0]
+    assert rows[0]["decided_locally"] == len(verdicts)
+    assert rows[0]["precision"] < 1.0
+    decided = [row["decided_locally"] for row in rows]
+    assert decided == sorted(decided, reverse=True)
+    assert all(row["decided_locally"] + row["sent_to_llm"] == len(verdicts) for row in rows)
+    assert rows[-1]["precision"] in (None, 1.0)
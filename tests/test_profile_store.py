@@ -0,0 +1,76 @@
+"""Tests for the multi-profile store (src/agents/me/profile_store.py) and profile loading."""
+import json
+import os
+
+import pytest
+from pypdf import PdfWriter
+
+from src.agents.me.profile_store import ProfileStore
+
+
+def make_profile(profiles_dir, profile_id, resume="", meta=None, blank_pdf=False):
+    """A profile folder whose resume.txt is newer than its PDF, so no parse is needed."""
+    profile_dir = profiles_dir / profile_id
+    profile_dir.mkdir(parents=True)
+    pdf_path = profile_dir / "resume.pdf"
+    if blank_pdf:
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        with open(pdf_path, "wb") as f:
+            writer.write(f)
+    else:
+        pdf_path.write_bytes(b"not a pdf")
+    os.utime(pdf_path, (1, 1))
+    if resume:
+        (profile_dir / "resume.txt").write_text(resume, encoding="utf-8")
+    if meta:
+        (profile_dir / "profile.json").write_text(json.dumps(meta), encoding="utf-8")
+    return profile_dir
+
+
+def test_profiles_without_metadata_are_named_after_their_id(tmp_path):
+    make_profile(tmp_path, "jane", resume="Jane's resume", meta={"name": "Jane Doe"})
+    make_profile(tmp_path, "anon", resume="Someone's resume")
+    store = ProfileStore(profiles_dir=tmp_path, default_profile_id="jane")
+
+    assert store.get("jane").name == "Jane Doe"
+    anon = store.get("anon")
+    assert anon.name == "anon" and anon.linkedin == ""
+    assert "You are acting as anon." in anon.system_prompt
+
+
+def test_least_recently_used_profiles_are_evicted(tmp_path):
+    for profile_id in ("a", "b", "c"):
+        make_profile(tmp_path, profile_id, resume=profile_id * 2000)
+    one_profile = ProfileStore(profiles_dir=tmp_path, max_bytes=10**9).get("a").memory_size()
+    store = ProfileStore(profiles_dir=tmp_path, max_bytes=int(one_profile * 2.5), default_profile_id="a")
+
+    store.get("a")
+    store.get("b")
+    store.get("a")  # "b" is now the least recently used
+    store.get("c")
+    assert store.stats()["loaded_profiles"] == ["a", "c"]
+    assert store.stats()["memory_bytes"] <= store.max_bytes
+
+
+def test_failed_loads_release_their_lock(tmp_path):
+    make_profile(tmp_path, "broken")  # No resume.txt and an unreadable PDF
+    store = ProfileStore(profiles_dir=tmp_path, default_profile_id="broken")
+    for profile_id in ("broken", "missing"):
+        with pytest.raises((RuntimeError, FileNotFoundError)):
+            store.get(profile_id)
+    assert store._load_locks == {}
+
+
+def test_ingest_writes_resume_text_and_keeps_it_when_a_parse_fails(tmp_path):
+    make_profile(tmp_path, "good", blank_pdf=True)
+    bad_dir = make_profile(tmp_path, "bad", resume="previous text")
+    store = ProfileStore(profiles_dir=tmp_path, default_profile_id="good")
+
+    results = store.ingest(["good", "bad", "../escape"], workers=1)
+    assert results["good"] == "ok"
+    assert results["bad"].startswith("Failed to read PDF")
+    assert results["../escape"].startswith("Invalid profile ID")
+    assert (tmp_path / "good" / "resume.txt").exists()
+    assert (bad_dir / "resume.txt").read_text(encoding="utf-8") == "previous text"
+    assert sorted(p.name for p in bad_dir.iterdir()) == ["resume.pdf", "resume.txt"]
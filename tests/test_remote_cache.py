@@ -0,0 +1,97 @@
+"""Tests for the shared cache tier: cache_server.py and its client in remote_cache.py."""
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.apis import cache_server
+from src.utils.cache import LLMCache
+from src.utils.cache_backends import CacheBackend, open_backend
+from src.utils.remote_cache import RemoteBackend, RemoteUnavailable, TieredBackend
+
+
+def remote_node(tmp_path, name: str) -> TieredBackend:
+    """A node's tiered backend talking to the cache server in-process."""
+    remote = RemoteBackend("http://cache-server")
+    remote._client, remote._pid = TestClient(cache_server.app), os.getpid()
+    return TieredBackend(open_backend(str(tmp_path / name), {"backend": "single"}), remote)
+
+
+def test_answers_written_on_one_node_are_hits_on_another(tmp_path):
+    a, b = remote_node(tmp_path, "a"), remote_node(tmp_path, "b")
+    key = uuid.uuid4().hex
+    a.set(key, {"text": "shared"}, tag="gemini")
+    assert a.remote.flush(timeout=5)
+
+    assert b.near.get(key) is None
+    assert b.get(key) == {"text": "shared"}
+    assert b.near.entry(key)[3] == "gemini"  # Copied into the near cache with its tag
+
+
+def test_unlock_only_releases_the_owners_lock(tmp_path):
+    client = remote_node(tmp_path, "a").remote.client
+    key = uuid.uuid4().hex
+    assert client.post("/lock", json={"key": key, "owner": "a"}).json()["acquired"]
+    assert not client.post("/lock", json={"key": key, "owner": "b"}).json()["acquired"]
+    assert not client.post("/unlock", json={"key": key, "owner": "b"}).json()["released"]
+    assert client.post("/unlock", json={"key": key, "owner": "a"}).json()["released"]
+
+
+def test_lock_wait_is_bounded_then_falls_back_to_the_near_lock(tmp_path):
+    a, b = remote_node(tmp_path, "a"), remote_node(tmp_path, "b")
+    key = f"inflight:{uuid.uuid4().hex}"
+    owner = a.remote.acquire(key, expire=60)
+
+    start = time.monotonic()
+    with pytest.raises(RemoteUnavailable):
+        b.remote.acquire(key, expire=60, timeout=0.3)
+    assert time.monotonic() - start < 2
+
+    b.remote.acquire = lambda *args, **kwargs: (_ for _ in ()).throw(RemoteUnavailable("held too long"))
+    with b.lock(key, expire=60) as acquired:
+        assert acquired
+    a.remote.release(key, owner)
+
+
+def test_cache_server_refuses_public_addresses_without_a_token():
+    assert cache_server.is_loopback("127.0.0.1")
+    assert cache_server.is_loopback("::1")
+    assert cache_server.is_loopback("localhost")
+    assert not cache_server.is_loopback("0.0.0.0")
+    assert not cache_server.is_loopback("cache.internal")
+
+
+class SlowBackend(CacheBackend):
+    """Stands in for a tier whose lookups wait on the network."""
+
+    def get(self, key):
+        time.sleep(0.3)
+        return {"text": "slow hit"}
+
+
+def test_async_cache_lookups_leave_the_event_loop_free(tmp_path):
+    cache = LLMCache(cache_dir=str(tmp_path), backend=SlowBackend())
+
+    async def provider(query):
+        pytest.fail("provider called on a hit")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        result = await cache.acached_api_call("m", "q", provider)
+        ticking.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    assert result == {"text": "slow hit"}
+    assert ticks >= 10
@@ -0,0 +1,89 @@
+"""Tests for the provider-call scheduler (src/utils/scheduler.py)."""
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from src.utils.scheduler import BATCH, INTERACTIVE, ProviderScheduler, SharedSlots
+
+
+def test_queued_interactive_calls_go_before_batch():
+    scheduler = ProviderScheduler("test", capacity=1, weights={INTERACTIVE: 8, BATCH: 1}, reserve=0)
+    order = []
+
+    def call(name, cls):
+        with scheduler.slot(cls):
+            order.append(name)
+            time.sleep(0.02)
+
+    with scheduler.slot(BATCH):
+        threads = [threading.Thread(target=call, args=(f"batch-{i}", BATCH)) for i in range(3)]
+        threads += [threading.Thread(target=call, args=(f"interactive-{i}", INTERACTIVE)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)  # Queue in this order
+    for thread in threads:
+        thread.join()
+
+    assert order[:2] == ["interactive-0", "interactive-1"]
+    assert scheduler.stats()["in_use"] == 0
+
+
+def test_cancelled_async_waiter_holds_no_slot(tmp_path):
+    shared = SharedSlots(str(tmp_path), capacity=4, reserve=0)
+    scheduler = ProviderScheduler("test", capacity=1, shared=shared)
+
+    async def scenario():
+        async with scheduler.aslot():
+            waiter = asyncio.ensure_future(scheduler.aslot().__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        async with scheduler.aslot():  # The freed slot is still usable
+            pass
+        await asyncio.sleep(0.1)  # Shared releases run in the background
+
+    asyncio.run(scenario())
+    assert scheduler.stats() == {
+        "in_use": 0, "capacity": 1, "queued": {INTERACTIVE: 0, BATCH: 0},
+        "shared": {"in_use": 0, "capacity": 4, "waiting": 0},
+    }
+
+
+def test_shared_slots_reserve_capacity_for_interactive_calls(tmp_path):
+    # Two handles on one directory stand in for two processes
+    chatbot = SharedSlots(str(tmp_path), capacity=3, reserve=1)
+    batch_run = SharedSlots(str(tmp_path), capacity=3, reserve=1)
+
+    assert batch_run.try_acquire("m", BATCH, "b1")
+    assert batch_run.try_acquire("m", BATCH, "b2")
+    assert not batch_run.try_acquire("m", BATCH, "b3")  # Reserve left for interactive calls
+    assert chatbot.try_acquire("m", INTERACTIVE, "i1")
+    assert not chatbot.try_acquire("m", INTERACTIVE, "i2")  # Full: i2 now waits
+
+    batch_run.release("m", "b1")
+    assert not batch_run.try_acquire("m", BATCH, "b3")  # An interactive call is waiting
+    assert chatbot.try_acquire("m", INTERACTIVE, "i2")
+    assert chatbot.stats("m") == {"in_use": 3, "capacity": 3, "waiting": 0}
+
+
+def test_shared_slots_are_shared_across_processes(tmp_path):
+    holder = subprocess.Popen([sys.executable, "-c", f"""
+import time
+from src.utils.scheduler import SharedSlots
+slots = SharedSlots({str(tmp_path)!r}, capacity=1, reserve=0)
+assert slots.try_acquire("m", "interactive", "other-process")
+print("held", flush=True)
+time.sleep(0.5)
+slots.release("m", "other-process")
+"""], stdout=subprocess.PIPE, text=True, cwd=Path(__file__).parent.parent)
+    try:
+        assert holder.stdout.readline().strip() == "held"
+        start = time.monotonic()
+        SharedSlots(str(tmp_path), capacity=1, reserve=0).acquire("m", BATCH, "this-process")
+        waited = time.monotonic() - start
+    finally:
+        holder.wait(timeout=10)
+    assert waited > 0.2
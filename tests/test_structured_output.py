@@ -0,0 +1,138 @@
+"""Fuzz and edge-case tests for src/utils/structured_output.py."""
+import json
+import random
+
+import pytest
+from pydantic import BaseModel
+
+from benchmarks.bench_structured_output import (
+    SAFE_CHARS, SERIALIZATIONS, WRAPPERS, random_object, single_quoted,
+)
+from src.utils.structured_output import (
+    StreamingJSONParser, StructuredOutputError, extract_json, parse_structured,
+)
+
+FUZZ_CASES = 1000
+
+
+class Answer(BaseModel):
+    x: int
+
+
+# -----------------------------------------------------------------------------
+# Fuzz: documents corrupted the way LLMs corrupt them must round-trip
+# -----------------------------------------------------------------------------
+def fuzz_cases():
+    rng = random.Random(0)
+    for _ in range(FUZZ_CASES):
+        obj = random_object(rng)
+        corrupted = rng.choice(SERIALIZATIONS)(obj)
+        for wrapper in rng.sample(WRAPPERS, rng.randint(0, 2)):
+            corrupted = wrapper(rng, corrupted)
+        yield rng, obj, corrupted
+
+
+def test_fuzz_corrupted_round_trip():
+    for _, obj, corrupted in fuzz_cases():
+        assert extract_json(corrupted) == obj, corrupted[:200]
+
+
+def test_fuzz_single_quoted_round_trip():
+    rng = random.Random(1)
+    for _ in range(FUZZ_CASES):
+        plain = random_object(rng, alphabet=SAFE_CHARS)
+        assert extract_json(single_quoted(plain)) == plain
+
+
+def test_fuzz_random_stream_chunking():
+    for rng, obj, corrupted in fuzz_cases():
+        parser = StreamingJSONParser()
+        position, value = 0, None
+        while position < len(corrupted) and value is None:
+            step = rng.randint(1, 20)
+            value = parser.feed(corrupted[position:position + step])
+            parser.partial()
+            position += step
+        if value is None:
+            value = parser.finish()
+        assert value == obj, corrupted[:200]
+
+
+def test_fuzz_truncation_never_crashes():
+    for rng, obj, _ in fuzz_cases():
+        text = json.dumps(obj)
+        try:
+            value = extract_json(text[:rng.randint(1, len(text))])
+        except StructuredOutputError:
+            continue
+        assert isinstance(value, (dict, list))
+
+
+# -----------------------------------------------------------------------------
+# Edge cases
+# -----------------------------------------------------------------------------
+def test_parse_structured_skips_values_that_do_not_validate():
+    assert parse_structured('The answer is [1] and {"x": 1}', Answer) == Answer(x=1)
+
+
+def test_accept_prefers_matching_value_and_falls_back_to_first():
+    text = 'See [2] for details: {"results": [2, 1]}'
+    assert extract_json(text, accept=lambda v: isinstance(v, dict)) == {"results": [2, 1]}
+    assert extract_json(text, accept=lambda v: False) == [2]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("[1 2]", [1, 2]),
+    ('["x" "y"]', ["x", "y"]),
+    ('{"a" "b"}', {"a": "b"}),
+    ('{"a": [1] "b": 2}', {"a": [1], "b": 2}),
+])
+def test_missing_separators_are_inserted(text, expected):
+    assert extract_json(text) == expected
+    assert StreamingJSONParser().feed(text) == expected
+
+
+@pytest.mark.parametrize("text", ['{"a": 1 2}', "{:1}", "{a b: 1}"])
+def test_unrepairable_input_is_rejected(text):
+    with pytest.raises(StructuredOutputError):
+        extract_json(text)
+    with pytest.raises(StructuredOutputError):
+        StreamingJSONParser().feed(text)
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "just ] closers }"])
+def test_no_value(text):
+    with pytest.raises(StructuredOutputError):
+        extract_json(text)
+
+
+def test_stream_partial_then_finish():
+    parser = StreamingJSONParser()
+    assert parser.feed('Sure: {"a": [1, 2') is None
+    assert parser.partial() == {"a": [1, 2]}
+    assert parser.finish() == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, // first\n "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": /* inline, with "quotes" */ 1}', {"a": 1}),
+    ('[1, /* multi\nline **/ 2] // done', [1, 2]),
+    ('{"url": "http://example.com/*x*/"}', {"url": "http://example.com/*x*/"}),
+])
+def test_comments_are_skipped(text, expected):
+    assert extract_json(text) == expected
+    assert StreamingJSONParser().feed(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("[.5, -.5, 5., 5.e3, +3, 007]", [0.5, -0.5, 5.0, 5000.0, 3, 7]),
+    ("[1_000, inf]", ["1_000", "inf"]),
+])
+def test_loose_numbers_are_normalised(text, expected):
+    assert extract_json(text) == expected
+
+
+def test_invalid_escapes_keep_their_backslash():
+    text = r'{"path": "C:\dir\new", "odd": "\y", "quote": "say \"hi\""}'
+    assert extract_json(text) == {"path": "C:\\dir\new", "odd": "\\y", "quote": 'say "hi"'}
+    assert extract_json(r"{'path': 'C:\dir'}") == {"path": "C:\\dir"}
@@ -0,0 +1,18 @@
+from src.machinelearning.basics import sweep
+
+
+def test_status_requires_an_early_stop_and_a_non_increasing_loss():
+    assert sweep._status([3.0, 2.0, 2.0, 1.0], returned=True) == "converged"
+    assert sweep._status([1522.0, 1209.0, 4833.0], returned=True) == "diverged"
+    assert sweep._status([3.0, 2.0, float("inf")], returned=False) == "diverged"
+    assert sweep._status([3.0, 2.0, 1.0], returned=False) == "iteration limit"
+
+
+def test_best_run_skips_diverged_runs():
+    results = [
+        {"trainer": "gradient", "lr": 5.0, "converged": False, "status": "diverged", "loss": None, "seconds": 0.1},
+        {"trainer": "gradient", "lr": 0.1, "converged": True, "status": "converged", "loss": 2.0, "seconds": 0.3},
+        {"trainer": "step", "lr": 0.1, "converged": True, "status": "converged", "loss": 3.0, "seconds": 0.1},
+    ]
+    assert sweep.best_run(results)["lr"] == 0.1
+    assert sweep.best_run(results[:1]) is None
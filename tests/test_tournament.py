@@ -0,0 +1,98 @@
+"""Tests for the tournament engine (src/agents/tournament.py) with fake agents."""
+import json
+
+import pytest
+
+from src.agents.tournament import Tournament, aggregate
+from src.utils.cache import LLMCache
+from src.utils.cache_backends import open_backend
+
+
+class Competitor:
+    def __init__(self, name: str):
+        self.model_name = f"competitor-{name}"
+        self.name = name
+
+    def generate(self, query, **kwargs):
+        return {"text": f"answer from {self.name}", "model": self.model_name}
+
+
+class Judge:
+    """Prefers answers from competitors earlier in `preference`."""
+
+    def __init__(self, name: str, preference, fail: bool = False):
+        self.model_name = f"judge-{name}"
+        self.preference = preference
+        self.fail = fail
+
+    def generate(self, messages, **kwargs):
+        if self.fail:
+            raise ConnectionError("provider unavailable")
+        prompt = messages[-1]["content"] if isinstance(messages, list) else messages
+        shown = [name for name in self.preference if f"answer from {name}" in prompt]
+        if "competitor 2" in prompt.lower() and len(shown) == 2:
+            first = prompt.index(f"answer from {shown[0]}") < prompt.index(f"answer from {shown[1]}")
+            winner = 1 if first else 2
+            return {"text": json.dumps({"winner": winner}), "model": self.model_name}
+        order = sorted(shown, key=lambda name: prompt.index(f"answer from {name}"))
+        ranking = [order.index(name) + 1 for name in shown]
+        return {"text": f"See [1] above. {json.dumps({'results': ranking})}", "model": self.model_name}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(cache_dir=str(tmp_path), backend=open_backend(str(tmp_path)))
+
+
+def tournament(cache, judges):
+    competitors = {name: Competitor(name) for name in ("a", "b", "c")}
+    return Tournament(competitors=competitors, judges=judges, cache=cache)
+
+
+def test_failing_judge_is_dropped(cache):
+    engine = tournament(cache, {
+        "good": Judge("good", ["c", "a", "b"]),
+        "broken": Judge("broken", ["a", "b", "c"], fail=True),
+    })
+    result = engine.run("question", method="borda")
+    assert result.consensus == ["c", "a", "b"]
+    assert result.failed_judges == ["broken"]
+    assert list(result.judge_rankings) == ["good"]
+
+
+def test_all_judges_failing_is_an_error(cache):
+    engine = tournament(cache, {"broken": Judge("broken", ["a"], fail=True)})
+    with pytest.raises(RuntimeError):
+        engine.run("question")
+    with pytest.raises(RuntimeError):
+        engine.run_pairwise("question")
+
+
+def test_pairwise_drops_failing_judge(cache):
+    engine = tournament(cache, {
+        "good": Judge("good", ["b", "c", "a"]),
+        "broken": Judge("broken", ["a", "b", "c"], fail=True),
+    })
+    result = engine.run_pairwise("question", method="bradley_terry")
+    assert result.consensus == ["b", "c", "a"]
+    assert result.failed_judges == ["broken"]
+
+
+def test_kemeny_scores_measure_agreement_with_consensus():
+    rankings = [["a", "b", "c"], ["a", "c", "b"], ["b", "a", "c"]]
+    consensus, scores = aggregate(rankings, ["a", "b", "c"], method="kemeny")
+    assert consensus == ["a", "b", "c"]
+    # a: above b (2 judges) and c (3); b: below a (2), above c (2); c: below a (3), below b (2)
+    assert scores == {"a": 5.0, "b": 4.0, "c": 5.0}
+
+
+def test_pairwise_elo_is_deterministic(tmp_path):
+    judges = {name: Judge(name, preference) for name, preference in
+              [("j1", ["a", "b", "c", "d"]), ("j2", ["d", "c", "b", "a"]), ("j3", ["b", "d", "a", "c"])]}
+    results = []
+    for run in range(5):
+        cache = LLMCache(cache_dir=str(tmp_path / str(run)), backend=open_backend(str(tmp_path / str(run))))
+        competitors = {name: Competitor(name) for name in ("a", "b", "c", "d")}
+        result = Tournament(competitors=competitors, judges=judges, cache=cache).run_pairwise("q", method="elo")
+        results.append(result.scores)
+    assert all(scores == results[0] for scores in results)
@@ -0,0 +1,83 @@
+"""Tests for span tracing (src/utils/tracing.py)."""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils import tracing
+from src.utils.config import Config
+from src.utils.tracing import NOOP_SPAN, bind, span, trace, traced, tracer
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    tracer.clear()
+    yield
+    tracer.clear()
+
+
+def test_sampling_is_decided_once_per_root(monkeypatch):
+    monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 0.0)
+    with trace("request") as root:
+        assert root is NOOP_SPAN
+        assert span("child") is NOOP_SPAN
+    assert tracer.get_spans() == []
+
+    monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 1.0)
+    with trace("request"):
+        with trace("nested") as nested:  # Inside a trace: a child, not a new root
+            assert nested.parent_id is not None
+    assert len({s.trace_id for s in tracer.get_spans()}) == 1
+
+    assert trace("forced", sampled=False) is NOOP_SPAN
+    monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 0.0)
+    assert trace("forced", sampled=True) is not NOOP_SPAN
+
+
+def test_spans_nest_across_threads_and_tasks():
+    @traced("work")
+    def work(n):
+        return threading.get_ident()
+
+    @traced("async_work")
+    async def async_work():
+        await asyncio.sleep(0)
+
+    async def gather():
+        await asyncio.gather(async_work(), async_work())
+
+    with trace("request", sampled=True, route="/test") as root:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            thread_ids = set(pool.map(bind(work), range(4)))
+        asyncio.run(gather())
+
+    spans = tracer.get_spans(root.trace_id)
+    assert sorted(s.name for s in spans) == ["async_work"] * 2 + ["request"] + ["work"] * 4
+    assert all(s.parent_id == root.span_id for s in spans if s is not root)
+    assert {s.thread_id for s in spans if s.name == "work"} == thread_ids
+    summary = tracer.recent_traces()[0]
+    assert (summary["name"], summary["spans"], summary["attrs"]) == ("request", 7, {"route": "/test"})
+
+
+def test_errors_are_recorded_and_chrome_export_is_valid(tmp_path):
+    with pytest.raises(ValueError):
+        with trace("request", sampled=True):
+            with span("failing"):
+                raise ValueError("boom")
+
+    failing = next(s for s in tracer.get_spans() if s.name == "failing")
+    assert failing.attrs["error"] == "ValueError: boom"
+
+    path = tracing.export_chrome_trace(tmp_path / "trace.json")
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["request", "failing"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+
+
+def test_buffer_is_bounded():
+    small = tracing.Tracer(max_spans=3)
+    for i in range(5):
+        small.record(tracing.Span(f"s{i}", "t", None, {}))
+    assert [s.name for s in small.get_spans()] == ["s2", "s3", "s4"]
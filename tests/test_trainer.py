@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from src.machinelearning.basics import trainer
+
+
+def correlated_features(rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=rows)
+    X = np.column_stack([base + 0.3 * rng.normal(size=rows) for _ in range(3)]) * 10 + 50
+    Y = X @ [1.0, 2.0, 3.0] + rng.normal(size=rows)
+    return X, Y
+
+
+def test_gradient_descent_backtracks_instead_of_diverging():
+    # lr=0.5 is above 1 / (largest eigenvalue of Z^T Z / n) for these features
+    X, Y = correlated_features()
+    history = []
+    w, b = trainer.train_gradient_descent(X, Y, lr=0.5, history=history)
+
+    assert all(later <= earlier for earlier, later in zip(history, history[1:]))
+    best = trainer.loss(X, Y, *trainer.train_least_squares(X, Y))
+    assert trainer.loss(X, Y, w, b) == pytest.approx(best, rel=1e-4)
+
+
+def test_minibatch_halves_the_rate_when_the_loss_goes_up():
+    X, Y = correlated_features()
+    history = []
+    w, b = trainer.train_minibatch(
+        lambda: ((X[i:i + 20], Y[i:i + 20]) for i in range(0, len(Y), 20)),
+        epochs=300, lr=0.5, history=history)
+
+    assert any(later > earlier for earlier, later in zip(history, history[1:]))
+    best = trainer.loss(X, Y, *trainer.train_least_squares(X, Y))
+    assert trainer.loss(X, Y, w, b) == pytest.approx(best, rel=1e-2)
+
+
+def test_non_finite_loss_raises():
+    X, Y = correlated_features()
+    Y[0] = np.nan
+    with pytest.raises(trainer.DivergenceError):
+        trainer.train_gradient_descent(X, Y)